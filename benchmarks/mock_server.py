@@ -0,0 +1,352 @@
+"""
+Local stand-in for the cnHeat API used by the benchmarks.
+
+It implements the endpoints the client calls, serves a generated dataset of sites,
+radios, antennas, predictions, users and subscriptions, and can add latency and
+transient errors. Everything runs on localhost, so no network access is needed.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+FREQUENCIES = (2.4, 3.65, 5.8)
+
+
+class Dataset:
+    """
+    Generated account contents.
+
+    Args:
+        sites (int, optional): Number of sites. Defaults to 100.
+        radios_per_site (int, optional): Radios generated for every site. Defaults to 10.
+        antennas_per_frequency (int, optional): Antennas in each frequency's catalog. Defaults to 20.
+        predictions (int, optional): Existing predictions. Defaults to 50.
+        seed (int, optional): Seed making the data reproducible. Defaults to 0.
+    """
+
+    def __init__(self, sites=100, radios_per_site=10, antennas_per_frequency=20, predictions=50, seed=0):
+        rng = random.Random(seed)
+        self.lock = threading.RLock()
+        self.antennas = {
+            freq: [
+                {"id": f"ant-{freq}-{i}", "antenna": f"Vendor{i % 4}-Sector-{60 + 30 * (i % 3)}", "frequency": freq, "gain": 12 + i % 8}
+                for i in range(antennas_per_frequency)
+            ]
+            for freq in FREQUENCIES
+        }
+        self.sites = {}
+        self.radios = {}  # site ID -> {radio ID: radio}
+        self.radio_sites = {}  # radio ID -> site ID
+        for s in range(sites):
+            site_id = f"site{s:06d}"
+            self.sites[site_id] = {
+                "id": site_id,
+                "name": f"Tower {s}",
+                "latitude": round(rng.uniform(25, 49), 6),
+                "longitude": round(rng.uniform(-124, -67), 6),
+            }
+            self.radios[site_id] = {}
+            for r in range(radios_per_site):
+                freq = FREQUENCIES[r % len(FREQUENCIES)]
+                self._add_radio(site_id, {
+                    "id": f"{site_id}-r{r:03d}",
+                    "name": f"AP-{r}-{freq} GHZ.TOWER {s}",
+                    "antenna": self.antennas[freq][r % antennas_per_frequency]["id"],
+                    "azimuth": (r * 360 // max(radios_per_site, 1)) % 360,
+                    "frequency(ghz)": freq,
+                    "height(m)": rng.choice((15, 20, 25, 30, 40)),
+                    "tilt": rng.choice((-4, -2, 0)),
+                    "txpower(dbm)": 27.2,
+                })
+        now = time.time()
+        self.predictions = {}
+        for p in range(predictions):
+            prediction_id = f"pred{p:05d}"
+            self.predictions[prediction_id] = {"id": prediction_id, "name": f"Coverage {p}", "radio_list": [], "created": now}
+        self.users = {f"user{u}@example.com": {"email": f"user{u}@example.com", "permission": "viewer"} for u in range(10)}
+        self.subscriptions = [{"id": f"sub-{site_id}", "site": site_id} for site_id in list(self.sites)[: max(1, sites // 10)]]
+
+    def _add_radio(self, site_id, radio):
+        self.radios[site_id][radio["id"]] = radio
+        self.radio_sites[radio["id"]] = site_id
+
+    @property
+    def radio_count(self):
+        """int: Radios across all sites."""
+        return len(self.radio_sites)
+
+
+class MockServer:
+    """
+    Threaded HTTP server imitating the cnHeat API on localhost.
+
+    Prediction jobs report "running" until ``job_duration`` seconds after creation and
+    "completed" afterwards.
+
+    Args:
+        dataset (Dataset, optional): Data to serve. Defaults to a small generated dataset.
+        latency (float, optional): Seconds added to every response. Defaults to 0.
+        jitter (float, optional): Random extra latency, as a fraction of ``latency``. Defaults to 0.
+        error_rate (float, optional): Probability of answering 503 instead of handling a
+            request; the token endpoint never fails. Defaults to 0.
+        etags (bool, optional): Send ETags and answer matching conditional GETs with 304.
+            Defaults to False.
+        job_duration (float, optional): Seconds a prediction job runs. Defaults to 1.
+        port (int, optional): Port to listen on; 0 picks a free one. Defaults to 0.
+    """
+
+    def __init__(self, dataset=None, latency=0.0, jitter=0.0, error_rate=0.0, etags=False, job_duration=1.0, port=0):
+        self.dataset = dataset or Dataset()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.etags = etags
+        self.job_duration = job_duration
+        self.requests = 0
+        self.errors = 0
+        self.conditional = 0  # GETs carrying If-None-Match
+        self.not_modified = 0  # conditional GETs answered 304
+        self.canned = {}  # (method, path) -> [status, raw body, headers, remaining uses or None]
+        self._counter_lock = threading.Lock()
+        self._rng = random.Random(1)
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_endpoint(self):
+        """str: API base URL to pass to the client."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v1/"
+
+    def start(self):
+        """
+        Starts serving in the background.
+
+        Returns:
+            MockServer: The server itself.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="cnheat-mock", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """
+        Stops the server.
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def set_response(self, method, path, status=200, body=b"", headers=None, times=None):
+        """
+        Answers one endpoint with a fixed raw response instead of handling it, e.g. to
+        serve a malformed body or a 503 with Retry-After. Pass ``status=None`` to remove it.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Endpoint path relative to the API base, e.g. "sites".
+            status (int, optional): HTTP status. Defaults to 200.
+            body (bytes, optional): Raw response body. Defaults to empty.
+            headers (dict, optional): Extra response headers.
+            times (int, optional): Serve it this many times, then handle the endpoint
+                normally again. None means until removed. Defaults to None.
+        """
+        with self._counter_lock:
+            if status is None:
+                self.canned.pop((method, path), None)
+            else:
+                self.canned[(method, path)] = [status, body, headers or {}, times]
+
+    def _canned(self, method, path):
+        with self._counter_lock:
+            canned = self.canned.get((method, path))
+            if canned is None:
+                return None
+            if canned[3] is not None:
+                canned[3] -= 1
+                if canned[3] <= 0:
+                    del self.canned[(method, path)]
+            return canned[:3]
+
+    def _delay(self):
+        if self.latency:
+            time.sleep(self.latency * (1 + self.jitter * self._rng.random()))
+
+    def _fail(self):
+        with self._counter_lock:
+            self.requests += 1
+            if self.error_rate and self._rng.random() < self.error_rate:
+                self.errors += 1
+                return True
+        return False
+
+    def handle(self, method, path, query, body):
+        """
+        Handles one API call.
+
+        Returns:
+            tuple: ``(status, payload)``.
+        """
+        data = self.dataset
+        parts = path.strip("/").split("/")
+        head, rest = parts[0], parts[1:]
+        with data.lock:
+            if path == "oauth/token":
+                return 200, {"access_token": uuid.uuid4().hex, "token_type": "bearer", "expires_in": 3600}
+            if path == "credits":
+                return 200, {"credits": 1000}
+            if head == "sites" and method == "GET":
+                return 200, {"objects": list(data.sites.values())}
+            if head == "sites" and method == "POST":
+                site = dict(body, id=uuid.uuid4().hex[:12])
+                data.sites[site["id"]] = site
+                data.radios[site["id"]] = {}
+                return 200, site
+            if head == "site" and method == "PATCH":
+                site = data.sites.get(rest[0])
+                if site is None:
+                    return 404, {"error": "site not found"}
+                site.update(body)
+                return 200, site
+            if head == "antennas":
+                freq = float(query.get("frequency", ["0"])[0])
+                return 200, {"objects": data.antennas.get(freq, [])}
+            if head == "radios":
+                radios = data.radios.get(rest[0])
+                if radios is None:
+                    return 404, {"error": "site not found"}
+                return 200, {"objects": list(radios.values())}
+            if head == "radio" and method == "POST":
+                if rest[0] not in data.radios:
+                    return 404, {"error": "site not found"}
+                radio = dict(body, id=uuid.uuid4().hex[:12])
+                data._add_radio(rest[0], radio)
+                return 200, radio
+            if head == "radio":
+                site_id = data.radio_sites.get(rest[0])
+                if site_id is None:
+                    return 404, {"error": "radio not found"}
+                radio = data.radios[site_id][rest[0]]
+                if method == "PATCH":
+                    radio.update(body)
+                elif method == "DELETE":
+                    del data.radios[site_id][rest[0]]
+                    del data.radio_sites[rest[0]]
+                    return 200, {"deleted": rest[0]}
+                return 200, radio
+            if path == "predictions/jobmanagement":
+                now = time.time()
+                return 200, {"objects": [
+                    {"prediction_id": p["id"], "status": "completed" if now - p["created"] >= self.job_duration else "running"}
+                    for p in data.predictions.values()
+                ]}
+            if head == "predictions" and method == "GET":
+                return 200, {"objects": list(data.predictions.values())}
+            if head == "predictions" and method == "POST":
+                prediction = dict(body, id=uuid.uuid4().hex[:12], created=time.time())
+                data.predictions[prediction["id"]] = prediction
+                return 200, prediction
+            if head == "prediction":
+                prediction = data.predictions.get(rest[0])
+                if prediction is None:
+                    return 404, {"error": "prediction not found"}
+                if method == "DELETE":
+                    del data.predictions[rest[0]]
+                    return 200, {"deleted": rest[0]}
+                prediction.update(body or {})
+                return 200, prediction
+            if head == "users" and method == "GET":
+                return 200, {"objects": list(data.users.values())}
+            if head == "users" and method == "POST":
+                user = {"email": body["email"], "permission": body.get("permission")}
+                data.users[user["email"]] = user
+                return 200, user
+            if head == "user" and method == "DELETE":
+                data.users.pop(body["email"], None)
+                return 200, {"deleted": body["email"]}
+            if head == "subscriptions":
+                return 200, {"objects": data.subscriptions}
+            if head == "subscription":
+                return 200, {"site": rest[0], "action": rest[1] if len(rest) > 1 else None}
+        return 404, {"error": f"unknown endpoint {method} {path}"}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body are written separately
+
+            def _dispatch(self, method):
+                url = urlparse(self.path)
+                path = url.path.split("/api/v1/", 1)[-1]
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                server._delay()
+                if path != "oauth/token" and server._fail():
+                    return self._send(503, {"error": "unavailable"}, {"Retry-After": "0"})
+                canned = server._canned(method, path)
+                if canned is not None:
+                    return self._send_raw(*canned)
+                if self.headers.get("Content-Type", "").startswith("application/json"):
+                    body = json.loads(raw) if raw else None
+                else:
+                    body = {k: v[0] for k, v in parse_qs(raw.decode()).items()}
+                status, payload = server.handle(method, path, parse_qs(url.query), body)
+                self._send(status, payload)
+
+            def _send(self, status, payload, headers=None):
+                body = json.dumps(payload).encode()
+                headers = dict(headers or {})
+                if server.etags and status == 200 and self.command == "GET":
+                    etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                    headers["ETag"] = etag
+                    condition = self.headers.get("If-None-Match")
+                    if condition is not None:
+                        with server._counter_lock:
+                            server.conditional += 1
+                            if condition == etag:
+                                server.not_modified += 1
+                                status, body = 304, b""
+                self._send_raw(status, body, headers)
+
+            def _send_raw(self, status, body, headers):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def do_PATCH(self):
+                self._dispatch("PATCH")
+
+            def do_DELETE(self):
+                self._dispatch("DELETE")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
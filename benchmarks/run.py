@@ -0,0 +1,275 @@
+"""
+Benchmarks the cnHeat client against the local mock server.
+
+Run from the repository root, e.g.::
+
+    python -m benchmarks.run
+    python -m benchmarks.run --sites 5000 --radios-per-site 10 --latency 0.02 --error-rate 0.01
+    python -m benchmarks.run --only fetch --iterations 200 --json results.json
+    python -m benchmarks.run --only codec --codec json
+
+Every benchmark reports operations per second, p50/p95/p99 latency per operation and
+the number of HTTP requests the server saw per operation.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from benchmarks.mock_server import FREQUENCIES, Dataset, MockServer
+from cnHeat import AsyncCnHeat, cnHeat
+from cnHeat.codec import available_codecs, get_codec
+
+
+BENCHMARKS = []
+
+
+def benchmark(name, iterations=None):
+    """
+    Registers a benchmark. The function is called once per iteration with a Context.
+
+    Args:
+        name (str): Name used in reports and by ``--only``.
+        iterations (int, optional): Fixed iteration count overriding ``--iterations``,
+            for benchmarks whose single run is already large.
+    """
+    def register(fn):
+        BENCHMARKS.append((name, fn, iterations))
+        return fn
+    return register
+
+
+class Context:
+    """
+    What a benchmark iteration works with.
+
+    Attributes:
+        client (cnHeat): Client connected to the mock server.
+        async_client (AsyncCnHeat): Async client connected to the mock server; its
+            connections belong to ``loop``, so run coroutines with run().
+        loop (asyncio.AbstractEventLoop): Event loop kept for the whole run.
+        server (MockServer): The mock server.
+        site_ids (list): IDs of every generated site.
+        radios (list): Copy of every generated radio.
+        radios_body (bytes): ``radios`` as one ``{"objects": [...]}`` JSON body.
+        rng (random.Random): Seeded random source.
+        args (argparse.Namespace): Command line options.
+    """
+
+    def __init__(self, client, async_client, server, args):
+        self.client = client
+        self.async_client = async_client
+        self.loop = asyncio.new_event_loop()
+        self.server = server
+        self.site_ids = list(server.dataset.sites)
+        self.rng = random.Random(args.seed)
+        self.args = args
+        self.radios = [dict(r) for site in server.dataset.radios.values() for r in site.values()]
+        self.radios_body = json.dumps({"objects": self.radios}).encode()
+
+    def run(self, coro):
+        """Runs a coroutine on the context's event loop and returns its result."""
+        return self.loop.run_until_complete(coro)
+
+    def close(self):
+        """Closes both clients and the event loop."""
+        self.client.close()
+        self.run(self.async_client.aclose())
+        self.loop.close()
+
+    def site_id(self):
+        """Returns a random site ID."""
+        return self.rng.choice(self.site_ids)
+
+    def antenna_id(self, freq):
+        """Returns the ID of an antenna in a frequency's catalog."""
+        return self.server.dataset.antennas[freq][0]["id"]
+
+
+@benchmark("fetch.sites")
+def fetch_sites(ctx):
+    ctx.client.get_sites()
+
+
+@benchmark("fetch.site_radios")
+def fetch_site_radios(ctx):
+    ctx.client.get_site_radios(ctx.site_id())
+
+
+@benchmark("fetch.antennas")
+def fetch_antennas(ctx):
+    ctx.client.get_antennas.refresh(ctx.rng.choice(FREQUENCIES))
+
+
+@benchmark("fetch.predictions")
+def fetch_predictions(ctx):
+    ctx.client.get_predictions()
+
+
+@benchmark("fetch.users")
+def fetch_users(ctx):
+    ctx.client.get_users()
+
+
+@benchmark("to_dict.sites")
+def sites_to_dict(ctx):
+    ctx.client.get_sites.to_dict(None)
+
+
+@benchmark("to_dict.site_radios")
+def site_radios_to_dict(ctx):
+    ctx.client.get_site_radios.to_dict(ctx.site_id())
+
+
+@benchmark("create.radio")
+def create_radio(ctx):
+    freq = ctx.rng.choice(FREQUENCIES)
+    ctx.client.create_radio(ctx.site_id(), freq, ctx.antenna_id(freq), ctx.rng.randrange(0, 360, 30))
+
+
+@benchmark("create.radios_tower", iterations=5)
+def create_radios_tower(ctx):
+    site_id = ctx.site_id()
+    freq = ctx.rng.choice(FREQUENCIES)
+    specs = [
+        {"site_id": site_id, "freq": freq, "antennaId": ctx.antenna_id(freq), "azimuth": azimuth}
+        for azimuth in range(0, 360, 30)
+    ]
+    ctx.client.create_radios(specs)
+
+
+@benchmark("create.prediction")
+def create_prediction(ctx):
+    radios = list(ctx.server.dataset.radios[ctx.site_id()])
+    ctx.client.create_prediction(f"bench-{ctx.rng.random()}", radios[:3])
+
+
+@benchmark("snapshot.inventory", iterations=3)
+def inventory_snapshot(ctx):
+    ctx.client.inventory_snapshot()
+
+
+@benchmark("snapshot.inventory_async", iterations=3)
+def inventory_snapshot_async(ctx):
+    ctx.run(ctx.async_client.inventory_snapshot(max_concurrency=ctx.args.workers))
+
+
+def codec_benchmarks(name):
+    codec = get_codec(name)
+
+    @benchmark(f"codec.decode.{name}", iterations=20)
+    def decode(ctx):
+        codec.loads(ctx.radios_body)
+
+    @benchmark(f"codec.encode.{name}", iterations=20)
+    def encode(ctx):
+        codec.dumps({"objects": ctx.radios})
+
+
+for codec_name in available_codecs():
+    codec_benchmarks(codec_name)
+
+
+def percentile(samples, q):
+    """
+    Returns the nearest-rank percentile of a list of samples.
+    """
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+def run_benchmark(name, fn, iterations, ctx):
+    """
+    Times every iteration of one benchmark.
+
+    Failed operations (e.g. non-idempotent requests hit by an injected error) are timed
+    and counted, not fatal.
+
+    Returns:
+        dict: Name, iterations, failures, elapsed seconds, operations per second, latency
+            percentiles in milliseconds and server requests per operation.
+    """
+    try:
+        fn(ctx)  # warm-up: connections, token, lazily loaded lookups
+    except RuntimeError:
+        pass
+    requests_before = ctx.server.requests
+    samples = []
+    failures = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter()
+        try:
+            fn(ctx)
+        except RuntimeError:
+            failures += 1
+        samples.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - started
+    return {
+        "name": name,
+        "iterations": iterations,
+        "failures": failures,
+        "elapsed": elapsed,
+        "ops_per_sec": iterations / elapsed if elapsed else float("inf"),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "requests_per_op": (ctx.server.requests - requests_before) / iterations,
+    }
+
+
+def format_results(results):
+    """
+    Returns results as a text table.
+    """
+    rows = [f"{'benchmark':<28} {'ops':>6} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/op':>8} {'failed':>6}"]
+    for r in results:
+        rows.append(
+            f"{r['name']:<28} {r['iterations']:>6} {r['ops_per_sec']:>10.1f} {r['p50_ms']:>9.2f} "
+            f"{r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['requests_per_op']:>8.1f} {r['failures']:>6}"
+        )
+    return "\n".join(rows)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sites", type=int, default=200, help="sites in the dataset (default: 200)")
+    parser.add_argument("--radios-per-site", type=int, default=10, help="radios per site (default: 10)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra latency as a fraction of --latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a 503 per request (default: 0)")
+    parser.add_argument("--etags", action="store_true", help="serve ETags and answer conditional GETs with 304")
+    parser.add_argument("--iterations", type=int, default=50, help="iterations per benchmark (default: 50)")
+    parser.add_argument("--codec", choices=["auto"] + available_codecs(), default="auto", help="JSON codec of the clients (default: fastest installed)")
+    parser.add_argument("--workers", type=int, default=10, help="connection pool size and concurrency (default: 10)")
+    parser.add_argument("--only", action="append", help="run benchmarks whose name contains this text; repeatable")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"Generating {args.sites} sites x {args.radios_per_site} radios...", file=sys.stderr)
+    dataset = Dataset(sites=args.sites, radios_per_site=args.radios_per_site, seed=args.seed)
+    selected = [b for b in BENCHMARKS if not args.only or any(part in b[0] for part in args.only)]
+    results = []
+    with MockServer(dataset, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, etags=args.etags) as server:
+        client = cnHeat("bench", "bench", base_endpoint=server.base_endpoint, pool_connections=args.workers, pool_maxsize=args.workers, codec=args.codec)
+        async_client = AsyncCnHeat("bench", "bench", base_endpoint=server.base_endpoint, max_connections=args.workers, codec=args.codec)
+        ctx = Context(client, async_client, server, args)
+        for name, fn, iterations in selected:
+            print(f"Running {name}...", file=sys.stderr)
+            results.append(run_benchmark(name, fn, iterations or args.iterations, ctx))
+        ctx.close()
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"options": vars(args), "results": results}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -1,197 +1,378 @@
+import logging
+import threading
+import time
 import requests
 import httpx
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+
+from .aio import AsyncCnHeat
+from .auth import TokenManager
+from .base import BaseClient, radio_name
+from .cache import SQLiteCache
+from .codec import JSONCodec, get_codec
+from .columnar import RadioTable
+from .inventory import InventorySnapshot
+from .jobs import PredictionTracker
+from .metrics import MetricsCollector, RequestEvent, RequestHook
+from .models import Antenna, Model, Prediction, Radio, Site, Subscription, User
+from .ratelimit import RateLimiter, TokenBucket
+from .reconcile import Plan, diff_towers, load_towers, normalize_towers, select_sites
+from .retry import RetryPolicy
+from .singleflight import SingleFlight
+from .store import Collection, ObjectStore
+from .streaming import CHUNK_SIZE, iter_objects
+
+logger = logging.getLogger(__name__)
+
+class cnHeat(BaseClient):
+    REQUEST_ERRORS = requests.RequestException
+    ENCODE_ERROR = requests.exceptions.InvalidJSONError
+    DECODE_ERROR = requests.exceptions.InvalidJSONError
+    BODY_ARG = "data"
+
+    def __init__(self, client_id, client_secret, base_endpoint="https://internal.cnheat.cambiumnetworks.com/api/v1/", pool_connections=10, pool_maxsize=10, pool_block=False, prefetch=False, antenna_ttl=3600, retry=True, rate_limiter=None, background_refresh=False, cache=None, token_cache=None, token_refresh_margin=60, hooks=None, codec=None):
+        """
+        Creates an authenticated client that shares one pooled HTTP session across all calls.
 
-class cnHeat:
-    def __init__(self, client_id, client_secret, base_endpoint="https://internal.cnheat.cambiumnetworks.com/api/v1/"):
-        self.get_antennas = self.AntennaFetcher(self)
-        self.get_site_radios = self.SiteRadiosFetcher(self)
-        self.get_sites = self.SitesFetcher(self)
-        self.get_predictions = self.PredictionsFetcher(self)
-        self.get_users = self.UsersFetcher(self)
-        self.get_subscriptions = self.SubscriptionsFetcher(self)
-        self.client_id = client_id
-        self.client_secret = client_secret
-        self.base_endpoint = base_endpoint
-        self.token = self._authenticate()
-        self.headers = {"Authorization": f"Bearer {self.token}"}
-        self.sites = self.get_sites()
-        self.predictions = self.get_predictions()
-        self.users = self.get_users()
+        Args:
+            client_id (str): API client ID.
+            client_secret (str): API client secret.
+            base_endpoint (str, optional): Base URL of the API.
+            pool_connections (int, optional): Number of per-host connection pools to keep. Defaults to 10.
+            pool_maxsize (int, optional): Maximum keep-alive connections per host. Defaults to 10.
+            pool_block (bool, optional): Block when a host's pool is exhausted instead of
+                opening extra, non-pooled connections. Defaults to False.
+            prefetch (bool, optional): Fetch sites, predictions and users concurrently during
+                construction instead of on first access. Defaults to False.
+            antenna_ttl (float, optional): Seconds to cache each frequency's antenna catalog.
+                None caches until invalidated, 0 disables caching. Defaults to 3600.
+            retry (RetryPolicy or bool, optional): Policy for retrying transient failures.
+                True uses the default RetryPolicy, False disables retries. Defaults to True.
+            rate_limiter (RateLimiter, optional): Client-side rate limiter every request,
+                including retries, waits on. Defaults to None (unlimited).
+            background_refresh (bool, optional): After a mutation is applied to the loaded
+                sites, predictions or users, also refetch that list on a background thread
+                to reconcile with the server. Defaults to False.
+            cache (SQLiteCache, optional): Persistent cache the list fetchers read through.
+                Defaults to None.
+            token_cache (str, optional): File to persist access tokens to, so other processes
+                using the same credentials can reuse them. Defaults to None.
+            token_refresh_margin (float, optional): Seconds before expiry at which the token
+                is renewed. Defaults to 60.
+            hooks (list, optional): Request hooks such as a MetricsCollector; objects with
+                ``before_request(event)`` and/or ``after_request(event)`` methods called
+                with a RequestEvent for every API call, and optionally
+                ``predictions_pending(key, count)``. Defaults to None.
+            codec (str or JSONCodec, optional): JSON implementation used for request and
+                response bodies: "orjson", "msgspec", "json" or a codec object. Defaults
+                to the fastest one installed.
+        """
+        self._setup(client_id, client_secret, base_endpoint, antenna_ttl, retry, rate_limiter, cache, token_cache, token_refresh_margin, hooks, codec, background_refresh)
+        self.pool_maxsize = pool_maxsize
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._export_client = None
+        self._refresh_executor = None
+        self._refresh_lock = threading.Lock()
+        self._ensure_token()
+        if prefetch:
+            self.prefetch()
+
+    @property
+    def token(self):
+        """str: Current access token, renewed shortly before it expires."""
+        return self._ensure_token()
+
+    @property
+    def headers(self):
+        """dict: Authorization headers carrying the current access token."""
+        return {"Authorization": f"Bearer {self._ensure_token()}"}
+
+    @property
+    def sites(self):
+        """list: Sites on the account, fetched on first access; a copy of the stored list."""
+        if not self.store.sites.loaded:
+            self.get_sites()
+        return self._loaded("sites")
+
+    @sites.setter
+    def sites(self, value):
+        self._replace("sites", value)
+
+    @property
+    def predictions(self):
+        """list: Predictions on the account, fetched on first access; a copy of the stored list."""
+        if not self.store.predictions.loaded:
+            self.get_predictions()
+        return self._loaded("predictions")
+
+    @predictions.setter
+    def predictions(self, value):
+        self._replace("predictions", value)
+
+    @property
+    def users(self):
+        """list: Users on the account, fetched on first access; a copy of the stored list."""
+        if not self.store.users.loaded:
+            self.get_users()
+        return self._loaded("users")
+
+    @users.setter
+    def users(self, value):
+        self._replace("users", value)
+
+    def prefetch(self):
+        """
+        Fetches sites, predictions and users concurrently into the object store.
 
-    def _authenticate(self):
-        """
-        Authenticates the client using client_id and client_secret.
-        
-        Returns:
-            str: Access token used for authenticated API requests.
-        
         Raises:
-            RuntimeError: If authentication fails.
+            RuntimeError: If any of the fetches fails.
         """
-        auth_url = f"{self.base_endpoint}oauth/token"
-        data = {"client_id": self.client_id, "client_secret": self.client_secret}
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(self.get_sites), executor.submit(self.get_predictions), executor.submit(self.get_users)]
+            for future in futures:
+                future.result()
+
+    def _schedule_refresh(self, collection):
+        """
+        Queues a background refetch of a collection, coalescing repeated requests.
 
+        Args:
+            collection (str): "sites", "predictions" or "users".
+        """
+        with self._refresh_lock:
+            if collection in self._refresh_pending:
+                return
+            self._refresh_pending.add(collection)
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cnheat-refresh")
+            self._refresh_executor.submit(self._refresh, collection)
+
+    def _refresh(self, collection):
+        with self._refresh_lock:
+            self._refresh_pending.discard(collection)
         try:
-            response = requests.post(auth_url, data=data)
-            response.raise_for_status()
-            return response.json().get("access_token")
-        except requests.RequestException as e:
-            # You could log this in production
-            raise RuntimeError(f"Authentication failed: {e}")
+            self._refresher(collection)()
+        except RuntimeError:
+            getattr(self.store, collection).clear()  # fall back to a lazy reload
+
+    def __enter__(self):
+        return self
 
-    def get_credits(self):
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
         """
-        Retrieves and formats credit information from the API.
-        
-        Returns:
-            dict: A dictionary containing credit types and their quantities.
-        
-        Raises:
-            RuntimeError: If fetching credits fails.
+        Closes the pooled HTTP session and any open export client.
         """
+        if self._refresh_executor is not None:
+            self._refresh_executor.shutdown(wait=True)
+            self._refresh_executor = None
+        self.session.close()
+        if self._export_client is not None:
+            self._export_client.close()
+            self._export_client = None
+
+    def _call(self, error, request, then=None):
         try:
-            response = requests.get(f"{self.base_endpoint}credits", headers=self.headers)
-            response.raise_for_status()
-            credit_data = response.json()
-            return credit_data
+            result = request()
+            return result if then is None else then(result)
         except requests.RequestException as e:
-            raise RuntimeError(f"Failed to fetch credits: {e}")
+            raise RuntimeError(f"{error}: {e}")
 
-    class AntennaFetcher:
-        def __init__(self, outer):
-            self.outer = outer  # Reference to the parent cnHeat instance
+    def _chain(self, result, then):
+        return then(result)
 
-        def __call__(self, freq):
-            """
-            Retrieves antenna options for a specified frequency.
+    def _resolved(self, value):
+        return value
 
-            Args:
-                freq (float): The frequency for which to retrieve antennas.
+    def _collect(self, items, convert):
+        return [convert(item) for item in items]
 
-            Returns:
-                list: A list of antennas available for the specified frequency.
+    def _request(self, method, path, headers=None, idempotent=None, auth=True, cache=None, **kwargs):
+        """
+        Sends a request to the API through the instance's pooled session, pacing it with
+        the rate limiter and retrying transient failures according to the retry policy.
+        An authenticated request rejected with 401 is sent once more with a new token.
 
-            Raises:
-                RuntimeError: If fetching antennas fails.
-            """
-            try:
-                response = requests.get(
-                    f"{self.outer.base_endpoint}antennas",
-                    headers=self.outer.headers,
-                    params={"frequency": freq}
-                )
-                response.raise_for_status()
-                antenna_data = response.json()
-                return antenna_data.get('objects', [])
-            except requests.RequestException as e:
-                raise RuntimeError(f"Failed to fetch antennas: {e}")
+        Args:
+            method (str): HTTP method.
+            path (str): Endpoint path relative to base_endpoint.
+            headers (dict, optional): Extra request headers.
+            idempotent (bool, optional): Whether the request is safe to repeat. Defaults to
+                deciding by HTTP method.
+            auth (bool, optional): Send the access token. Defaults to True.
+            cache (str, optional): Cache outcome reported to hooks, e.g. "miss".
+            **kwargs: Passed through to requests.Session.request; a ``json`` body is
+                encoded with the client's codec.
 
-        def to_dict(self, freq, key=None):
-            """
-            Returns a dictionary of antennas keyed by antenna ID.
+        Returns:
+            requests.Response: The successful response.
 
-            Args:
-                freq (float): The frequency for which to retrieve antennas.
+        Raises:
+            requests.RequestException: If the request fails or returns an error status.
+        """
+        headers = self._encode(headers, kwargs)
+        if not self.hooks:
+            return self._send(method, path, headers, idempotent, auth, None, kwargs)
+        event, started = self._start(method, path, cache)
+        try:
+            response = self._send(method, path, headers, idempotent, auth, event, kwargs)
+            self._succeeded(event, response, kwargs.get("stream"))
+            return response
+        except Exception as e:
+            self._failed(event, e)
+            raise
+        finally:
+            self._finish(event, started)
+
+    def _send(self, method, path, headers, idempotent, auth, event, kwargs):
+        url = f"{self.base_endpoint}{path}"
+        started = time.monotonic()
+        attempt = 0
+        reauthenticated = False
+        while True:
+            attempt += 1
+            request_headers = dict(headers or {})
+            if auth:
+                token = self._ensure_token()
+                request_headers["Authorization"] = f"Bearer {token}"
+            if self.rate_limiter is not None:
+                wait = self.rate_limiter.acquire(method, path)
+                if event is not None:
+                    event.rate_limit_wait += wait
+            try:
+                response = self.session.request(method, url, headers=request_headers, **kwargs)
+            except requests.RequestException as e:
+                if self.retry is None or not isinstance(e, self.retry.exceptions):
+                    raise
+                delay = self._retry_delay(method, attempt, started, idempotent, event)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            if auth and response.status_code == 401 and not reauthenticated:
+                reauthenticated = True
+                attempt -= 1
+                self.auth.invalidate(token)
+                response.close()
+                continue
+            if response.status_code >= 400:
+                delay = self._retry_delay(method, attempt, started, idempotent, event, response)
+                if delay is not None:
+                    response.close()
+                    time.sleep(delay)
+                    continue
+            if kwargs.get("stream") and response.status_code >= 400:
+                response.close()
+            response.raise_for_status()
+            return response
 
-            Returns:
-                dict: A dictionary mapping antenna ID to antenna data.
-            """
-            antennas = self(freq)
-            if key == None:
-                return {a['id']: a for a in antennas if 'id' in a}
-            else:
-                return {a[key]: a for a in antennas if key in a}
+    def _get_json(self, path, params=None, refresh=False):
+        """
+        Fetches a read endpoint and decodes its JSON body, serving it from the persistent
+        cache while the cached copy is fresh.
 
-####### RADIOS ########
+        Stale cached copies, and responses that carried an ETag or Last-Modified header,
+        are revalidated with a conditional request and reused on 304 Not Modified.
+        Concurrent identical requests (same path, parameters and token) share one HTTP
+        request and all receive its decoded body.
 
-    class SiteRadiosFetcher:
-        def __init__(self, outer):
-            self.outer = outer
+        Args:
+            path (str): Endpoint path relative to base_endpoint.
+            params (dict, optional): Query parameters.
+            refresh (bool, optional): Revalidate the cached copy even if it is fresh.
+                Defaults to False.
 
-        def __call__(self, site_id):
-            """
-            Retrieves a list of radios associated with a given site ID.
+        Returns:
+            dict: The decoded response body.
 
-            Args:
-                site_id (str): The ID of the site whose radios are to be retrieved.
+        Raises:
+            requests.RequestException: If the request fails or returns an error status.
+        """
+        cache_key, stored, entry, fresh = self._lookup(path, params, refresh)
+        if fresh:
+            return self._serve(path, cache_key, entry)
+        self._ensure_token()
+        key = self._inflight_key(path, params)
+        return self._inflight.do(key, self._fetch_json, path, params, cache_key, stored, entry)
 
-            Returns:
-                list: A list of radios for the site.
+    def _fetch_json(self, path, params, cache_key, stored, entry):
+        headers = self._conditional_headers(entry)
+        response = self._request("GET", path, headers=headers, cache="miss" if stored or entry is not None else None, params=params)
+        return self._read(path, cache_key, stored, entry, response)
 
-            Raises:
-                RuntimeError: If fetching the radios fails.
-            """
-            try:
-                response = requests.get(
-                    f"{self.outer.base_endpoint}radios/{site_id}",
-                    headers=self.outer.headers
-                )
-                response.raise_for_status()
-                radio_data = response.json()
-                return radio_data.get('objects', [])
-            except requests.RequestException as e:
-                # fallback if site info isn't indexed by ID
-                site_name = site_id
-                for s in self.outer.sites:
-                    if s['id'] == site_id:
-                        site_name = s['name']
-                raise RuntimeError(f"Failed to fetch {site_name} radios: {e}")
+    def _iter_objects(self, path, error, params=None):
+        """
+        Streams the ``objects`` array of a list endpoint, yielding items as they are parsed.
 
-        def to_dict(self, site_id, key=None):
-            """
-            Returns radios for a site as a dictionary keyed by radio ID.
+        Only the item being parsed and one network chunk are held in memory. Streamed
+        responses bypass the response caches, request coalescing and the object store.
 
-            Args:
-                site_id (str): The ID of the site.
+        Args:
+            path (str): Endpoint path relative to base_endpoint.
+            error (str): Message prefix of the RuntimeError raised on failure.
+            params (dict, optional): Query parameters.
 
-            Returns:
-                dict: Dictionary of radios by ID.
-            """
-            radios = self(site_id)
-            if key == None:
-                return {r['id']: r for r in radios if 'id' in r}
-            else:
-                return {r[key]: r for r in radios if key in r}
+        Yields:
+            dict: The listed objects, in order.
 
-    def get_radio(self, radio_id):
+        Raises:
+            RuntimeError: If the request fails or the body is not valid JSON.
         """
-        Retrieves details for a specific radio by its ID.
+        try:
+            response = self._request("GET", path, params=params, stream=True)
+            try:
+                yield from iter_objects(response.iter_content(CHUNK_SIZE), codec=self.codec)
+            finally:
+                response.close()
+        except (requests.RequestException, ValueError) as e:
+            raise RuntimeError(f"{error}: {e}")
 
-        Args:
-            radio_id (str): The ID of the radio to retrieve.
+    def _ensure_token(self):
+        """
+        Returns a usable access token, reusing a cached one when possible and
+        authenticating when it is missing or about to expire.
 
         Returns:
-            dict: The response from the API containing radio details.
+            str: Access token used for authenticated API requests.
 
         Raises:
-            RuntimeError: If fetching the radio fails.
+            RuntimeError: If authentication fails.
         """
-        try:
-            response = requests.get(f"{self.base_endpoint}radio/{radio_id}", headers=self.headers)
-            response.raise_for_status()
-            return response.json() 
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to fetch radio: {e}")
+        auth = self.auth
+        if auth.valid():
+            return auth.token
+        with auth.lock:
+            if not auth.valid() and not auth.load():
+                self._authenticate()
+            return auth.token
 
-    def delete_radio(self, radio_id):
-            """
-            Deletes a specific radio by its ID.
-
-            Args:
-                radio_id (str): The ID of the radio to delete.
+    def _authenticate(self):
+        """
+        Authenticates the client using client_id and client_secret and records the
+        token's expiry.
+        
+        Returns:
+            str: Access token used for authenticated API requests.
+        
+        Raises:
+            RuntimeError: If authentication fails.
+        """
+        data = {"client_id": self.client_id, "client_secret": self.client_secret}
 
-            Returns:
-                dict: The response from the API containing radio deletion details.
+        try:
+            response = self._request("POST", "oauth/token", idempotent=True, auth=False, data=data)
+            return self.auth.update(self._decode(response.content))
+        except requests.RequestException as e:
+            # You could log this in production
+            raise RuntimeError(f"Authentication failed: {e}")
 
-            Raises:
-                RuntimeError: If deleting the radio fails.
-            """
-            try:
-                response = requests.delete(f"{self.base_endpoint}radio/{radio_id}", headers=self.headers)
-                response.raise_for_status()
-                return response.json() 
-            except requests.RequestException as e:
-                raise RuntimeError(f"Failed to delete radio: {e}")
+####### RADIOS ########
 
     def create_radio(self, site_id, freq, antennaId, azimuth, aglHeightMeters=20, radioName=None, foliageTuning=-1, arHeightMeters=0, radiusMeters=12875, smGain=18.5, tilt=-2, txClearanceMeters=30, txPowerDbm=27.2):
         """
@@ -216,493 +397,255 @@ class cnHeat:
             dict: The response from the API after radio creation.
         
         Raises:
-            RuntimeError: If radio creation fails.
+            RuntimeError: If radio creation fails, or if radioName is not given and the
+                site doesn't exist.
         """
-        try:
-            antennas = self.get_antennas(freq)
-            sites = self.get_sites()
-            if radioName is None:
-                site_name = next((s['name'] for s in sites if s['id'] == site_id), "UnknownSite")
-                antenna_name = next((a['antenna'] for a in antennas if a['id'] == antennaId), "UnknownAntenna")
-                radioName = f"""AP-{antenna_name.split("-")[0]}-{azimuth}-{str(freq).split(".")[0]} GHZ.{site_name.upper()}"""
-            data = {
-                "antenna": antennaId,
-                "name": radioName,
-                "azimuth": azimuth,
-                "foliage_tuning": foliageTuning,
-                "frequency(ghz)": freq,
-                "height(m)": aglHeightMeters,
-                "height_rooftop(m)": arHeightMeters,
-                "radius(m)": radiusMeters,
-                "sm_gain(dbi)": smGain,
-                "tilt": tilt,
-                "txclearance(m)": txClearanceMeters,
-                "txpower(dbm)": txPowerDbm
-            }
-            response = requests.post(f"{self.base_endpoint}radio/{site_id}", headers=self.headers, json=data)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to create radio: {e}") 
+        if radioName is None:
+            radioName = radio_name(self._find_site(site_id), self.get_antennas.get(freq, antennaId), freq, azimuth)
+        data = self._radio_data(freq, antennaId, azimuth, aglHeightMeters, radioName, foliageTuning, arHeightMeters, radiusMeters, smGain, tilt, txClearanceMeters, txPowerDbm)
+        return self._post_radio(site_id, data)
 
-    def update_radio(self, radio_id, data):
+    def create_radios(self, specs, max_workers=None):
         """
-        Updates an existing radio with only the fields provided in the `data` dictionary.
-    
-        Args:
-            radio_id (str): The ID of the radio to update.
-            data (dict): Dictionary of fields to update. Only these fields will be patched.
-                Valid keys include:
-                    - "frequency(ghz)" (float): Frequency in GHz
-                    - "antenna" (str): Antenna ID
-                    - "azimuth" (float): Azimuth angle
-                    - "height(m)" (float): Height above ground level in meters
-                    - "name" (str or None): Radio name
-                    - "foliage_tuning" (float): Foliage tuning value
-                    - "height_rooftop(m)" (float): Rooftop height in meters
-                    - "radius(m)" (float): Coverage radius in meters
-                    - "sm_gain(dbi)" (float): Subscriber module gain in dBi
-                    - "tilt" (float): Antenna tilt value
-                    - "txclearance(m)" (float): TX clearance in meters
-                    - "txpower(dbm)" (float): TX power in dBm
-    
-        Returns:
-            dict: API response after updating the radio.
-    
-        Raises:
-            RuntimeError: If the radio update fails.
-        """
-        try:
-
-            response = requests.patch(
-                f"{self.base_endpoint}radio/{radio_id}",
-                headers=self.headers,
-                json=data
-            )
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to update radio: {e}")
-
-####### SITES ########
-
-    class SitesFetcher:
-        def __init__(self, outer):
-            self.outer = outer
-
-        def __call__(self):
-            """
-            Fetches a list of sites and their metadata from the API.
+        Creates many radios concurrently over the shared connection pool.
 
-            Returns:
-                list: A list of site objects.
+        Site and antenna lookups needed for default names are warmed once up front, and a
+        failing item does not abort the rest of the batch.
 
-            Raises:
-                RuntimeError: If fetching sites fails.
-            """
-            try:
-                response = requests.get(
-                    f"{self.outer.base_endpoint}sites",
-                    headers=self.outer.headers
-                )
-                response.raise_for_status()
-                site_data = response.json()
-                return site_data.get('objects', [])
-            except requests.RequestException as e:
-                raise RuntimeError(f"Failed to fetch sites: {e}")
-
-        def to_dict(self, key):
-            """
-            Returns sites as a dictionary keyed by site ID.
-
-            Returns:
-                dict: Dictionary of sites by ID.
-            """
-            sites = self()
-            if key == None:
-                return {s['id']: s for s in sites if 'id' in s}
-            else:
-                return {s[key]: s for s in sites if key in s}
-
-    def rename_site(self, site_id, name):
-        """
-        Updates a new site with specified details.
-        
         Args:
-            name (str): The name of the site.
-        
-        Returns:
-            dict: The response from the API after site update.
-        
-        Raises:
-            RuntimeError: If site update fails.
-            """
-        try:
-            data = {
-                "name": name,
-            }
-            response = requests.patch(f"{self.base_endpoint}site/{site_id}", headers=self.headers, json=data)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to update site: {e}")
+            specs (iterable): Dictionaries of create_radio keyword arguments, e.g.
+                ``{"site_id": ..., "freq": 5.8, "antennaId": ..., "azimuth": 90}``.
+            max_workers (int, optional): Maximum concurrent requests. Defaults to the
+                connection pool size.
 
-    def create_site(self, name, lat, lon, credit_id):
-        """
-        Creates a new site with specified details.
-        
-        Args:
-            name (str): The name of the site.
-            lat (float): The latitude of the site.
-            lon (float): The longitude of the site.
-            credit_id (str): The ID of the credit to associate with the site.
-        
         Returns:
-            dict: The response from the API after site creation.
-        
-        Raises:
-            RuntimeError: If site creation fails.
+            list: One dictionary per spec, in input order, with keys "spec", "result"
+                (API response or None) and "error" (exception or None).
         """
+        specs = list(specs)
         try:
-            data = {
-                "name": name,
-                "lat": lat,
-                "lon": lon,
-                "credits": credit_id
-            }
-            response = requests.post(f"{self.base_endpoint}sites", headers=self.headers, json=data)
-            response.raise_for_status()
-            self.sites = self.get_sites()
-            return response.json()
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to create site: {e}")
-
-####### PREDICTIONS ########
-        
-    class PredictionsFetcher:
-        def __init__(self, outer):
-            self.outer = outer
-
-        def __call__(self):
-            """
-            Fetches a list of predictions from the API.
-
-            Returns:
-                list: A list of prediction objects.
-
-            Raises:
-                RuntimeError: If fetching predictions fails.
-            """
-            try:
-                response = requests.get(
-                    f"{self.outer.base_endpoint}predictions",
-                    headers=self.outer.headers
-                )
-                response.raise_for_status()
-                return response.json().get('objects', [])
-            except requests.RequestException as e:
-                raise RuntimeError(f"Failed to fetch predictions: {e}")
-
-        def to_dict(self, key=None):
-            """
-            Returns predictions as a dictionary keyed by prediction ID.
-
-            Returns:
-                dict: Dictionary of predictions by ID.
-            """
-            predictions = self()
-            if key == None:
-                return {p['id']: p for p in predictions if 'id' in p}
-            else:
-                return {p[key]: p for p in predictions if key in p}
-
-    def create_eval_prediction(self, prediction_name, radio_id_list, install_height, install_reference):
-        """
-        Creates a prediction using a list of radio IDs.
+            if any(spec.get("radioName") is None for spec in specs) and not self.store.sites.loaded:
+                self.get_sites()
+            for freq in self._unnamed_frequencies(specs):
+                self.get_antennas(freq)
+        except RuntimeError:
+            pass  # surfaced per item by create_radio
+        results = [{"spec": spec, "result": None, "error": None} for spec in specs]
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_maxsize) as executor:
+            futures = {executor.submit(self.create_radio, **spec): item for spec, item in zip(specs, results)}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    item["result"] = future.result()
+                except Exception as e:
+                    item["error"] = e
+        return results
+
+    def _find_site(self, site_id):
+        """
+        Looks up a site by ID in the cached site list. A site missing from a previously
+        loaded copy triggers one refetch; IDs still missing afterwards are remembered for
+        MISSING_SITE_TTL seconds, so a batch naming an unknown site doesn't refetch the
+        list for every item.
 
         Args:
-            prediction_name (str): Name of the prediction.
-            radio_id_list (list): List of radio IDs to include.
-            install_height: CPE height above reference.
-            install_reference: Ground or Roof
+            site_id (str): The ID of the site.
 
         Returns:
-            dict: The API response with the new prediction details.
+            dict: The site.
 
         Raises:
-            RuntimeError: If creating prediction fails.
+            RuntimeError: If the account has no such site or fetching the sites fails.
         """
-        data = {
-            "name":prediction_name,
-            "radio_list":radio_id_list,
-            "install_height":install_height,
-            "install_reference":install_reference
-        }
-        try:
-            response = requests.post(f"{self.base_endpoint}predictions", headers=self.headers, json=data)
-            response.raise_for_status()
-            self.predictions = self.get_predictions()
-            return response.json() 
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to create predicition: {e}")
-    
-        
-    def create_prediction(self, prediction_name, radio_id_list):
-        """
-        Creates a prediction using a list of radio IDs.
+        sites = self.store.sites
+        if not sites.loaded or (site_id not in sites and self._recheck_site(site_id)):
+            self.get_sites()
+        return self._known_site(site_id)
 
-        Args:
-            prediction_name (str): Name of the prediction.
-            radio_id_list (list): List of radio IDs to include.
+####### INVENTORY ########
 
-        Returns:
-            dict: The API response with the new prediction details.
-
-        Raises:
-            RuntimeError: If creating prediction fails.
-        """
-        data = {
-            "name":prediction_name,
-            "radio_list":radio_id_list
-        }
-        try:
-            response = requests.post(f"{self.base_endpoint}predictions", headers=self.headers, json=data)
-            response.raise_for_status()
-            self.predictions = self.get_predictions()
-            return response.json() 
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to create predicition: {e}")
-        
-    def get_predictions_statuses(self):
+    def inventory_snapshot(self, max_workers=None, progress=None, sites=None):
         """
-        Retrieves prediction job statuses from the API.
+        Fetches every site, or the given ones, and the radios of each site concurrently.
 
-        Returns:
-            list: A list of prediction status objects.
-
-        Raises:
-            RuntimeError: If fetching statuses fails.
-        """
-        try:
-            response = requests.get(f"{self.base_endpoint}predictions/jobmanagement", headers=self.headers)
-            response.raise_for_status()
-            predictions_statuses = response.json().get('objects', [])
-            return predictions_statuses
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to fetch predicition statuses: {e}")
-
-    def rename_prediction(self, prediction_id, new_name):
-        """
-        Renames a prediction by its ID.
+        Per-site failures are recorded on the snapshot instead of aborting the run.
 
         Args:
-            prediction_id (str): ID of the prediction.
-            new_name (str): New name for the prediction.
+            max_workers (int, optional): Maximum concurrent radio fetches. Defaults to the
+                connection pool size so every worker can reuse a pooled connection.
+            progress (callable, optional): Called as ``progress(done, total, site_id, error)``
+                after each site finishes; ``error`` is None on success.
+            sites (list, optional): Site objects to snapshot. Defaults to fetching every site.
 
         Returns:
-            dict: API response after renaming.
+            InventorySnapshot: Sites and their radios indexed by ID.
 
         Raises:
-            RuntimeError: If renaming fails.
+            RuntimeError: If fetching the site list fails.
         """
-        data = {
-            "name":new_name,
-        }
-        try:
-            response = requests.patch(f"{self.base_endpoint}prediction/{prediction_id}/rename", headers=self.headers, json=data)
-            response.raise_for_status()
-            return response.json() 
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to rename predicition: {e}")
-        
-    def delete_prediction(self, prediction_id):
+        taken_at = time.time()
+        snapshot = InventorySnapshot(self.get_sites() if sites is None else sites, taken_at)
+        total = len(snapshot.sites)
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_maxsize) as executor:
+            futures = {executor.submit(self.get_site_radios, site_id): site_id for site_id in snapshot.sites}
+            for done, future in enumerate(as_completed(futures), 1):
+                site_id = futures[future]
+                error = future.exception()
+                snapshot.add(site_id, radios=None if error else future.result(), error=error)
+                if progress is not None:
+                    progress(done, total, site_id, error)
+        return snapshot
+
+    def plan_towers(self, desired, prune=True, max_workers=None):
         """
-        Deletes a prediction by its ID.
+        Compares a desired tower layout with the account and plans the API calls needed
+        to reach it, without changing anything.
+
+        The site list and the radios of every referenced site are fetched once. Print the
+        returned plan for a dry run, or pass it to apply_plan().
 
         Args:
-            prediction_id (str): ID of the prediction to delete.
+            desired (dict, list or str): Desired state (see reconcile.normalize_towers) or
+                the path of a YAML/JSON file holding it.
+            prune (bool, optional): Delete radios the spec does not mention, unless a site
+                sets its own ``prune`` flag. Defaults to True.
+            max_workers (int, optional): Maximum concurrent radio fetches. Defaults to the
+                connection pool size.
 
         Returns:
-            dict: API response after deletion.
+            Plan: Site renames and radio creates, updates and deletes to apply.
 
         Raises:
-            RuntimeError: If deletion fails.
+            ValueError: If the spec is invalid or refers to an unknown site.
+            RuntimeError: If fetching the current state fails.
         """
-        try:
-            response = requests.delete(f"{self.base_endpoint}prediction/{prediction_id}", headers=self.headers)
-            response.raise_for_status()
-            self.predictions = self.get_predictions()
-            return response.json() 
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to delete predicition: {e}")
+        towers = load_towers(desired) if isinstance(desired, str) else normalize_towers(desired)
+        sites = self.get_sites()
+        snapshot = self.inventory_snapshot(max_workers=max_workers, sites=select_sites(towers, sites))
+        return diff_towers(towers, snapshot, prune=prune)
 
-####### USERS ########
-
-    class UsersFetcher:
-        def __init__(self, outer):
-            self.outer = outer
-
-        def __call__(self):
-            """
-            Retrieves a list of users from the API.
-
-            Returns:
-                list: A list of user objects.
-
-            Raises:
-                RuntimeError: If the request fails.
-            """
-            try:
-                response = requests.get(
-                    f"{self.outer.base_endpoint}users",
-                    headers=self.outer.headers
-                )
-                response.raise_for_status()
-                return response.json().get('objects', [])
-            except requests.RequestException as e:
-                raise RuntimeError(f"Failed to get users: {e}")
-
-        def to_dict(self, key=None):
-            """
-            Returns users as a dictionary keyed by user ID.
-
-            Returns:
-                dict: Dictionary of users by ID.
-            """
-            users = self()
-            if key == None:
-                return {u['email']: u for u in users if 'email' in u}
-            else:
-                return {u[key]: u for u in users if key in u}
-        
-    def add_user(self, email, role):
+    def apply_plan(self, plan, max_workers=None):
         """
-        Adds a new user with a specified role.
+        Applies a plan from plan_towers().
+
+        Renames, updates and deletes run concurrently, followed by the creates. A failing
+        action does not stop the others; its error is recorded on the action.
 
         Args:
-            email (str): Email of the user.
-            role (str): Role or permission level.
+            plan (Plan): The plan to apply.
+            max_workers (int, optional): Maximum concurrent requests. Defaults to the
+                connection pool size.
 
         Returns:
-            dict: API response after user is added.
-
-        Raises:
-            RuntimeError: If adding the user fails.
+            Plan: The same plan, with ``result`` and ``error`` set on every action.
         """
-        data = {
-            "email":email,
-            "permission":role,
-        }
         try:
-            response = requests.post(f"{self.base_endpoint}users", headers=self.headers, json=data)
-            response.raise_for_status()
-            self.users = self.get_users()
-            return response.json()
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to add user: {e}")
-        
-    def delete_user(self, email):
-        """
-        Deletes a user based on email.
+            for freq in {a.data["frequency(ghz)"] for a in plan if a.kind == "create_radio" and a.data.get("name") is None}:
+                self.get_antennas(freq)
+        except RuntimeError:
+            pass  # surfaced per action by create_radio
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_maxsize) as executor:
+            for batch in plan.phases():
+                futures = {executor.submit(action.call, self): action for action in batch}
+                for future in as_completed(futures):
+                    action = futures[future]
+                    try:
+                        action.result = future.result()
+                    except Exception as e:
+                        action.error = e
+        plan.applied = True
+        return plan
+
+    def reconcile(self, desired, prune=True, dry_run=False, max_workers=None):
+        """
+        Brings the account in line with a desired tower layout using the fewest API calls.
 
         Args:
-            email (str): Email of the user to delete.
+            desired (dict, list or str): Desired state or the path of a YAML/JSON file.
+            prune (bool, optional): Delete radios the spec does not mention. Defaults to True.
+            dry_run (bool, optional): Only plan, don't apply. Defaults to False.
+            max_workers (int, optional): Maximum concurrent requests. Defaults to the
+                connection pool size.
 
         Returns:
-            dict: API response after deletion.
-
-        Raises:
-            RuntimeError: If deletion fails.
+            Plan: The planned actions, applied unless ``dry_run`` is set.
         """
-        data = {
-            "email":email
-        }
-        try:
-            response = requests.delete(f"{self.base_endpoint}user", headers=self.headers, json=data)
-            response.raise_for_status()
-            self.users = self.get_users()
-            return response.json()
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to delete user: {e}")
-
-####### SUBSCRIPTIONS ########
+        plan = self.plan_towers(desired, prune=prune, max_workers=max_workers)
+        if not dry_run:
+            self.apply_plan(plan, max_workers=max_workers)
+        return plan
 
-    class SubscriptionsFetcher:
-        def __init__(self, outer):
-            self.outer = outer
-
-        def __call__(self):
-            """
-            Retrieves a list of active subscriptions.
-
-            Returns:
-                list: A list of subscription objects.
+####### PREDICTIONS ########
 
-            Raises:
-                RuntimeError: If fetching subscriptions fails.
-            """
-            try:
-                response = requests.get(
-                    f"{self.outer.base_endpoint}subscriptions",
-                    headers=self.outer.headers
-                )
-                response.raise_for_status()
-                return response.json().get('objects', [])
-            except requests.RequestException as e:
-                raise RuntimeError(f"Failed to get subscriptions: {e}")
-
-        def to_dict(self, key=None):
-            """
-            Returns subscriptions as a dictionary keyed by subscription ID.
-
-            Returns:
-                dict: Dictionary of subscriptions by ID.
-            """
-            subscriptions = self()
-            if key == None:
-                return {s['id']: s for s in subscriptions if 'id' in s}
-            else:
-                return {s[key]: s for s in subscriptions if key in s}
-        
-    def renew_subscriptions(self, site_id):
+    def wait_for_predictions(self, prediction_ids, timeout=None, poll_interval=2.0, max_interval=30.0, callback=None, block=True):
         """
-        Renews a subscription for a given site.
+        Waits for prediction jobs to finish, polling the jobmanagement endpoint once per
+        tick for all of them and backing off while nothing changes.
 
         Args:
-            site_id (str): ID of the site.
+            prediction_ids (iterable): IDs of the predictions to wait for.
+            timeout (float, optional): Seconds to wait in total. Defaults to no limit.
+            poll_interval (float, optional): Shortest wait between polls. Defaults to 2.
+            max_interval (float, optional): Longest wait between polls. Defaults to 30.
+            callback (callable, optional): Called as ``callback(prediction_id, job)`` as each
+                job finishes.
+            block (bool, optional): Wait in the calling thread. If False, poll on a background
+                thread and return futures immediately. Defaults to True.
+
+        Predictions missing from the first poll of the jobmanagement endpoint are looked up
+        in the prediction list: those that exist have already finished and resolve to the
+        prediction object, the others fail with RuntimeError.
 
         Returns:
-            dict: API response after renewal.
+            dict: If block is True, the final job status object of each prediction keyed by
+                ID. Otherwise a concurrent.futures.Future per prediction ID that resolves to
+                that object.
 
         Raises:
-            RuntimeError: If renewal fails.
+            TimeoutError: If blocking and some jobs are still running after timeout.
+            RuntimeError: If blocking and fetching statuses fails or a prediction doesn't exist.
+            Exception: If blocking, whatever the callback raises.
         """
-        try:
-            response = requests.patch(f"{self.base_endpoint}subscription/{site_id}/renew", headers=self.headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to renew subscription: {e}")
-        
-    def terminate_subscription(self, site_id):
-        """
-        Terminates a subscription for a given site.
-
-        Args:
-            site_id (str): ID of the site.
-
-        Returns:
-            dict: API response after termination.
+        tracker = PredictionTracker(prediction_ids, poll_interval, max_interval)
+        futures = {prediction_id: Future() for prediction_id in tracker.pending}
 
-        Raises:
-            RuntimeError: If termination fails.
-        """
-        try:
-            response = requests.patch(f"{self.base_endpoint}subscription/{site_id}/terminate", headers=self.headers)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            raise RuntimeError(f"Failed to terminate subscription: {e}")
+        def poll():
+            deadline = None if timeout is None else time.monotonic() + timeout
+            try:
+                while not tracker.done:
+                    self._emit("predictions_pending", id(tracker), len(tracker.pending))
+                    finished = tracker.update(self.get_predictions_statuses())
+                    if tracker.polls == 1 and tracker.unlisted():
+                        resolved, missing = tracker.resolve_unlisted(self.get_predictions())
+                        finished += resolved
+                        for prediction_id in missing:
+                            futures[prediction_id].set_exception(RuntimeError(f"Prediction {prediction_id} not found"))
+                    # resolve every future before running callbacks, which may raise
+                    for prediction_id, job in finished:
+                        futures[prediction_id].set_result(job)
+                    if callback is not None:
+                        for prediction_id, job in finished:
+                            callback(prediction_id, job)
+                    if tracker.done:
+                        break
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise TimeoutError(f"Timed out waiting for predictions: {sorted(tracker.pending)}")
+                    time.sleep(tracker.next_delay(deadline))
+            except Exception as e:
+                for future in futures.values():
+                    if not future.done():
+                        future.set_exception(e)
+                if block:
+                    raise
+            finally:
+                self._emit("predictions_pending", id(tracker), 0)
+
+        if not block:
+            threading.Thread(target=poll, name="cnheat-prediction-waiter", daemon=True).start()
+            return futures
+        poll()
+        return {prediction_id: future.result() for prediction_id, future in futures.items()}
+####### EXPORTS ########
 
     def create_site_export(self, tower_name, service_id, auth_token, project_id, providerid, technology_code, cpe_heigth_meters):
         """
@@ -718,8 +661,13 @@ class cnHeat:
         Returns:
             None. Prints the response from the export endpoint.
         """
-        heatsites = self.get_sites.to_dict("name")
-        radios = self.get_site_radios(heatsites[tower_name]['id'])
+        site = self.store.sites.first("name", tower_name)
+        if site is None:
+            self.get_sites()
+            site = self.store.sites.first("name", tower_name)
+            if site is None:
+                raise KeyError(tower_name)
+        radios = self.get_site_radios(site['id'])
     
         sl_mappings = [[service_id, r["id"]] for r in radios]
     
@@ -759,8 +707,10 @@ class cnHeat:
             'user-agent': 'Mozilla/5.0'
         }
 
-        with httpx.Client(http2=True) as client:
-            response = client.post(url, headers=headers, json=payload)
-            print("Status Code:", response.status_code)
-            print("Response:", response.text)
+        if self._export_client is None:
+            limits = httpx.Limits(max_connections=self.pool_maxsize, max_keepalive_connections=self.pool_maxsize)
+            self._export_client = httpx.Client(http2=True, limits=limits)
+        response = self._export_client.post(url, headers=headers, json=payload)
+        print("Status Code:", response.status_code)
+        print("Response:", response.text)
 
@@ -0,0 +1,586 @@
+import asyncio
+import logging
+import time
+
+import httpx
+
+from .base import BaseClient, radio_name
+from .inventory import InventorySnapshot
+from .jobs import PredictionTracker
+from .reconcile import diff_towers, load_towers, normalize_towers, select_sites
+from .streaming import aiter_objects
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCnHeat(BaseClient):
+    REQUEST_ERRORS = httpx.HTTPError
+    ENCODE_ERROR = httpx.RequestError
+    DECODE_ERROR = httpx.DecodingError
+    BODY_ARG = "content"
+
+    def __init__(self, client_id, client_secret, base_endpoint="https://internal.cnheat.cambiumnetworks.com/api/v1/", max_connections=100, max_keepalive_connections=20, http2=False, antenna_ttl=3600, retry=True, rate_limiter=None, background_refresh=False, cache=None, token_cache=None, token_refresh_margin=60, hooks=None, codec=None):
+        """
+        Creates an asyncio client for the cnHeat API built on one shared httpx.AsyncClient.
+
+        The client authenticates on first use, or when entered with ``async with``. It
+        shares the object store, caches and mutators of cnHeat; every API method is a
+        coroutine, and the ``sites``, ``predictions`` and ``users`` attributes are None
+        until loaded by a fetcher or prefetch().
+
+        Args:
+            client_id (str): API client ID.
+            client_secret (str): API client secret.
+            base_endpoint (str, optional): Base URL of the API.
+            max_connections (int, optional): Maximum concurrent connections. Defaults to 100.
+            max_keepalive_connections (int, optional): Maximum idle keep-alive connections. Defaults to 20.
+            http2 (bool, optional): Negotiate HTTP/2 (requires the ``h2`` package). Defaults to False.
+            antenna_ttl (float, optional): Seconds to cache each frequency's antenna catalog.
+                None caches until invalidated, 0 disables caching. Defaults to 3600.
+            retry (RetryPolicy or bool, optional): Policy for retrying transient failures.
+                True uses the default RetryPolicy, False disables retries. Defaults to True.
+            rate_limiter (RateLimiter, optional): Client-side rate limiter every request,
+                including retries, waits on. Defaults to None (unlimited).
+            background_refresh (bool, optional): After a mutation is applied to the loaded
+                sites, predictions or users, also refetch that list in a background task
+                to reconcile with the server. Defaults to False.
+            cache (SQLiteCache, optional): Persistent cache the list fetchers read through.
+                Defaults to None.
+            token_cache (str, optional): File to persist access tokens to, so other processes
+                using the same credentials can reuse them. Defaults to None.
+            token_refresh_margin (float, optional): Seconds before expiry at which the token
+                is renewed. Defaults to 60.
+            hooks (list, optional): Request hooks such as a MetricsCollector; objects with
+                ``before_request(event)`` and/or ``after_request(event)`` methods called
+                with a RequestEvent for every API call, and optionally
+                ``predictions_pending(key, count)``. Defaults to None.
+            codec (str or JSONCodec, optional): JSON implementation used for request and
+                response bodies: "orjson", "msgspec", "json" or a codec object. Defaults
+                to the fastest one installed.
+        """
+        self._setup(client_id, client_secret, base_endpoint, antenna_ttl, retry, rate_limiter, cache, token_cache, token_refresh_margin, hooks, codec, background_refresh)
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+        self.client = httpx.AsyncClient(limits=limits, http2=http2)
+        self._auth_lock = None
+        self._refresh_tasks = set()
+
+    async def __aenter__(self):
+        await self.authenticate()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Waits for pending background refreshes and closes the underlying HTTP client.
+        """
+        if self._refresh_tasks:
+            await asyncio.gather(*self._refresh_tasks, return_exceptions=True)
+        await self.client.aclose()
+
+    @property
+    def token(self):
+        """str: Current access token, or None before the client has authenticated."""
+        return self.auth.token
+
+    @property
+    def headers(self):
+        """dict: Authorization headers carrying the current access token."""
+        return {"Authorization": f"Bearer {self.auth.token}"} if self.auth.token else {}
+
+    @property
+    def sites(self):
+        """list: Sites on the account as a copy of the stored list, or None until loaded."""
+        return self._loaded("sites")
+
+    @sites.setter
+    def sites(self, value):
+        self._replace("sites", value)
+
+    @property
+    def predictions(self):
+        """list: Predictions on the account as a copy of the stored list, or None until loaded."""
+        return self._loaded("predictions")
+
+    @predictions.setter
+    def predictions(self, value):
+        self._replace("predictions", value)
+
+    @property
+    def users(self):
+        """list: Users on the account as a copy of the stored list, or None until loaded."""
+        return self._loaded("users")
+
+    @users.setter
+    def users(self, value):
+        self._replace("users", value)
+
+    async def prefetch(self):
+        """
+        Fetches sites, predictions and users concurrently into the object store.
+
+        Raises:
+            RuntimeError: If any of the fetches fails.
+        """
+        await asyncio.gather(self.get_sites(), self.get_predictions(), self.get_users())
+
+    def _schedule_refresh(self, collection):
+        """
+        Starts a background refetch of a collection, coalescing repeated requests.
+
+        Args:
+            collection (str): "sites", "predictions" or "users".
+        """
+        if collection in self._refresh_pending:
+            return
+        self._refresh_pending.add(collection)
+        task = asyncio.get_running_loop().create_task(self._refresh(collection))
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _refresh(self, collection):
+        self._refresh_pending.discard(collection)
+        try:
+            await self._refresher(collection)()
+        except RuntimeError:
+            getattr(self.store, collection).clear()  # fall back to a reload on next use
+
+    async def _call(self, error, request, then=None):
+        try:
+            result = await request()
+            return result if then is None else then(result)
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"{error}: {e}")
+
+    async def _chain(self, result, then):
+        return then(await result)
+
+    async def _resolved(self, value):
+        return value
+
+    async def _collect(self, items, convert):
+        return [convert(item) async for item in items]
+
+    async def _request(self, method, path, headers=None, idempotent=None, auth=True, cache=None, **kwargs):
+        """
+        Sends a request to the API through the shared async client, pacing it with the
+        rate limiter and retrying transient failures according to the retry policy.
+        An authenticated request rejected with 401 is sent once more with a new token.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Endpoint path relative to base_endpoint.
+            headers (dict, optional): Extra request headers.
+            idempotent (bool, optional): Whether the request is safe to repeat. Defaults to
+                deciding by HTTP method.
+            auth (bool, optional): Send the access token. Defaults to True.
+            cache (str, optional): Cache outcome reported to hooks, e.g. "miss".
+            **kwargs: Passed through to httpx.AsyncClient.build_request; a ``json`` body is
+                encoded with the client's codec and ``stream=True`` returns the response
+                with its body unread.
+
+        Returns:
+            httpx.Response: The successful response.
+
+        Raises:
+            httpx.HTTPError: If the request fails or returns an error status.
+        """
+        headers = self._encode(headers, kwargs)
+        if not self.hooks:
+            return await self._send(method, path, headers, idempotent, auth, None, kwargs)
+        event, started = self._start(method, path, cache)
+        try:
+            response = await self._send(method, path, headers, idempotent, auth, event, kwargs)
+            self._succeeded(event, response, kwargs.get("stream"))
+            return response
+        except Exception as e:
+            self._failed(event, e)
+            raise
+        finally:
+            self._finish(event, started)
+
+    async def _send(self, method, path, headers, idempotent, auth, event, kwargs):
+        url = f"{self.base_endpoint}{path}"
+        kwargs = dict(kwargs)
+        stream = kwargs.pop("stream", False)
+        started = time.monotonic()
+        attempt = 0
+        reauthenticated = False
+        while True:
+            attempt += 1
+            request_headers = dict(headers or {})
+            if auth:
+                token = await self.authenticate()
+                request_headers["Authorization"] = f"Bearer {token}"
+            if self.rate_limiter is not None:
+                wait = await self.rate_limiter.acquire_async(method, path)
+                if event is not None:
+                    event.rate_limit_wait += wait
+            try:
+                request = self.client.build_request(method, url, headers=request_headers, **kwargs)
+                response = await self.client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                if self.retry is None or not isinstance(e, self.retry.exceptions):
+                    raise
+                delay = self._retry_delay(method, attempt, started, idempotent, event)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            if auth and response.status_code == 401 and not reauthenticated:
+                reauthenticated = True
+                attempt -= 1
+                self.auth.invalidate(token)
+                await response.aclose()
+                continue
+            if response.status_code >= 400:
+                delay = self._retry_delay(method, attempt, started, idempotent, event, response)
+                if delay is not None:
+                    await response.aclose()
+                    await asyncio.sleep(delay)
+                    continue
+            if stream and response.status_code >= 400:
+                await response.aclose()
+            if response.status_code != 304:  # httpx treats Not Modified as an error
+                response.raise_for_status()
+            return response
+
+    async def _get_json(self, path, params=None, refresh=False):
+        """
+        Fetches a read endpoint and decodes its JSON body, serving it from the persistent
+        cache while the cached copy is fresh.
+
+        Stale cached copies, and responses that carried an ETag or Last-Modified header,
+        are revalidated with a conditional request and reused on 304 Not Modified.
+        Concurrent identical requests (same path, parameters and token) share one HTTP
+        request and all receive its decoded body.
+
+        Args:
+            path (str): Endpoint path relative to base_endpoint.
+            params (dict, optional): Query parameters.
+            refresh (bool, optional): Revalidate the cached copy even if it is fresh.
+                Defaults to False.
+
+        Returns:
+            dict: The decoded response body.
+
+        Raises:
+            httpx.HTTPError: If the request fails or returns an error status.
+        """
+        cache_key, stored, entry, fresh = self._lookup(path, params, refresh)
+        if fresh:
+            return self._serve(path, cache_key, entry)
+        await self.authenticate()
+        key = self._inflight_key(path, params)
+        return await self._inflight.do_async(key, self._fetch_json, path, params, cache_key, stored, entry)
+
+    async def _fetch_json(self, path, params, cache_key, stored, entry):
+        headers = self._conditional_headers(entry)
+        response = await self._request("GET", path, headers=headers, cache="miss" if stored or entry is not None else None, params=params)
+        return self._read(path, cache_key, stored, entry, response)
+
+    async def _iter_objects(self, path, error, params=None):
+        """
+        Streams the ``objects`` array of a list endpoint, yielding items as they are parsed.
+
+        Only the item being parsed and one network chunk are held in memory. Streamed
+        responses bypass the response caches, request coalescing and the object store.
+
+        Args:
+            path (str): Endpoint path relative to base_endpoint.
+            error (str): Message prefix of the RuntimeError raised on failure.
+            params (dict, optional): Query parameters.
+
+        Yields:
+            dict: The listed objects, in order.
+
+        Raises:
+            RuntimeError: If the request fails or the body is not valid JSON.
+        """
+        try:
+            response = await self._request("GET", path, params=params, stream=True)
+            try:
+                async for item in aiter_objects(response.aiter_bytes(), codec=self.codec):
+                    yield item
+            finally:
+                await response.aclose()
+        except (httpx.HTTPError, ValueError) as e:
+            raise RuntimeError(f"{error}: {e}")
+
+    async def authenticate(self):
+        """
+        Returns a usable access token, reusing a cached one when possible and
+        authenticating with client_id and client_secret when it is missing or about to
+        expire.
+
+        Concurrent callers share a single token request.
+
+        Returns:
+            str: Access token used for authenticated API requests.
+
+        Raises:
+            RuntimeError: If authentication fails.
+        """
+        if self.auth.valid():
+            return self.auth.token
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+        async with self._auth_lock:
+            if self.auth.valid() or self.auth.load():
+                return self.auth.token
+            data = {"client_id": self.client_id, "client_secret": self.client_secret}
+            try:
+                response = await self._request("POST", "oauth/token", idempotent=True, auth=False, data=data)
+                return self.auth.update(self._decode(response.content))
+            except httpx.HTTPError as e:
+                raise RuntimeError(f"Authentication failed: {e}")
+
+####### RADIOS ########
+
+    async def create_radio(self, site_id, freq, antennaId, azimuth, aglHeightMeters=20, radioName=None, foliageTuning=-1, arHeightMeters=0, radiusMeters=12875, smGain=18.5, tilt=-2, txClearanceMeters=30, txPowerDbm=27.2):
+        """
+        Creates a new radio at a site with provided configuration.
+
+        Takes the same arguments as cnHeat.create_radio.
+
+        Returns:
+            dict: The response from the API after radio creation.
+
+        Raises:
+            RuntimeError: If radio creation fails.
+        """
+        if radioName is None:
+            site, antenna = await asyncio.gather(self._find_site(site_id), self.get_antennas.get(freq, antennaId))
+            radioName = radio_name(site, antenna, freq, azimuth)
+        data = self._radio_data(freq, antennaId, azimuth, aglHeightMeters, radioName, foliageTuning, arHeightMeters, radiusMeters, smGain, tilt, txClearanceMeters, txPowerDbm)
+        return await self._post_radio(site_id, data)
+
+    async def create_radios(self, specs, max_concurrency=20):
+        """
+        Creates many radios concurrently on the shared client.
+
+        Site and antenna lookups needed for default names are warmed once up front, and a
+        failing item does not abort the rest of the batch.
+
+        Args:
+            specs (iterable): Dictionaries of create_radio keyword arguments.
+            max_concurrency (int, optional): Maximum concurrent requests. Defaults to 20.
+
+        Returns:
+            list: One dictionary per spec, in input order, with keys "spec", "result"
+                (API response or None) and "error" (exception or None).
+        """
+        specs = list(specs)
+        try:
+            if any(spec.get("radioName") is None for spec in specs) and not self.store.sites.loaded:
+                await self.get_sites()
+            await asyncio.gather(*(self.get_antennas(freq) for freq in self._unnamed_frequencies(specs)))
+        except RuntimeError:
+            pass  # surfaced per item by create_radio
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def create(spec):
+            item = {"spec": spec, "result": None, "error": None}
+            async with semaphore:
+                try:
+                    item["result"] = await self.create_radio(**spec)
+                except Exception as e:
+                    item["error"] = e
+            return item
+
+        return list(await asyncio.gather(*(create(spec) for spec in specs)))
+
+    async def _find_site(self, site_id):
+        """
+        Looks up a site by ID in the cached site list. A site missing from a previously
+        loaded copy triggers one refetch; IDs still missing afterwards are remembered for
+        MISSING_SITE_TTL seconds, so a batch naming an unknown site doesn't refetch the
+        list for every item.
+
+        Args:
+            site_id (str): The ID of the site.
+
+        Returns:
+            dict: The site.
+
+        Raises:
+            RuntimeError: If the account has no such site or fetching the sites fails.
+        """
+        sites = self.store.sites
+        if not sites.loaded or (site_id not in sites and self._recheck_site(site_id)):
+            await self.get_sites()
+        return self._known_site(site_id)
+
+####### INVENTORY ########
+
+    async def inventory_snapshot(self, max_concurrency=20, progress=None, sites=None):
+        """
+        Fetches every site, or the given ones, and the radios of each site concurrently.
+
+        Per-site failures are recorded on the snapshot instead of aborting the run.
+
+        Args:
+            max_concurrency (int, optional): Maximum concurrent radio fetches. Defaults to 20.
+            progress (callable, optional): Called as ``progress(done, total, site_id, error)``
+                after each site finishes; ``error`` is None on success.
+            sites (list, optional): Site objects to snapshot. Defaults to fetching every site.
+
+        Returns:
+            InventorySnapshot: Sites and their radios indexed by ID.
+
+        Raises:
+            RuntimeError: If fetching the site list fails.
+        """
+        taken_at = time.time()
+        if sites is None:
+            sites = await self.get_sites()
+        snapshot = InventorySnapshot(sites, taken_at)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        total = len(snapshot.sites)
+        done = 0
+
+        async def fetch(site_id):
+            nonlocal done
+            async with semaphore:
+                try:
+                    snapshot.add(site_id, radios=await self.get_site_radios(site_id))
+                    error = None
+                except RuntimeError as e:
+                    snapshot.add(site_id, error=e)
+                    error = e
+            done += 1
+            if progress is not None:
+                progress(done, total, site_id, error)
+
+        await asyncio.gather(*(fetch(site_id) for site_id in snapshot.sites))
+        return snapshot
+
+    async def plan_towers(self, desired, prune=True, max_concurrency=20):
+        """
+        Compares a desired tower layout with the account and plans the API calls needed
+        to reach it, without changing anything.
+
+        The site list and the radios of every referenced site are fetched once. Print the
+        returned plan for a dry run, or pass it to apply_plan().
+
+        Args:
+            desired (dict, list or str): Desired state (see reconcile.normalize_towers) or
+                the path of a YAML/JSON file holding it.
+            prune (bool, optional): Delete radios the spec does not mention, unless a site
+                sets its own ``prune`` flag. Defaults to True.
+            max_concurrency (int, optional): Maximum concurrent radio fetches. Defaults to 20.
+
+        Returns:
+            Plan: Site renames and radio creates, updates and deletes to apply.
+
+        Raises:
+            ValueError: If the spec is invalid or refers to an unknown site.
+            RuntimeError: If fetching the current state fails.
+        """
+        towers = load_towers(desired) if isinstance(desired, str) else normalize_towers(desired)
+        sites = await self.get_sites()
+        snapshot = await self.inventory_snapshot(max_concurrency=max_concurrency, sites=select_sites(towers, sites))
+        return diff_towers(towers, snapshot, prune=prune)
+
+    async def apply_plan(self, plan, max_concurrency=20):
+        """
+        Applies a plan from plan_towers().
+
+        Renames, updates and deletes run concurrently, followed by the creates. A failing
+        action does not stop the others; its error is recorded on the action.
+
+        Args:
+            plan (Plan): The plan to apply.
+            max_concurrency (int, optional): Maximum concurrent requests. Defaults to 20.
+
+        Returns:
+            Plan: The same plan, with ``result`` and ``error`` set on every action.
+        """
+        try:
+            freqs = {a.data["frequency(ghz)"] for a in plan if a.kind == "create_radio" and a.data.get("name") is None}
+            await asyncio.gather(*(self.get_antennas(freq) for freq in freqs))
+        except RuntimeError:
+            pass  # surfaced per action by create_radio
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(action):
+            async with semaphore:
+                try:
+                    action.result = await action.call(self)
+                except Exception as e:
+                    action.error = e
+
+        for batch in plan.phases():
+            await asyncio.gather(*(run(action) for action in batch))
+        plan.applied = True
+        return plan
+
+    async def reconcile(self, desired, prune=True, dry_run=False, max_concurrency=20):
+        """
+        Brings the account in line with a desired tower layout using the fewest API calls.
+
+        Args:
+            desired (dict, list or str): Desired state or the path of a YAML/JSON file.
+            prune (bool, optional): Delete radios the spec does not mention. Defaults to True.
+            dry_run (bool, optional): Only plan, don't apply. Defaults to False.
+            max_concurrency (int, optional): Maximum concurrent requests. Defaults to 20.
+
+        Returns:
+            Plan: The planned actions, applied unless ``dry_run`` is set.
+        """
+        plan = await self.plan_towers(desired, prune=prune, max_concurrency=max_concurrency)
+        if not dry_run:
+            await self.apply_plan(plan, max_concurrency=max_concurrency)
+        return plan
+
+####### PREDICTIONS ########
+
+    async def wait_for_predictions(self, prediction_ids, timeout=None, poll_interval=2.0, max_interval=30.0, callback=None):
+        """
+        Waits for prediction jobs to finish, polling the jobmanagement endpoint once per
+        tick for all of them and backing off while nothing changes.
+
+        Args:
+            prediction_ids (iterable): IDs of the predictions to wait for.
+            timeout (float, optional): Seconds to wait in total. Defaults to no limit.
+            poll_interval (float, optional): Shortest wait between polls. Defaults to 2.
+            max_interval (float, optional): Longest wait between polls. Defaults to 30.
+            callback (callable, optional): Called as ``callback(prediction_id, job)`` as each
+                job finishes.
+
+        Predictions missing from the first poll of the jobmanagement endpoint are looked up
+        in the prediction list: those that exist have already finished and resolve to the
+        prediction object. As with cnHeat.wait_for_predictions, the others are reported
+        once the existing ones have finished.
+
+        Returns:
+            dict: The final job status object of each prediction keyed by ID.
+
+        Raises:
+            TimeoutError: If some jobs are still running after timeout.
+            RuntimeError: If fetching statuses fails or a prediction doesn't exist.
+        """
+        tracker = PredictionTracker(prediction_ids, poll_interval, max_interval)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        missing = []
+        try:
+            while not tracker.done:
+                self._emit("predictions_pending", id(tracker), len(tracker.pending))
+                finished = tracker.update(await self.get_predictions_statuses())
+                if tracker.polls == 1 and tracker.unlisted():
+                    resolved, missing = tracker.resolve_unlisted(await self.get_predictions())
+                    finished += resolved
+                if callback is not None:
+                    for prediction_id, job in finished:
+                        callback(prediction_id, job)
+                if tracker.done:
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for predictions: {sorted(tracker.pending)}")
+                await asyncio.sleep(tracker.next_delay(deadline))
+        finally:
+            self._emit("predictions_pending", id(tracker), 0)
+        if missing:
+            raise RuntimeError(f"Prediction {missing[0]} not found")
+        return tracker.results
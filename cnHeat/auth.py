@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class TokenManager:
+    """
+    Holds an access token together with its expiry and optionally shares it through a file.
+
+    A token counts as valid until ``refresh_margin`` seconds before it expires, so clients
+    renew it before requests start failing. With ``cache_path`` set, tokens are written to a
+    JSON file (readable only by the owner) keyed by a hash of the API endpoint and client ID,
+    letting worker processes reuse one token instead of each authenticating at startup.
+    Pointing ``cache_path`` at a tmpfs such as ``/dev/shm`` keeps it in shared memory.
+
+    Args:
+        base_endpoint (str): Base URL of the API.
+        client_id (str): API client ID the token belongs to.
+        cache_path (str, optional): File tokens are persisted to. Defaults to None.
+        refresh_margin (float, optional): Seconds before expiry at which the token is
+            renewed. Defaults to 60.
+        default_ttl (float, optional): Lifetime assumed when the token response has no
+            ``expires_in``. None treats such tokens as never expiring. Defaults to None.
+    """
+
+    def __init__(self, base_endpoint, client_id, cache_path=None, refresh_margin=60, default_ttl=None):
+        self.cache_key = hashlib.sha256(f"{base_endpoint}|{client_id}".encode()).hexdigest()
+        self.cache_path = os.path.expanduser(cache_path) if cache_path else None
+        self.refresh_margin = refresh_margin
+        self.default_ttl = default_ttl
+        self.token = None
+        self.expires_at = None
+        self.lock = threading.Lock()
+
+    def valid(self):
+        """
+        Returns True if the token can be used without renewing it first.
+        """
+        if self.token is None:
+            return False
+        return self.expires_at is None or time.time() < self.expires_at - self.refresh_margin
+
+    def update(self, payload):
+        """
+        Stores the token from an ``oauth/token`` response and persists it.
+
+        Args:
+            payload (dict): Decoded token response.
+
+        Returns:
+            str: The access token.
+        """
+        expires_in = payload.get("expires_in", self.default_ttl)
+        self.token = payload.get("access_token")
+        self.expires_at = time.time() + float(expires_in) if expires_in is not None else None
+        self.save()
+        return self.token
+
+    def invalidate(self, token=None):
+        """
+        Forgets the token, e.g. after the API rejected it, and drops it from the cache file.
+
+        Args:
+            token (str, optional): Only forget the token if it is still this one, so a token
+                renewed by another caller in the meantime is kept.
+        """
+        token = self.token if token is None else token
+        if token == self.token:
+            self.token = None
+            self.expires_at = None
+        entries = self._read()
+        entry = entries.get(self.cache_key)
+        if entry and entry.get("access_token") == token:
+            del entries[self.cache_key]
+            self._write(entries)
+
+    def load(self):
+        """
+        Adopts a still-valid token from the cache file.
+
+        Returns:
+            bool: True if a token was loaded.
+        """
+        entry = self._read().get(self.cache_key)
+        if not entry:
+            return False
+        token, expires_at = entry.get("access_token"), entry.get("expires_at")
+        if token is None or (expires_at is not None and time.time() >= expires_at - self.refresh_margin):
+            return False
+        self.token, self.expires_at = token, expires_at
+        return True
+
+    def save(self):
+        """
+        Writes the token to the cache file, if one is configured.
+        """
+        if self.cache_path is None:
+            return
+        entries = self._read()
+        entries[self.cache_key] = {"access_token": self.token, "expires_at": self.expires_at}
+        self._write(entries)
+
+    def _write(self, entries):
+        directory = os.path.dirname(self.cache_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".cnheat-token-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f)
+            os.chmod(tmp, 0o600)
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _read(self):
+        if self.cache_path is None:
+            return {}
+        try:
+            with open(self.cache_path) as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
@@ -0,0 +1,1203 @@
+import logging
+import threading
+import time
+
+from .auth import TokenManager
+from .cache import SQLiteCache, ValidatorCache
+from .codec import get_codec
+from .metrics import RequestEvent
+from .models import Antenna, Prediction, Radio, Site, Subscription, User
+from .retry import RetryPolicy
+from .singleflight import SingleFlight
+from .store import ObjectStore
+
+logger = logging.getLogger(__name__)
+
+
+def keyed(objects, key):
+    """
+    Returns the objects that have a field as a dictionary keyed by that field.
+    """
+    return {o[key]: o for o in objects if key in o}
+
+
+def radio_name(site, antenna, freq, azimuth):
+    """
+    Builds the default name of a radio, e.g. "AP-EP3K-90-5 GHZ.TOWER 1".
+
+    Args:
+        site (dict): The radio's site.
+        antenna (dict): The radio's antenna, or None if unknown.
+        freq (float): The frequency of the radio.
+        azimuth (float): The azimuth angle of the radio.
+
+    Returns:
+        str: The radio name.
+    """
+    antenna_name = antenna['antenna'] if antenna else "UnknownAntenna"
+    return f"""AP-{antenna_name.split("-")[0]}-{azimuth}-{str(freq).split(".")[0]} GHZ.{site['name'].upper()}"""
+
+
+class BaseClient:
+    """
+    Request handling, caching, the object store, the fetchers and the mutators shared by
+    cnHeat and AsyncCnHeat.
+
+    Subclasses supply the I/O: ``_request()``, ``_get_json()`` and ``_iter_objects()``,
+    plus four helpers that let the shared code run the same way whether a call blocks or
+    returns a coroutine:
+
+    - ``_call(error, request, then=None)`` makes ``request()``, returns ``then`` applied
+      to its result, and raises RuntimeError prefixed with ``error`` if either raises one
+      of REQUEST_ERRORS;
+    - ``_chain(result, then)`` applies ``then`` to the result of another call;
+    - ``_resolved(value)`` returns a value that needs no request;
+    - ``_collect(items, convert)`` converts the items of a streamed listing into a list.
+
+    On AsyncCnHeat every method built from them returns a coroutine.
+    """
+
+    REQUEST_ERRORS = Exception  # errors of the HTTP library reported as RuntimeError
+    ENCODE_ERROR = ValueError  # raised for a request body the codec can't encode
+    DECODE_ERROR = ValueError  # raised for a response body that isn't valid JSON
+    BODY_ARG = "data"  # request argument carrying an encoded JSON body
+    MISSING_SITE_TTL = 60  # seconds before a site ID missing from a fresh site list is looked up again
+
+    def _setup(self, client_id, client_secret, base_endpoint, antenna_ttl, retry, rate_limiter, cache, token_cache, token_refresh_margin, hooks, codec, background_refresh):
+        """
+        Initializes the state shared by both clients; see cnHeat for the arguments.
+        """
+        self.get_antennas = self.AntennaFetcher(self, ttl=antenna_ttl)
+        self.get_site_radios = self.SiteRadiosFetcher(self)
+        self.get_sites = self.SitesFetcher(self)
+        self.get_predictions = self.PredictionsFetcher(self)
+        self.get_users = self.UsersFetcher(self)
+        self.get_subscriptions = self.SubscriptionsFetcher(self)
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_endpoint = base_endpoint
+        self.retry = RetryPolicy() if retry is True else retry or None
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self._cache_scope = f"{base_endpoint}|{client_id}"
+        self._inflight = SingleFlight()
+        self.hooks = list(hooks or [])
+        self.codec = get_codec(codec)
+        self._validators = ValidatorCache()  # list endpoints revalidated without a persistent cache
+        self._digests = {}  # cache key -> digest of the last body
+        self.auth = TokenManager(base_endpoint, client_id, cache_path=token_cache, refresh_margin=token_refresh_margin)
+        self.store = ObjectStore()
+        self.store.on_clear(self.get_antennas.invalidate)
+        self.background_refresh = background_refresh
+        self._refresh_pending = set()
+        self.saved_requests = 0  # PATCHes skipped by update_radio(diff=True)
+        self._saved_lock = threading.Lock()
+        self._missing_sites = {}  # site ID -> monotonic time a refetched site list lacked it
+
+    def _loaded(self, collection):
+        """
+        Returns a copy of a collection's stored objects, or None if it isn't loaded.
+        """
+        objects = getattr(self.store, collection)
+        return list(objects.values()) if objects.loaded else None
+
+    def _replace(self, collection, value):
+        """
+        Replaces a collection's stored objects; None marks it as not loaded.
+        """
+        objects = getattr(self.store, collection)
+        if value is None:
+            objects.clear()
+        else:
+            objects.replace(value)
+
+    def _apply_mutation(self, collection, added=None, removed=None):
+        """
+        Applies the result of a mutation to the object store instead of refetching the list.
+
+        Args:
+            collection (str): "sites", "predictions" or "users".
+            added (dict, optional): Object returned by the API for a create.
+            removed (str, optional): Key of the object removed by a delete.
+        """
+        objects = getattr(self.store, collection)
+        if added is not None:
+            if isinstance(added, dict) and objects.key in added:
+                objects.put(added)
+            elif objects.loaded:
+                # the response doesn't describe the new object; reload on next access
+                objects.clear()
+                return
+        if removed is not None:
+            objects.remove(removed)
+        if self.background_refresh and objects.loaded:
+            self._schedule_refresh(collection)
+
+    def _refresher(self, collection):
+        return {"sites": self.get_sites, "predictions": self.get_predictions, "users": self.get_users}[collection]
+
+    def _emit(self, name, *args):
+        for hook in self.hooks:
+            callback = getattr(hook, name, None)
+            if callback is not None:
+                try:
+                    callback(*args)
+                except Exception:  # a broken hook must not fail or mask the API call
+                    logger.exception("Hook %r failed in %s", hook, name)
+
+    def _encode(self, headers, kwargs):
+        """
+        Encodes a ``json`` request argument with the client's codec.
+
+        Returns:
+            dict: The request headers, with a JSON Content-Type if a body was encoded.
+
+        Raises:
+            ENCODE_ERROR: If the body can't be encoded, so callers report it like any
+                other failed request.
+        """
+        if "json" not in kwargs:
+            return headers
+        try:
+            kwargs[self.BODY_ARG] = self.codec.dumps(kwargs.pop("json"))
+        except (TypeError, ValueError) as e:
+            raise self.ENCODE_ERROR(f"Invalid JSON in request body: {e}") from e
+        return {"Content-Type": "application/json", **(headers or {})}
+
+    def _start(self, method, path, cache):
+        event = RequestEvent(method, path, cache)
+        self._emit("before_request", event)
+        return event, time.monotonic()
+
+    def _succeeded(self, event, response, stream):
+        event.status = response.status_code
+        if stream:
+            event.bytes = int(response.headers.get("Content-Length") or 0)
+        else:
+            event.bytes = len(response.content)
+        if response.status_code == 304 and event.cache is not None:
+            event.cache = "revalidated"
+
+    def _failed(self, event, error):
+        event.error = error
+        event.status = getattr(getattr(error, "response", None), "status_code", None)
+
+    def _finish(self, event, started):
+        event.latency = time.monotonic() - started
+        self._emit("after_request", event)
+
+    def _retry_delay(self, method, attempt, started, idempotent, event, response=None):
+        """
+        Returns how long to wait before retrying a failed attempt, or None to give up.
+
+        Args:
+            response: The error response, or None if the request failed in transport.
+        """
+        if self.retry is None:
+            return None
+        if response is None:
+            delay = self.retry.next_delay(method, attempt, started, idempotent=idempotent)
+        else:
+            delay = self.retry.next_delay(method, attempt, started, response.status_code, response.headers.get("Retry-After"), idempotent)
+        if delay is not None and event is not None:
+            event.retries += 1
+        return delay
+
+    def _lookup(self, path, params, refresh):
+        """
+        Finds what the caches hold for a read endpoint.
+
+        Returns:
+            tuple: ``(cache_key, stored, entry, fresh)``; ``stored`` is True if the endpoint
+                goes through the persistent cache, ``entry`` is the cached body with its
+                validators or None, and ``fresh`` is True if it can be served as is.
+        """
+        cache_key = SQLiteCache.key(self._cache_scope, path, params)
+        stored = self.cache is not None and self.cache.cacheable(path)
+        entry = self.cache.entry(cache_key) if stored else self._validators.entry(cache_key)
+        fresh = stored and not refresh and entry is not None and self.cache.fresh(entry, path)
+        return cache_key, stored, entry, fresh
+
+    def _serve(self, path, cache_key, entry):
+        """
+        Decodes a fresh cached body, reporting the cache hit to hooks.
+        """
+        self._digests[cache_key] = entry["digest"]
+        if self.hooks:
+            event = RequestEvent("GET", path, "hit")
+            event.bytes, event.latency = len(entry["body"]), 0.0
+            self._emit("before_request", event)
+            self._emit("after_request", event)
+        return self._decode(entry["body"])
+
+    def _inflight_key(self, path, params):
+        return (path, tuple(sorted((params or {}).items())), self.auth.token)
+
+    @staticmethod
+    def _conditional_headers(entry):
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _read(self, path, cache_key, stored, entry, response):
+        """
+        Decodes the response to a read, reusing the cached body on 304 Not Modified and
+        caching a new body with its validators.
+        """
+        if response.status_code == 304 and entry is not None:
+            body, digest = entry["body"], entry["digest"]
+            if stored:
+                self.cache.touch(cache_key)
+            data = self._decode(body)
+        else:
+            body = response.content
+            data = self._decode(body)  # before caching, so a bad body is never stored
+            digest = SQLiteCache.digest(body)
+            etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+            if stored:
+                self.cache.set(cache_key, self._cache_scope, path, body, etag=etag, last_modified=last_modified, digest=digest)
+            elif (etag or last_modified) and self._validators.eligible(path):
+                self._validators.set(cache_key, path, body, etag=etag, last_modified=last_modified, digest=digest)
+        self._digests[cache_key] = digest
+        return data
+
+    def _decode(self, body):
+        """
+        Decodes a JSON response body with the client's codec.
+
+        Raises:
+            DECODE_ERROR: If the body is not valid JSON, so callers report it like any
+                other failed request.
+        """
+        try:
+            return self.codec.loads(body)
+        except ValueError as e:
+            raise self.DECODE_ERROR(f"Invalid JSON in response: {e}") from e
+
+    def digest(self, path, params=None):
+        """
+        Returns the SHA-256 digest of the last body received from a read endpoint.
+
+        Comparing digests between calls tells whether anything changed, whether or not the
+        server sends validators.
+
+        Args:
+            path (str): Endpoint path, e.g. "sites" or "radios/abc".
+            params (dict, optional): Query parameters, e.g. ``{"frequency": 5.8}``.
+
+        Returns:
+            str: Hex digest, or None if the endpoint hasn't been fetched.
+        """
+        return self._digests.get(SQLiteCache.key(self._cache_scope, path, params))
+
+    def _invalidate_cache(self, endpoint):
+        """
+        Drops cached responses made stale by a mutation.
+
+        Args:
+            endpoint (str): Endpoint path or endpoint group, e.g. "radios/abc" or "sites".
+        """
+        self._validators.invalidate(endpoint)
+        if self.cache is not None:
+            self.cache.invalidate(self._cache_scope, endpoint)
+
+    def _invalidate_radio(self, radio_id):
+        site_id = self.store.radios.indexed_value(radio_id, "site_id")
+        self._invalidate_cache(f"radios/{site_id}" if site_id else "radios")
+
+    def get_credits(self):
+        """
+        Retrieves and formats credit information from the API.
+
+        Returns:
+            dict: A dictionary containing credit types and their quantities.
+
+        Raises:
+            RuntimeError: If fetching credits fails.
+        """
+        return self._call("Failed to fetch credits", lambda: self._get_json("credits"))
+
+    class AntennaFetcher:
+        def __init__(self, outer, ttl=3600):
+            self.outer = outer  # Reference to the parent client
+            self.ttl = ttl
+            self._cache = {}  # freq -> (monotonic fetch time, antennas)
+
+        def __call__(self, freq):
+            """
+            Retrieves antenna options for a specified frequency, served from cache while fresh.
+
+            Args:
+                freq (float): The frequency for which to retrieve antennas.
+
+            Returns:
+                list: A list of antennas available for the specified frequency.
+
+            Raises:
+                RuntimeError: If fetching antennas fails.
+            """
+            cached = self._cache.get(freq)
+            if cached is not None and (self.ttl is None or time.monotonic() - cached[0] < self.ttl):
+                return self.outer._resolved(cached[1])
+            return self._load(freq)
+
+        def refresh(self, freq):
+            """
+            Fetches antenna options for a frequency from the API, bypassing every cache, and
+            replaces the cached copy.
+
+            Args:
+                freq (float): The frequency for which to retrieve antennas.
+
+            Returns:
+                list: A list of antennas available for the specified frequency.
+
+            Raises:
+                RuntimeError: If fetching antennas fails.
+            """
+            return self._load(freq, refresh=True)
+
+        def _load(self, freq, refresh=False):
+            def loaded(antenna_data):
+                antennas = antenna_data.get('objects', [])
+                self.outer.store.antennas.replace_where("frequency", freq, antennas)
+                if self.ttl != 0:
+                    self._cache[freq] = (time.monotonic(), antennas)
+                return antennas
+
+            return self.outer._call(
+                "Failed to fetch antennas",
+                lambda: self.outer._get_json("antennas", params={"frequency": freq}, refresh=refresh),
+                loaded,
+            )
+
+        def iter(self, freq):
+            """
+            Streams antenna options for a frequency, yielding each antenna as it is parsed.
+
+            Bypasses the caches and the object store.
+
+            Args:
+                freq (float): The frequency for which to retrieve antennas.
+
+            Yields:
+                dict: Antennas available for the specified frequency.
+
+            Raises:
+                RuntimeError: If fetching antennas fails.
+            """
+            return self.outer._iter_objects("antennas", "Failed to fetch antennas", params={"frequency": freq})
+
+        def models(self, freq):
+            """
+            Fetches the antennas for a frequency as compact Antenna records instead of dicts.
+
+            Each item is converted as soon as it is parsed from the streamed response, so
+            the full list of dicts is never held in memory. Bypasses the caches and the
+            object store.
+
+            Args:
+                freq (float): The frequency for which to retrieve antennas.
+
+            Returns:
+                list: Antenna models.
+
+            Raises:
+                RuntimeError: If fetching antennas fails.
+            """
+            return self.outer._collect(self.iter(freq), Antenna.from_dict)
+
+        def invalidate(self, freq=None):
+            """
+            Drops antennas cached in memory so the next call reloads them.
+
+            Args:
+                freq (float, optional): Frequency to drop. Defaults to every cached frequency.
+            """
+            if freq is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(freq, None)
+
+        def get(self, freq, antenna_id):
+            """
+            Looks up a single antenna by ID in the (cached) catalog for a frequency.
+
+            Args:
+                freq (float): The frequency of the antenna.
+                antenna_id (str): The ID of the antenna.
+
+            Returns:
+                dict: The antenna, or None if the catalog has no such antenna.
+
+            Raises:
+                RuntimeError: If fetching antennas fails.
+            """
+            def find(antennas):
+                antenna = self.outer.store.antennas.get(antenna_id)
+                if antenna is None:
+                    # the store lost it behind a fresh cache; restore the catalog from the cache
+                    antenna = next((a for a in antennas if a.get('id') == antenna_id), None)
+                    if antenna is not None:
+                        self.outer.store.antennas.replace_where("frequency", freq, antennas)
+                return antenna
+
+            return self.outer._chain(self(freq), find)
+
+        def to_dict(self, freq, key=None):
+            """
+            Returns a dictionary of antennas keyed by antenna ID.
+
+            Args:
+                freq (float): The frequency for which to retrieve antennas.
+
+            Returns:
+                dict: A dictionary mapping antenna ID to antenna data.
+            """
+            return self.outer._chain(self(freq), lambda antennas: keyed(antennas, key or 'id'))
+
+####### RADIOS ########
+
+    class SiteRadiosFetcher:
+        def __init__(self, outer):
+            self.outer = outer
+
+        def __call__(self, site_id):
+            """
+            Retrieves a list of radios associated with a given site ID.
+
+            Args:
+                site_id (str): The ID of the site whose radios are to be retrieved.
+
+            Returns:
+                list: A list of radios for the site.
+
+            Raises:
+                RuntimeError: If fetching the radios fails.
+            """
+            def loaded(radio_data):
+                radios = radio_data.get('objects', [])
+                self.outer.store.radios.replace_where("site_id", site_id, radios)
+                return radios
+
+            # name the site if it is already known; never fetch on the error path
+            site = self.outer.store.sites.get(site_id)
+            site_name = site['name'] if site else site_id
+            return self.outer._call(f"Failed to fetch {site_name} radios", lambda: self.outer._get_json(f"radios/{site_id}"), loaded)
+
+        def iter(self, site_id):
+            """
+            Streams the radios of a site, yielding each radio as it is parsed.
+
+            Keeps memory bounded for very large sites; bypasses the caches and the object store.
+
+            Args:
+                site_id (str): The ID of the site whose radios are to be retrieved.
+
+            Yields:
+                dict: Radios of the site.
+
+            Raises:
+                RuntimeError: If fetching the radios fails.
+            """
+            return self.outer._iter_objects(f"radios/{site_id}", f"Failed to fetch {site_id} radios")
+
+        def models(self, site_id):
+            """
+            Fetches the radios of a site as compact Radio records instead of dicts.
+
+            Each item is converted as soon as it is parsed from the streamed response, so
+            the full list of dicts is never held in memory. Bypasses the caches and the
+            object store.
+
+            Args:
+                site_id (str): The ID of the site whose radios are to be retrieved.
+
+            Returns:
+                list: Radio models.
+
+            Raises:
+                RuntimeError: If fetching radios fails.
+            """
+            def convert(item):
+                radio = Radio.from_dict(item)
+                radio.site_id = site_id
+                return radio
+
+            return self.outer._collect(self.iter(site_id), convert)
+
+        def to_dict(self, site_id, key=None):
+            """
+            Returns radios for a site as a dictionary keyed by radio ID.
+
+            Args:
+                site_id (str): The ID of the site.
+
+            Returns:
+                dict: Dictionary of radios by ID.
+            """
+            return self.outer._chain(self(site_id), lambda radios: keyed(radios, key or 'id'))
+
+    def get_radio(self, radio_id):
+        """
+        Retrieves details for a specific radio by its ID.
+
+        Args:
+            radio_id (str): The ID of the radio to retrieve.
+
+        Returns:
+            dict: The response from the API containing radio details.
+
+        Raises:
+            RuntimeError: If fetching the radio fails.
+        """
+        def fetched(radio):
+            if isinstance(radio, dict) and 'id' in radio:
+                if self.store.radios.update(radio['id'], radio) is None:
+                    self.store.radios.put(radio)
+            return radio
+
+        return self._call("Failed to fetch radio", lambda: self._get_json(f"radio/{radio_id}"), fetched)
+
+    def delete_radio(self, radio_id):
+        """
+        Deletes a specific radio by its ID.
+
+        Args:
+            radio_id (str): The ID of the radio to delete.
+
+        Returns:
+            dict: The response from the API containing radio deletion details.
+
+        Raises:
+            RuntimeError: If deleting the radio fails.
+        """
+        def deleted(response):
+            self._invalidate_radio(radio_id)
+            self.store.radios.remove(radio_id)
+            return self._decode(response.content)
+
+        return self._call("Failed to delete radio", lambda: self._request("DELETE", f"radio/{radio_id}"), deleted)
+
+    def _recheck_site(self, site_id):
+        """
+        Returns True if a site missing from the loaded list may have been created since
+        the list was last fetched without it.
+        """
+        missed = self._missing_sites.get(site_id)
+        return missed is None or time.monotonic() - missed >= self.MISSING_SITE_TTL
+
+    def _known_site(self, site_id):
+        """
+        Returns a site from the freshly checked site list, remembering a miss.
+
+        Raises:
+            RuntimeError: If the account has no such site.
+        """
+        site = self.store.sites.get(site_id)
+        if site is None:
+            self._missing_sites[site_id] = time.monotonic()
+            raise RuntimeError(f"Site {site_id} not found")
+        return site
+
+    def _post_radio(self, site_id, data):
+        """
+        Sends a create_radio() request and stores the new radio.
+        """
+        def created(response):
+            self._invalidate_cache(f"radios/{site_id}")
+            radio = self._decode(response.content)
+            if isinstance(radio, dict) and 'id' in radio:
+                self.store.radios.put(radio, site_id=site_id)
+            return radio
+
+        return self._call("Failed to create radio", lambda: self._request("POST", f"radio/{site_id}", json=data), created)
+
+    @staticmethod
+    def _radio_data(freq, antennaId, azimuth, aglHeightMeters, radioName, foliageTuning, arHeightMeters, radiusMeters, smGain, tilt, txClearanceMeters, txPowerDbm):
+        return {
+            "antenna": antennaId,
+            "name": radioName,
+            "azimuth": azimuth,
+            "foliage_tuning": foliageTuning,
+            "frequency(ghz)": freq,
+            "height(m)": aglHeightMeters,
+            "height_rooftop(m)": arHeightMeters,
+            "radius(m)": radiusMeters,
+            "sm_gain(dbi)": smGain,
+            "tilt": tilt,
+            "txclearance(m)": txClearanceMeters,
+            "txpower(dbm)": txPowerDbm
+        }
+
+    @staticmethod
+    def _unnamed_frequencies(specs):
+        """
+        Returns the frequencies whose antenna catalogs name the unnamed radios in a batch
+        of create_radio specs; incomplete specs fail on their own in create_radio.
+        """
+        return {spec.get("freq") for spec in specs if spec.get("radioName") is None} - {None}
+
+    def update_radio(self, radio_id, data, diff=False):
+        """
+        Updates an existing radio with only the fields provided in the `data` dictionary.
+
+        With ``diff`` set, ``data`` is first compared with the radio as last fetched by
+        get_radio() or get_site_radios(): only the changed fields are sent, and no request
+        is made when nothing changed. Skipped requests are counted in ``saved_requests``.
+        Radios that haven't been fetched are patched with all of ``data``.
+
+        Args:
+            radio_id (str): The ID of the radio to update.
+            data (dict): Dictionary of fields to update. Only these fields will be patched.
+                Valid keys include:
+                    - "frequency(ghz)" (float): Frequency in GHz
+                    - "antenna" (str): Antenna ID
+                    - "azimuth" (float): Azimuth angle
+                    - "height(m)" (float): Height above ground level in meters
+                    - "name" (str or None): Radio name
+                    - "foliage_tuning" (float): Foliage tuning value
+                    - "height_rooftop(m)" (float): Rooftop height in meters
+                    - "radius(m)" (float): Coverage radius in meters
+                    - "sm_gain(dbi)" (float): Subscriber module gain in dBi
+                    - "tilt" (float): Antenna tilt value
+                    - "txclearance(m)" (float): TX clearance in meters
+                    - "txpower(dbm)" (float): TX power in dBm
+            diff (bool, optional): Skip fields that already have the requested value.
+                Defaults to False.
+
+        Returns:
+            dict: API response after updating the radio, or the cached radio if no
+                request was needed.
+
+        Raises:
+            RuntimeError: If the radio update fails.
+        """
+        if diff:
+            changes = self.store.radios.changes(radio_id, data)
+            if changes is not None:
+                if not changes:
+                    with self._saved_lock:
+                        self.saved_requests += 1
+                    return self._resolved(self.store.radios.get(radio_id))
+                data = changes
+
+        def updated(response):
+            self._invalidate_radio(radio_id)
+            self.store.radios.update(radio_id, data)
+            return self._decode(response.content)
+
+        return self._call("Failed to update radio", lambda: self._request("PATCH", f"radio/{radio_id}", idempotent=True, json=data), updated)
+
+####### SITES ########
+
+    class SitesFetcher:
+        def __init__(self, outer):
+            self.outer = outer
+
+        def __call__(self):
+            """
+            Fetches a list of sites and their metadata from the API.
+
+            Returns:
+                list: A list of site objects.
+
+            Raises:
+                RuntimeError: If fetching sites fails.
+            """
+            def loaded(site_data):
+                sites = site_data.get('objects', [])
+                self.outer.store.sites.replace(sites)
+                return sites
+
+            return self.outer._call("Failed to fetch sites", lambda: self.outer._get_json("sites"), loaded)
+
+        def iter(self):
+            """
+            Streams sites from the API, yielding each site as it is parsed.
+
+            Keeps memory bounded for very large accounts; bypasses the caches and the object store.
+
+            Yields:
+                dict: Site objects.
+
+            Raises:
+                RuntimeError: If fetching sites fails.
+            """
+            return self.outer._iter_objects("sites", "Failed to fetch sites")
+
+        def models(self):
+            """
+            Fetches the sites as compact Site records instead of dicts.
+
+            Each item is converted as soon as it is parsed from the streamed response, so
+            the full list of dicts is never held in memory. Bypasses the caches and the
+            object store.
+
+            Returns:
+                list: Site models.
+
+            Raises:
+                RuntimeError: If fetching sites fails.
+            """
+            return self.outer._collect(self.iter(), Site.from_dict)
+
+        def to_dict(self, key=None):
+            """
+            Returns sites as a dictionary keyed by site ID.
+
+            Returns:
+                dict: Dictionary of sites by ID.
+            """
+            return self.outer._chain(self(), lambda sites: keyed(sites, key or 'id'))
+
+    def rename_site(self, site_id, name):
+        """
+        Updates a new site with specified details.
+
+        Args:
+            name (str): The name of the site.
+
+        Returns:
+            dict: The response from the API after site update.
+
+        Raises:
+            RuntimeError: If site update fails.
+            """
+        data = {
+            "name": name,
+        }
+
+        def renamed(response):
+            self._invalidate_cache("sites")
+            self.store.sites.update(site_id, data)
+            return self._decode(response.content)
+
+        return self._call("Failed to update site", lambda: self._request("PATCH", f"site/{site_id}", idempotent=True, json=data), renamed)
+
+    def create_site(self, name, lat, lon, credit_id):
+        """
+        Creates a new site with specified details.
+
+        Args:
+            name (str): The name of the site.
+            lat (float): The latitude of the site.
+            lon (float): The longitude of the site.
+            credit_id (str): The ID of the credit to associate with the site.
+
+        Returns:
+            dict: The response from the API after site creation.
+
+        Raises:
+            RuntimeError: If site creation fails.
+        """
+        data = {
+            "name": name,
+            "lat": lat,
+            "lon": lon,
+            "credits": credit_id
+        }
+
+        def created(response):
+            self._invalidate_cache("sites")
+            site = self._decode(response.content)
+            self._apply_mutation("sites", added=site)
+            return site
+
+        return self._call("Failed to create site", lambda: self._request("POST", "sites", json=data), created)
+
+####### PREDICTIONS ########
+
+    class PredictionsFetcher:
+        def __init__(self, outer):
+            self.outer = outer
+
+        def __call__(self):
+            """
+            Fetches a list of predictions from the API.
+
+            Returns:
+                list: A list of prediction objects.
+
+            Raises:
+                RuntimeError: If fetching predictions fails.
+            """
+            def loaded(prediction_data):
+                predictions = prediction_data.get('objects', [])
+                self.outer.store.predictions.replace(predictions)
+                return predictions
+
+            return self.outer._call("Failed to fetch predictions", lambda: self.outer._get_json("predictions"), loaded)
+
+        def iter(self):
+            """
+            Streams predictions from the API, yielding each prediction as it is parsed.
+
+            Keeps memory bounded for very large accounts; bypasses the caches and the object store.
+
+            Yields:
+                dict: Prediction objects.
+
+            Raises:
+                RuntimeError: If fetching predictions fails.
+            """
+            return self.outer._iter_objects("predictions", "Failed to fetch predictions")
+
+        def models(self):
+            """
+            Fetches the predictions as compact Prediction records instead of dicts.
+
+            Each item is converted as soon as it is parsed from the streamed response, so
+            the full list of dicts is never held in memory. Bypasses the caches and the
+            object store.
+
+            Returns:
+                list: Prediction models.
+
+            Raises:
+                RuntimeError: If fetching predictions fails.
+            """
+            return self.outer._collect(self.iter(), Prediction.from_dict)
+
+        def to_dict(self, key=None):
+            """
+            Returns predictions as a dictionary keyed by prediction ID.
+
+            Returns:
+                dict: Dictionary of predictions by ID.
+            """
+            return self.outer._chain(self(), lambda predictions: keyed(predictions, key or 'id'))
+
+    def _post_prediction(self, data):
+        def created(response):
+            self._invalidate_cache("predictions")
+            prediction = self._decode(response.content)
+            self._apply_mutation("predictions", added=prediction)
+            return prediction
+
+        return self._call("Failed to create predicition", lambda: self._request("POST", "predictions", json=data), created)
+
+    def create_eval_prediction(self, prediction_name, radio_id_list, install_height, install_reference):
+        """
+        Creates a prediction using a list of radio IDs.
+
+        Args:
+            prediction_name (str): Name of the prediction.
+            radio_id_list (list): List of radio IDs to include.
+            install_height: CPE height above reference.
+            install_reference: Ground or Roof
+
+        Returns:
+            dict: The API response with the new prediction details.
+
+        Raises:
+            RuntimeError: If creating prediction fails.
+        """
+        data = {
+            "name":prediction_name,
+            "radio_list":radio_id_list,
+            "install_height":install_height,
+            "install_reference":install_reference
+        }
+        return self._post_prediction(data)
+
+    def create_prediction(self, prediction_name, radio_id_list):
+        """
+        Creates a prediction using a list of radio IDs.
+
+        Args:
+            prediction_name (str): Name of the prediction.
+            radio_id_list (list): List of radio IDs to include.
+
+        Returns:
+            dict: The API response with the new prediction details.
+
+        Raises:
+            RuntimeError: If creating prediction fails.
+        """
+        data = {
+            "name":prediction_name,
+            "radio_list":radio_id_list
+        }
+        return self._post_prediction(data)
+
+    def get_predictions_statuses(self):
+        """
+        Retrieves prediction job statuses from the API.
+
+        Returns:
+            list: A list of prediction status objects.
+
+        Raises:
+            RuntimeError: If fetching statuses fails.
+        """
+        return self._call(
+            "Failed to fetch predicition statuses",
+            lambda: self._get_json("predictions/jobmanagement"),
+            lambda statuses: statuses.get('objects', []),
+        )
+
+    def rename_prediction(self, prediction_id, new_name):
+        """
+        Renames a prediction by its ID.
+
+        Args:
+            prediction_id (str): ID of the prediction.
+            new_name (str): New name for the prediction.
+
+        Returns:
+            dict: API response after renaming.
+
+        Raises:
+            RuntimeError: If renaming fails.
+        """
+        data = {
+            "name":new_name,
+        }
+
+        def renamed(response):
+            self._invalidate_cache("predictions")
+            self.store.predictions.update(prediction_id, data)
+            return self._decode(response.content)
+
+        return self._call(
+            "Failed to rename predicition",
+            lambda: self._request("PATCH", f"prediction/{prediction_id}/rename", idempotent=True, json=data),
+            renamed,
+        )
+
+    def delete_prediction(self, prediction_id):
+        """
+        Deletes a prediction by its ID.
+
+        Args:
+            prediction_id (str): ID of the prediction to delete.
+
+        Returns:
+            dict: API response after deletion.
+
+        Raises:
+            RuntimeError: If deletion fails.
+        """
+        def deleted(response):
+            self._invalidate_cache("predictions")
+            self._apply_mutation("predictions", removed=prediction_id)
+            return self._decode(response.content)
+
+        return self._call("Failed to delete predicition", lambda: self._request("DELETE", f"prediction/{prediction_id}"), deleted)
+
+####### USERS ########
+
+    class UsersFetcher:
+        def __init__(self, outer):
+            self.outer = outer
+
+        def __call__(self):
+            """
+            Retrieves a list of users from the API.
+
+            Returns:
+                list: A list of user objects.
+
+            Raises:
+                RuntimeError: If the request fails.
+            """
+            def loaded(user_data):
+                users = user_data.get('objects', [])
+                self.outer.store.users.replace(users)
+                return users
+
+            return self.outer._call("Failed to get users", lambda: self.outer._get_json("users"), loaded)
+
+        def iter(self):
+            """
+            Streams users from the API, yielding each user as it is parsed.
+
+            Keeps memory bounded for very large accounts; bypasses the caches and the object store.
+
+            Yields:
+                dict: User objects.
+
+            Raises:
+                RuntimeError: If fetching users fails.
+            """
+            return self.outer._iter_objects("users", "Failed to get users")
+
+        def models(self):
+            """
+            Fetches the users as compact User records instead of dicts.
+
+            Each item is converted as soon as it is parsed from the streamed response, so
+            the full list of dicts is never held in memory. Bypasses the caches and the
+            object store.
+
+            Returns:
+                list: User models.
+
+            Raises:
+                RuntimeError: If fetching users fails.
+            """
+            return self.outer._collect(self.iter(), User.from_dict)
+
+        def to_dict(self, key=None):
+            """
+            Returns users as a dictionary keyed by email.
+
+            Returns:
+                dict: Dictionary of users by email.
+            """
+            return self.outer._chain(self(), lambda users: keyed(users, key or 'email'))
+
+    def add_user(self, email, role):
+        """
+        Adds a new user with a specified role.
+
+        Args:
+            email (str): Email of the user.
+            role (str): Role or permission level.
+
+        Returns:
+            dict: API response after user is added.
+
+        Raises:
+            RuntimeError: If adding the user fails.
+        """
+        data = {
+            "email":email,
+            "permission":role,
+        }
+
+        def added(response):
+            self._invalidate_cache("users")
+            user = self._decode(response.content)
+            self._apply_mutation("users", added=user)
+            return user
+
+        return self._call("Failed to add user", lambda: self._request("POST", "users", json=data), added)
+
+    def delete_user(self, email):
+        """
+        Deletes a user based on email.
+
+        Args:
+            email (str): Email of the user to delete.
+
+        Returns:
+            dict: API response after deletion.
+
+        Raises:
+            RuntimeError: If deletion fails.
+        """
+        data = {
+            "email":email
+        }
+
+        def deleted(response):
+            self._invalidate_cache("users")
+            self._apply_mutation("users", removed=email)
+            return self._decode(response.content)
+
+        return self._call("Failed to delete user", lambda: self._request("DELETE", "user", json=data), deleted)
+
+####### SUBSCRIPTIONS ########
+
+    class SubscriptionsFetcher:
+        def __init__(self, outer):
+            self.outer = outer
+
+        def __call__(self):
+            """
+            Retrieves a list of active subscriptions.
+
+            Returns:
+                list: A list of subscription objects.
+
+            Raises:
+                RuntimeError: If fetching subscriptions fails.
+            """
+            def loaded(subscription_data):
+                subscriptions = subscription_data.get('objects', [])
+                self.outer.store.subscriptions.replace(subscriptions)
+                return subscriptions
+
+            return self.outer._call("Failed to get subscriptions", lambda: self.outer._get_json("subscriptions"), loaded)
+
+        def iter(self):
+            """
+            Streams subscriptions from the API, yielding each subscription as it is parsed.
+
+            Keeps memory bounded for very large accounts; bypasses the caches and the object store.
+
+            Yields:
+                dict: Subscription objects.
+
+            Raises:
+                RuntimeError: If fetching subscriptions fails.
+            """
+            return self.outer._iter_objects("subscriptions", "Failed to get subscriptions")
+
+        def models(self):
+            """
+            Fetches the subscriptions as compact Subscription records instead of dicts.
+
+            Each item is converted as soon as it is parsed from the streamed response, so
+            the full list of dicts is never held in memory. Bypasses the caches and the
+            object store.
+
+            Returns:
+                list: Subscription models.
+
+            Raises:
+                RuntimeError: If fetching subscriptions fails.
+            """
+            return self.outer._collect(self.iter(), Subscription.from_dict)
+
+        def to_dict(self, key=None):
+            """
+            Returns subscriptions as a dictionary keyed by subscription ID.
+
+            Returns:
+                dict: Dictionary of subscriptions by ID.
+            """
+            return self.outer._chain(self(), lambda subscriptions: keyed(subscriptions, key or 'id'))
+
+    def _patch_subscription(self, site_id, action, error):
+        def patched(response):
+            self._invalidate_cache("subscriptions")
+            return self._decode(response.content)
+
+        return self._call(error, lambda: self._request("PATCH", f"subscription/{site_id}/{action}"), patched)
+
+    def renew_subscriptions(self, site_id):
+        """
+        Renews a subscription for a given site.
+
+        Args:
+            site_id (str): ID of the site.
+
+        Returns:
+            dict: API response after renewal.
+
+        Raises:
+            RuntimeError: If renewal fails.
+        """
+        return self._patch_subscription(site_id, "renew", "Failed to renew subscription")
+
+    def terminate_subscription(self, site_id):
+        """
+        Terminates a subscription for a given site.
+
+        Args:
+            site_id (str): ID of the site.
+
+        Returns:
+            dict: API response after termination.
+
+        Raises:
+            RuntimeError: If termination fails.
+        """
+        return self._patch_subscription(site_id, "terminate", "Failed to terminate subscription")
@@ -0,0 +1,311 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+
+class SQLiteCache:
+    """
+    Persistent cache of read-endpoint responses stored in a SQLite file.
+
+    Entries are keyed by account, endpoint path and query parameters and hold the raw
+    response body with the time it was fetched, its HTTP validators (ETag and
+    Last-Modified) and a SHA-256 digest of the body. An entry is served while it is younger
+    than the TTL of its endpoint group (the first path segment, e.g. "radios" for
+    "radios/{site_id}"); groups without a TTL, and the live job status endpoint, are
+    never cached. Stale entries are kept so they can be revalidated with a conditional
+    request. The file may be shared by several processes.
+
+    Args:
+        path (str): Location of the SQLite file; parent directories are created.
+        ttls (dict, optional): Seconds to keep entries per endpoint group. Defaults to DEFAULT_TTLS.
+    """
+
+    DEFAULT_TTLS = {
+        "antennas": 86400,
+        "sites": 600,
+        "radios": 300,
+        "users": 600,
+        "subscriptions": 600,
+        "predictions": 60,
+    }
+
+    # Endpoints reporting live state, never cached whatever the TTL of their group.
+    LIVE_ENDPOINTS = frozenset({"predictions/jobmanagement"})
+
+    def __init__(self, path, ttls=None):
+        self.path = os.path.expanduser(path)
+        self.ttls = dict(self.DEFAULT_TTLS if ttls is None else ttls)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, scope TEXT NOT NULL, endpoint TEXT NOT NULL, "
+            "grp TEXT NOT NULL, body BLOB NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+        for column in ("etag", "last_modified", "digest"):
+            if column not in columns:  # files created before validators were stored
+                self._conn.execute(f"ALTER TABLE responses ADD COLUMN {column} TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_endpoint ON responses (scope, endpoint)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_grp ON responses (scope, grp)")
+
+    @staticmethod
+    def digest(body):
+        """
+        Returns the SHA-256 hex digest of a response body.
+        """
+        return hashlib.sha256(body).hexdigest()
+
+    @staticmethod
+    def group(endpoint):
+        """
+        Returns the endpoint group of a path, e.g. "radios" for "radios/abc".
+        """
+        return endpoint.split("/", 1)[0]
+
+    @staticmethod
+    def key(scope, endpoint, params=None):
+        """
+        Builds the cache key of a request.
+
+        Args:
+            scope (str): Identifies the account and API the response belongs to.
+            endpoint (str): Endpoint path.
+            params (dict, optional): Query parameters.
+
+        Returns:
+            str: The cache key.
+        """
+        query = urlencode(sorted((params or {}).items()))
+        return f"{scope} {endpoint}?{query}"
+
+    def ttl(self, endpoint):
+        """
+        Returns the TTL of an endpoint in seconds, or None if it is never cached.
+        """
+        if endpoint.strip("/") in self.LIVE_ENDPOINTS:
+            return None
+        return self.ttls.get(self.group(endpoint))
+
+    def cacheable(self, endpoint):
+        """
+        Returns True if responses of an endpoint are cached.
+        """
+        return self.ttl(endpoint) is not None
+
+    def get(self, key, endpoint):
+        """
+        Returns a cached body if it is still fresh.
+
+        Args:
+            key (str): Cache key from key().
+            endpoint (str): Endpoint path, used to pick the TTL.
+
+        Returns:
+            bytes: The cached response body, or None if missing or stale.
+        """
+        entry = self.entry(key)
+        if entry is None or not self.fresh(entry, endpoint):
+            return None
+        return entry["body"]
+
+    def entry(self, key):
+        """
+        Returns a cached entry whether or not it is still fresh.
+
+        Args:
+            key (str): Cache key from key().
+
+        Returns:
+            dict: The entry's "body", "fetched_at", "etag", "last_modified" and "digest",
+                or None if nothing is cached under the key.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, fetched_at, etag, last_modified, digest FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        body = bytes(row[0])
+        return {
+            "body": body,
+            "fetched_at": row[1],
+            "etag": row[2],
+            "last_modified": row[3],
+            "digest": row[4] or self.digest(body),
+        }
+
+    def fresh(self, entry, endpoint):
+        """
+        Returns True if an entry is younger than the TTL of its endpoint group.
+        """
+        ttl = self.ttl(endpoint)
+        return ttl is not None and time.time() - entry["fetched_at"] < ttl
+
+    def set(self, key, scope, endpoint, body, fetched_at=None, etag=None, last_modified=None, digest=None):
+        """
+        Stores a response body.
+
+        Args:
+            key (str): Cache key from key().
+            scope (str): Account scope used to build the key.
+            endpoint (str): Endpoint path.
+            body (bytes): Raw response body.
+            fetched_at (float, optional): Unix fetch time. Defaults to now.
+            etag (str, optional): The response's ETag header.
+            last_modified (str, optional): The response's Last-Modified header.
+            digest (str, optional): Digest of the body. Defaults to computing it.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, scope, endpoint, grp, body, fetched_at, etag, last_modified, digest) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key, scope, endpoint, self.group(endpoint), sqlite3.Binary(body),
+                    time.time() if fetched_at is None else fetched_at,
+                    etag, last_modified, digest or self.digest(body),
+                ),
+            )
+
+    def touch(self, key, fetched_at=None):
+        """
+        Marks an entry as fetched again, e.g. after the server confirmed it is unchanged.
+
+        Args:
+            key (str): Cache key from key().
+            fetched_at (float, optional): Unix fetch time. Defaults to now.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time() if fetched_at is None else fetched_at, key)
+            )
+
+    def invalidate(self, scope, endpoint=None):
+        """
+        Drops cached responses of an account.
+
+        Args:
+            scope (str): Account scope used to build the keys.
+            endpoint (str, optional): An endpoint path such as "radios/abc" drops that
+                endpoint; a bare group such as "radios" drops the whole group. Defaults to
+                dropping everything in the scope.
+        """
+        with self._lock:
+            if endpoint is None:
+                self._conn.execute("DELETE FROM responses WHERE scope = ?", (scope,))
+            elif "/" in endpoint:
+                self._conn.execute("DELETE FROM responses WHERE scope = ? AND endpoint = ?", (scope, endpoint))
+            else:
+                self._conn.execute("DELETE FROM responses WHERE scope = ? AND grp = ?", (scope, endpoint))
+
+    def clear(self):
+        """
+        Drops every cached response.
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+class ValidatorCache:
+    """
+    Bounded in-memory store of the last body and HTTP validators of list endpoints, used
+    to revalidate them with conditional requests when no SQLiteCache is configured.
+
+    Only list endpoints (the groups of SQLiteCache.DEFAULT_TTLS) are kept; single-object
+    reads such as "radio/{id}" and "credits" are not. Beyond ``maxsize`` entries the least
+    recently used one is evicted. The body is kept because a 304 Not Modified response
+    carries none.
+
+    Args:
+        maxsize (int, optional): Maximum number of entries. Defaults to 128.
+    """
+
+    GROUPS = frozenset(SQLiteCache.DEFAULT_TTLS)
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # cache key -> entry
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def eligible(self, endpoint):
+        """
+        Returns True if responses of an endpoint are kept for revalidation.
+        """
+        return SQLiteCache.group(endpoint) in self.GROUPS
+
+    def entry(self, key):
+        """
+        Returns the entry stored under a cache key, or None.
+
+        Returns:
+            dict: The entry's "body", "etag", "last_modified" and "digest".
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key, endpoint, body, etag=None, last_modified=None, digest=None):
+        """
+        Stores a response body with its validators, evicting the least recently used
+        entries beyond maxsize.
+
+        Args:
+            key (str): Cache key from SQLiteCache.key().
+            endpoint (str): Endpoint path.
+            body (bytes): Raw response body.
+            etag (str, optional): The response's ETag header.
+            last_modified (str, optional): The response's Last-Modified header.
+            digest (str, optional): Digest of the body. Defaults to computing it.
+        """
+        entry = {
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "digest": digest or SQLiteCache.digest(body),
+            "endpoint": endpoint,
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, endpoint=None):
+        """
+        Drops stored entries.
+
+        Args:
+            endpoint (str, optional): An endpoint path such as "radios/abc" drops that
+                endpoint; a bare group such as "radios" drops the whole group. Defaults to
+                dropping everything.
+        """
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+                return
+            if "/" in endpoint:
+                stale = [k for k, e in self._entries.items() if e["endpoint"] == endpoint]
+            else:
+                stale = [k for k, e in self._entries.items() if SQLiteCache.group(e["endpoint"]) == endpoint]
+            for key in stale:
+                del self._entries[key]
@@ -0,0 +1,140 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # optional, faster JSON backend
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # optional, faster JSON backend
+    msgspec = None
+
+
+class CodecError(ValueError):
+    """
+    Raised when a body can't be encoded to or decoded from JSON.
+    """
+
+
+class JSONCodec:
+    """
+    Encodes request bodies and decodes response bodies with the standard library ``json``.
+
+    A codec is any object with ``loads(data)`` taking bytes or str and ``dumps(obj)``
+    returning bytes, both raising CodecError (or another ValueError) on failure; subclass
+    this one to plug in another implementation. The faster codecs fall back to this one
+    for input their backend rejects, so they accept everything the standard library does.
+    """
+
+    name = "json"
+
+    def loads(self, data):
+        try:
+            return json.loads(data)
+        except ValueError as e:  # includes JSONDecodeError and UnicodeDecodeError
+            raise CodecError(f"Invalid JSON: {e}") from e
+
+    def dumps(self, obj):
+        try:
+            return json.dumps(obj, separators=(",", ":")).encode()
+        except (TypeError, ValueError) as e:
+            raise CodecError(f"Cannot encode as JSON: {e}") from e
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    JSON codec backed by ``orjson`` (pip install orjson).
+
+    NumPy scalars and arrays are encoded natively; other input orjson rejects, such as
+    integers wider than 64 bits, is encoded with the standard library.
+    """
+
+    name = "orjson"
+    OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson is not None else 0
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is required for the orjson codec (pip install orjson)")
+
+    def loads(self, data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return super().loads(data)
+
+    def dumps(self, obj):
+        try:
+            return orjson.dumps(obj, option=self.OPTIONS)
+        except TypeError:
+            return super().dumps(obj)
+
+
+class MsgspecCodec(JSONCodec):
+    """
+    JSON codec backed by ``msgspec`` (pip install msgspec).
+
+    Input msgspec rejects is handled by the standard library.
+    """
+
+    name = "msgspec"
+
+    def __init__(self):
+        if msgspec is None:
+            raise ImportError("msgspec is required for the msgspec codec (pip install msgspec)")
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def loads(self, data):
+        try:
+            return self._decoder.decode(data)
+        except msgspec.DecodeError:
+            return super().loads(data)
+
+    def dumps(self, obj):
+        try:
+            return self._encoder.encode(obj)
+        except (TypeError, ValueError, msgspec.EncodeError):
+            return super().dumps(obj)
+
+
+# Codec classes by name, fastest first.
+CODECS = {"orjson": OrjsonCodec, "msgspec": MsgspecCodec, "json": JSONCodec}
+
+
+def available_codecs():
+    """
+    Returns the names of the codecs whose backend is installed, fastest first.
+
+    Returns:
+        list: Codec names, always ending with "json".
+    """
+    installed = {"orjson": orjson is not None, "msgspec": msgspec is not None, "json": True}
+    return [name for name in CODECS if installed[name]]
+
+
+def get_codec(codec=None):
+    """
+    Resolves the ``codec`` argument of the clients.
+
+    Args:
+        codec (str or object, optional): "orjson", "msgspec", "json", "auto" or None for
+            the fastest installed backend, or a codec object, which is returned as is.
+
+    Returns:
+        JSONCodec: The codec.
+
+    Raises:
+        ImportError: If the named backend isn't installed.
+        ValueError: If the name is unknown.
+    """
+    if codec is None or codec == "auto":
+        return CODECS[available_codecs()[0]]()
+    if isinstance(codec, str):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec {codec!r}; expected one of {', '.join(CODECS)}")
+        return CODECS[codec]()
+    return codec
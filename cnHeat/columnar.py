@@ -0,0 +1,359 @@
+import math
+import operator
+import sys
+from array import array
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional; columns fall back to array.array and lists
+    numpy = None
+
+from .models import Radio
+
+
+# Numeric radio columns keyed by column name (the Radio model attribute), valued by API field.
+NUMERIC_COLUMNS = {
+    attr: Radio.FIELDS[attr]
+    for attr in ("frequency", "azimuth", "height", "tilt", "tx_power", "rooftop_height", "radius", "sm_gain", "tx_clearance", "foliage_tuning")
+}
+STRING_COLUMNS = {attr: Radio.FIELDS[attr] for attr in ("id", "name", "site_id", "antenna")}
+
+OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+def _float(value):
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _numeric(values):
+    if numpy is not None:
+        return numpy.array(values, dtype=numpy.float64)
+    return array("d", values)
+
+
+def _codes(values):
+    if numpy is not None:
+        return numpy.array(values, dtype=numpy.int32)
+    return array("l", values)
+
+
+class StringColumn:
+    """
+    Dictionary-encoded string column: every distinct value is stored once (interned) and
+    rows hold an integer code into ``values``. None is stored like any other value.
+
+    Attributes:
+        values (list): Distinct values in order of first appearance.
+        codes (numpy.ndarray or array.array): Code of every row.
+    """
+
+    def __init__(self, values, codes):
+        self.values = values
+        self.codes = codes
+        self._index = {value: code for code, value in enumerate(values)}
+
+    @classmethod
+    def from_values(cls, items):
+        """
+        Encodes an iterable of strings.
+        """
+        values, index, codes = [], {}, []
+        for item in items:
+            code = index.get(item)
+            if code is None:
+                code = index[item] = len(values)
+                values.append(sys.intern(item) if isinstance(item, str) else item)
+            codes.append(code)
+        return cls(values, _codes(codes))
+
+    def code(self, value):
+        """
+        Returns the code of a value, or None if no row holds it.
+        """
+        return self._index.get(value)
+
+    def take(self, indices):
+        """
+        Returns a column holding the given rows, sharing the distinct values.
+        """
+        if numpy is not None:
+            codes = self.codes[indices]
+        else:
+            codes = _codes([self.codes[i] for i in indices])
+        column = StringColumn.__new__(StringColumn)
+        column.values, column.codes, column._index = self.values, codes, self._index
+        return column
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+    def __iter__(self):
+        values = self.values
+        return (values[code] for code in self.codes)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __repr__(self):
+        return f"<StringColumn rows={len(self)} distinct={len(self.values)}>"
+
+
+class RadioTable:
+    """
+    Radios stored as columns, for fleet-wide analysis without looping over dicts.
+
+    Numeric fields are float arrays (NumPy arrays when NumPy is installed, ``array.array``
+    otherwise), with NaN for missing values; ``id``, ``name``, ``site_id`` and ``antenna``
+    are StringColumns. Columns are named after the Radio model attributes (``tx_power``);
+    API field names (``"txpower(dbm)"``) are accepted too.
+
+    Args:
+        columns (dict): Columns keyed by name, all of the same length.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    @classmethod
+    def from_radios(cls, radios, site_id=None):
+        """
+        Builds a table from radio dicts or Radio models, e.g. the output of get_site_radios().
+
+        Args:
+            radios (iterable): Radios to store.
+            site_id (str, optional): Site of every radio, for radios that don't carry one.
+
+        Returns:
+            RadioTable: The table.
+        """
+        numeric = {name: [] for name in NUMERIC_COLUMNS}
+        strings = {name: [] for name in STRING_COLUMNS}
+        for radio in radios:
+            get = radio.get
+            for name, field in NUMERIC_COLUMNS.items():
+                numeric[name].append(_float(get(field)))
+            for name, field in STRING_COLUMNS.items():
+                strings[name].append(get(field))
+            if site_id is not None and strings["site_id"][-1] is None:
+                strings["site_id"][-1] = site_id
+        columns = {name: _numeric(values) for name, values in numeric.items()}
+        columns.update((name, StringColumn.from_values(values)) for name, values in strings.items())
+        return cls(columns)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """
+        Builds a table of every radio in an InventorySnapshot.
+
+        Args:
+            snapshot (InventorySnapshot): Snapshot to read.
+
+        Returns:
+            RadioTable: The table, with ``site_id`` set from the snapshot.
+        """
+        def radios():
+            for site_id, site_radios in snapshot.radios.items():
+                for radio in site_radios:
+                    yield radio if radio.get("site_id") is not None else dict(radio, site_id=site_id)
+        return cls.from_radios(radios())
+
+    def column(self, name):
+        """
+        Returns a column by name or API field name.
+
+        Raises:
+            KeyError: If there is no such column.
+        """
+        column = self.columns.get(name)
+        if column is None:
+            column = self.columns.get(Radio._attributes.get(name))
+            if column is None:
+                raise KeyError(name)
+        return column
+
+    __getitem__ = column
+
+    def mask(self, name, op, value):
+        """
+        Compares a column with a value, row by row.
+
+        NaN (missing) values never match except with "!=".
+
+        Args:
+            name (str): Column name or API field name.
+            op (str): One of "==", "!=", "<", "<=", ">", ">=", "in".
+            value: Value to compare with; a collection for "in".
+
+        Returns:
+            numpy.ndarray or list: One bool per row.
+        """
+        column = self.column(name)
+        if isinstance(column, StringColumn):
+            if op in ("==", "!=", "in"):
+                wanted = [value] if op != "in" else value
+                codes = [c for c in (column.code(v) for v in wanted) if c is not None]
+                if numpy is not None:
+                    matches = numpy.isin(column.codes, codes)
+                    return ~matches if op == "!=" else matches
+                codes = set(codes)
+                return [(code in codes) != (op == "!=") for code in column.codes]
+            compare = OPERATORS[op]
+            flags = [v is not None and compare(v, value) for v in column.values]
+            if numpy is not None:
+                return numpy.array(flags, dtype=bool)[column.codes]
+            return [flags[code] for code in column.codes]
+        if op == "in":
+            if numpy is not None:
+                return numpy.isin(column, list(value))
+            value = set(value)
+            return [x in value for x in column]
+        compare = OPERATORS[op]
+        if numpy is not None:
+            return compare(column, value)
+        return [compare(x, value) for x in column]
+
+    def filter(self, *masks, **equals):
+        """
+        Returns the rows matching every mask and every ``column=value`` equality.
+
+        Example: ``table.filter(table.mask("tilt", ">", 0), frequency=5.8)``.
+
+        Args:
+            *masks: Row masks from mask(), or any sequences of one bool per row.
+            **equals: Columns that must equal the given values.
+
+        Returns:
+            RadioTable: The matching rows.
+        """
+        masks = list(masks) + [self.mask(name, "==", value) for name, value in equals.items()]
+        if not masks:
+            return self
+        if numpy is not None:
+            combined = numpy.logical_and.reduce([numpy.asarray(m, dtype=bool) for m in masks])
+            return self.take(numpy.flatnonzero(combined))
+        return self.take([i for i, flags in enumerate(zip(*masks)) if all(flags)])
+
+    def take(self, indices):
+        """
+        Returns a table of the given rows, in the given order.
+        """
+        columns = {}
+        for name, column in self.columns.items():
+            if isinstance(column, StringColumn):
+                columns[name] = column.take(indices)
+            elif numpy is not None:
+                columns[name] = column[indices]
+            else:
+                columns[name] = array("d", (column[i] for i in indices))
+        return RadioTable(columns)
+
+    def group_by(self, name):
+        """
+        Splits the table by the values of a column.
+
+        Args:
+            name (str): Column to group by, e.g. "site_id" or "frequency".
+
+        Returns:
+            dict: RadioTables keyed by column value, in order of first appearance.
+        """
+        column = self.column(name)
+        keys = column.codes if isinstance(column, StringColumn) else column
+        groups = {}
+        if numpy is not None:
+            unique, first, inverse = numpy.unique(keys, return_index=True, return_inverse=True)
+            order = numpy.argsort(inverse, kind="stable")
+            splits = numpy.split(order, numpy.cumsum(numpy.bincount(inverse, minlength=len(unique)))[:-1])
+            for group in numpy.argsort(first):
+                groups[unique[group].item()] = splits[group]
+        else:
+            for i, key in enumerate(keys):
+                groups.setdefault(key, []).append(i)
+        if isinstance(column, StringColumn):
+            return {column.values[code]: self.take(indices) for code, indices in groups.items()}
+        return {key: self.take(indices) for key, indices in groups.items()}
+
+    def aggregate(self, by, name, how="mean"):
+        """
+        Summarizes a numeric column per group, ignoring NaN values.
+
+        Args:
+            by (str): Column to group by.
+            name (str): Numeric column to summarize.
+            how (str or callable, optional): "mean", "min", "max", "sum" or "count", or a
+                function of the group's values (a list of floats). Defaults to "mean".
+
+        Returns:
+            dict: Summaries keyed by group value; None for groups without values.
+        """
+        results = {}
+        for key, table in self.group_by(by).items():
+            column = table.column(name)
+            if numpy is not None:
+                values = column[~numpy.isnan(column)].tolist()
+            else:
+                values = [x for x in column if x == x]  # drop NaN
+            if callable(how):
+                results[key] = how(values)
+            elif how == "count":
+                results[key] = len(values)
+            elif not values:
+                results[key] = None
+            elif how == "mean":
+                results[key] = sum(values) / len(values)
+            else:
+                results[key] = {"min": min, "max": max, "sum": sum}[how](values)
+        return results
+
+    def azimuth_gaps(self):
+        """
+        Returns the widest azimuth gap between neighbouring radios of each site.
+
+        Returns:
+            dict: Gap in degrees keyed by site ID; 360 for sites with one azimuth.
+        """
+        gaps = {}
+        for site_id, table in self.group_by("site_id").items():
+            azimuths = sorted({x % 360 for x in table.column("azimuth") if x == x})
+            if not azimuths:
+                continue
+            wrap = 360 - azimuths[-1] + azimuths[0]
+            gaps[site_id] = max([b - a for a, b in zip(azimuths, azimuths[1:])] + [wrap])
+        return gaps
+
+    def to_dicts(self):
+        """
+        Returns the rows as radio dicts keyed by API field name; numeric values come back as
+        floats and missing values are left out.
+        """
+        names = [(name, NUMERIC_COLUMNS.get(name) or STRING_COLUMNS[name], self.columns[name]) for name in self.columns]
+        rows = []
+        for i in range(len(self)):
+            row = {}
+            for name, field, column in names:
+                value = column[i]
+                if isinstance(column, StringColumn):
+                    if value is not None:
+                        row[field] = value
+                elif value == value:
+                    row[field] = float(value)
+            rows.append(row)
+        return rows
+
+    def __len__(self):
+        return len(self.columns["id"])
+
+    def __repr__(self):
+        return f"<RadioTable rows={len(self)} backend={'numpy' if numpy is not None else 'array'}>"
@@ -0,0 +1,86 @@
+import time
+
+from .columnar import RadioTable
+
+
+class InventorySnapshot:
+    """
+    Every site on the account together with its radios, indexed for lookup.
+
+    Attributes:
+        sites (dict): Site objects keyed by site ID.
+        radios (dict): Lists of radio objects keyed by site ID.
+        errors (dict): Exceptions keyed by the ID of each site whose radios could not be fetched.
+        taken_at (float): Unix time at which the snapshot was started.
+    """
+
+    def __init__(self, sites, taken_at=None):
+        self.sites = {s['id']: s for s in sites if 'id' in s}
+        self.radios = {}
+        self.errors = {}
+        self.taken_at = time.time() if taken_at is None else taken_at
+        self._radios_by_id = None
+
+    def add(self, site_id, radios=None, error=None):
+        """
+        Records the outcome of fetching one site's radios.
+
+        Args:
+            site_id (str): ID of the site.
+            radios (list, optional): Radios returned for the site.
+            error (Exception, optional): Error raised while fetching the site's radios.
+        """
+        if error is not None:
+            self.errors[site_id] = error
+        else:
+            self.radios[site_id] = radios
+        self._radios_by_id = None
+
+    @property
+    def complete(self):
+        """bool: True if the radios of every site were fetched."""
+        return not self.errors
+
+    @property
+    def radios_by_id(self):
+        """dict: Every radio in the snapshot keyed by radio ID."""
+        if self._radios_by_id is None:
+            self._radios_by_id = {r['id']: r for radios in self.radios.values() for r in radios if 'id' in r}
+        return self._radios_by_id
+
+    def site_radios(self, site_id):
+        """
+        Returns the radios of a site.
+
+        Args:
+            site_id (str): ID of the site.
+
+        Returns:
+            list: Radios of the site, or an empty list if none were fetched.
+        """
+        return self.radios.get(site_id, [])
+
+    def to_table(self):
+        """
+        Returns every radio in the snapshot as a columnar RadioTable.
+
+        Returns:
+            RadioTable: The radios, with ``site_id`` set.
+        """
+        return RadioTable.from_snapshot(self)
+
+    def to_dict(self):
+        """
+        Returns the snapshot as plain data.
+
+        Returns:
+            dict: Site objects keyed by site ID, each with a "radios" list added.
+        """
+        return {site_id: dict(site, radios=self.site_radios(site_id)) for site_id, site in self.sites.items()}
+
+    def __len__(self):
+        return len(self.sites)
+
+    def __repr__(self):
+        radio_count = sum(len(r) for r in self.radios.values())
+        return f"<InventorySnapshot sites={len(self.sites)} radios={radio_count} errors={len(self.errors)}>"
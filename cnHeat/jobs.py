@@ -0,0 +1,137 @@
+import time
+
+
+class PredictionTracker:
+    """
+    Tracks a set of prediction jobs across polls of the jobmanagement endpoint.
+
+    A job is finished once its status is one of ``done_states``, or once it has been seen
+    in the listing and then disappears from it. Jobs missing from the first listing are
+    settled with resolve_unlisted(). The polling interval starts at
+    ``poll_interval``, grows by ``backoff`` on every tick where nothing changes, and drops
+    back as soon as any job changes status.
+
+    Args:
+        prediction_ids (iterable): IDs of the predictions to track.
+        poll_interval (float, optional): Shortest wait between polls, in seconds. Defaults to 2.
+        max_interval (float, optional): Longest wait between polls, in seconds. Defaults to 30.
+        backoff (float, optional): Growth factor applied to an idle interval. Defaults to 1.5.
+        done_states (iterable, optional): Statuses, compared case-insensitively, that mean
+            a job has finished. Defaults to DONE_STATES.
+    """
+
+    DONE_STATES = frozenset({
+        "complete", "completed", "done", "finished", "success", "succeeded",
+        "failed", "failure", "error", "cancelled", "canceled",
+    })
+
+    def __init__(self, prediction_ids, poll_interval=2.0, max_interval=30.0, backoff=1.5, done_states=DONE_STATES):
+        self.pending = set(prediction_ids)
+        self.results = {}
+        self.polls = 0
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.done_states = frozenset(s.lower() for s in done_states)
+        self.interval = poll_interval
+        self._last_seen = {}
+
+    @staticmethod
+    def job_id(job):
+        """
+        Returns the prediction ID a job status object refers to.
+        """
+        return job.get("prediction_id", job.get("id"))
+
+    def update(self, jobs):
+        """
+        Applies one poll of the jobmanagement endpoint.
+
+        Args:
+            jobs (list): Job status objects returned by get_predictions_statuses().
+
+        Returns:
+            list: ``(prediction_id, job)`` pairs for the jobs that finished in this poll.
+        """
+        self.polls += 1
+        listed = {}
+        for job in jobs:
+            prediction_id = self.job_id(job)
+            if prediction_id in self.pending:
+                listed[prediction_id] = job
+        finished = []
+        changed = False
+        for prediction_id in list(self.pending):
+            job = listed.get(prediction_id)
+            previous = self._last_seen.get(prediction_id)
+            if job is None:
+                if previous is None:
+                    continue  # not listed yet
+                finished.append((prediction_id, previous))
+                continue
+            if previous is None or previous.get("status") != job.get("status"):
+                changed = True
+            self._last_seen[prediction_id] = job
+            if str(job.get("status", "")).lower() in self.done_states:
+                finished.append((prediction_id, job))
+        for prediction_id, job in finished:
+            self.pending.discard(prediction_id)
+            self.results[prediction_id] = job
+        if finished or changed:
+            self.interval = self.poll_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        return finished
+
+    def unlisted(self):
+        """
+        Returns the pending IDs no poll has listed so far.
+        """
+        return sorted(p for p in self.pending if p not in self._last_seen)
+
+    def resolve_unlisted(self, predictions):
+        """
+        Settles the pending jobs that no poll has listed, using the account's predictions.
+
+        A job that finished before the first poll is no longer listed, so an unlisted ID
+        found in ``predictions`` counts as finished with the prediction object as its
+        result. An ID missing from both doesn't exist; it stops being tracked and is
+        returned as failed.
+
+        Args:
+            predictions (list): Prediction objects returned by get_predictions().
+
+        Returns:
+            tuple: ``(finished, failed)``; ``(prediction_id, prediction)`` pairs for the
+                jobs now finished and a list of the IDs that don't exist.
+        """
+        known = {p.get("id"): p for p in predictions}
+        finished, failed = [], []
+        for prediction_id in self.unlisted():
+            self.pending.discard(prediction_id)
+            prediction = known.get(prediction_id)
+            if prediction is None:
+                failed.append(prediction_id)
+            else:
+                self.results[prediction_id] = prediction
+                finished.append((prediction_id, prediction))
+        return finished, failed
+
+    @property
+    def done(self):
+        """bool: True once every tracked job has finished."""
+        return not self.pending
+
+    def next_delay(self, deadline=None):
+        """
+        Returns how long to wait before the next poll.
+
+        Args:
+            deadline (float, optional): time.monotonic() value after which waiting stops.
+
+        Returns:
+            float: Seconds to wait, never past the deadline.
+        """
+        if deadline is None:
+            return self.interval
+        return max(0.0, min(self.interval, deadline - time.monotonic()))
@@ -0,0 +1,304 @@
+import bisect
+import copy
+import threading
+import time
+
+
+# Path segments that are part of an endpoint's name rather than an object ID.
+STATIC_SEGMENTS = frozenset({"jobmanagement", "rename", "renew", "terminate", "token"})
+
+
+def endpoint_template(path):
+    """
+    Returns the endpoint a request path belongs to, with object IDs replaced by ``{id}``.
+
+    Args:
+        path (str): Endpoint path relative to the API base, e.g. "radios/5f2a".
+
+    Returns:
+        str: The endpoint template, e.g. "radios/{id}".
+    """
+    parts = path.split("?", 1)[0].strip("/").split("/")
+    return "/".join(p if i == 0 or p in STATIC_SEGMENTS else "{id}" for i, p in enumerate(parts))
+
+
+class RequestEvent:
+    """
+    What happened to one API call, handed to request hooks.
+
+    ``before_request`` hooks see the method, path and endpoint; ``after_request`` hooks see
+    the complete event.
+
+    Attributes:
+        method (str): HTTP method.
+        path (str): Endpoint path relative to the API base.
+        endpoint (str): Endpoint template, e.g. "radios/{id}".
+        status (int): HTTP status of the final response, or None if none was received.
+        bytes (int): Size of the response body.
+        latency (float): Seconds from the first attempt to the final response, including
+            retries and rate-limiter waits.
+        retries (int): Attempts made after the first.
+        rate_limit_wait (float): Seconds spent waiting on the rate limiter.
+        cache (str): For reads through the client's cache, or revalidating a body kept in
+            memory from an earlier response, "hit" if served without a request,
+            "revalidated" if the server answered 304, "miss" if the body was downloaded;
+            None for other calls.
+        error (Exception): Exception raised to the caller, if any.
+        started (float): Unix time the call started.
+    """
+
+    def __init__(self, method, path, cache=None):
+        self.method = method.upper()
+        self.path = path
+        self.endpoint = endpoint_template(path)
+        self.status = None
+        self.bytes = 0
+        self.latency = None
+        self.retries = 0
+        self.rate_limit_wait = 0.0
+        self.cache = cache
+        self.error = None
+        self.started = time.time()
+
+    def __repr__(self):
+        return f"<RequestEvent {self.method} {self.endpoint} status={self.status} latency={self.latency}>"
+
+
+class RequestHook:
+    """
+    Adapts plain functions to the request hook interface.
+
+    Hooks are objects with ``before_request(event)`` and/or ``after_request(event)``
+    methods, each called with a RequestEvent. Exceptions raised by a hook are logged and
+    don't affect the API call.
+
+    Args:
+        before (callable, optional): Called before each API call.
+        after (callable, optional): Called after each API call, including failed ones.
+    """
+
+    def __init__(self, before=None, after=None):
+        self.before = before
+        self.after = after
+
+    def before_request(self, event):
+        if self.before is not None:
+            self.before(event)
+
+    def after_request(self, event):
+        if self.after is not None:
+            self.after(event)
+
+
+class LatencyHistogram:
+    """
+    Cumulative latency histogram with fixed bucket bounds.
+
+    Percentiles are estimated by interpolating within the bucket that holds them.
+
+    Args:
+        buckets (iterable, optional): Upper bounds in seconds. Defaults to DEFAULT_BUCKETS.
+    """
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.bounds) + 1)  # the last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        """
+        Records one sample.
+        """
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q):
+        """
+        Estimates a percentile.
+
+        Args:
+            q (float): Percentile between 0 and 100.
+
+        Returns:
+            float: Estimated latency in seconds, or None without samples.
+        """
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(self.max, lower + (upper - lower) * (rank - seen) / n)
+            seen += n
+        return self.max
+
+    @property
+    def mean(self):
+        """float: Mean latency in seconds, or None without samples."""
+        return self.sum / self.count if self.count else None
+
+
+class EndpointStats:
+    """
+    Aggregated calls of one method and endpoint.
+
+    Attributes:
+        requests (int): Completed calls, including cache hits.
+        errors (dict): Failed calls keyed by exception class name.
+        statuses (dict): Calls keyed by final HTTP status.
+        retries (int): Retries across all calls.
+        bytes (int): Response bytes received.
+        cache (dict): Calls keyed by cache outcome ("hit", "revalidated", "miss").
+        rate_limit_wait (float): Seconds spent waiting on the rate limiter.
+        latency (LatencyHistogram): Call latencies.
+    """
+
+    def __init__(self, buckets=LatencyHistogram.DEFAULT_BUCKETS):
+        self.requests = 0
+        self.errors = {}
+        self.statuses = {}
+        self.retries = 0
+        self.bytes = 0
+        self.cache = {}
+        self.rate_limit_wait = 0.0
+        self.latency = LatencyHistogram(buckets)
+
+    def record(self, event):
+        """
+        Adds a finished RequestEvent.
+        """
+        self.requests += 1
+        if event.error is not None:
+            name = type(event.error).__name__
+            self.errors[name] = self.errors.get(name, 0) + 1
+        if event.status is not None:
+            self.statuses[event.status] = self.statuses.get(event.status, 0) + 1
+        if event.cache is not None:
+            self.cache[event.cache] = self.cache.get(event.cache, 0) + 1
+        self.retries += event.retries
+        self.bytes += event.bytes
+        self.rate_limit_wait += event.rate_limit_wait
+        self.latency.observe(event.latency or 0.0)
+
+    def to_dict(self):
+        """
+        Returns the statistics as plain data, with latencies in seconds.
+        """
+        latency = self.latency
+        return {
+            "requests": self.requests,
+            "errors": dict(self.errors),
+            "statuses": dict(self.statuses),
+            "retries": self.retries,
+            "bytes": self.bytes,
+            "cache": dict(self.cache),
+            "rate_limit_wait": self.rate_limit_wait,
+            "latency": {
+                "mean": latency.mean,
+                "p50": latency.percentile(50),
+                "p95": latency.percentile(95),
+                "p99": latency.percentile(99),
+                "max": latency.max,
+            },
+        }
+
+
+class MetricsCollector:
+    """
+    Request hook that keeps per-endpoint counters and latency histograms in memory.
+
+    Pass it to a client's ``hooks`` and read it with to_dict() or str(), or expose it with
+    the prometheus module. One collector may be shared by several clients and threads.
+    It also tracks how many prediction jobs wait_for_predictions() is waiting on.
+
+    Args:
+        buckets (iterable, optional): Latency histogram bounds in seconds. Defaults to
+            LatencyHistogram.DEFAULT_BUCKETS.
+    """
+
+    def __init__(self, buckets=LatencyHistogram.DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.endpoints = {}  # (method, endpoint) -> EndpointStats
+        self.in_flight = 0
+        self.started = time.time()
+        self._pending_jobs = {}  # waiter key -> jobs still pending
+        self._lock = threading.Lock()
+
+    @property
+    def pending_predictions(self):
+        """int: Prediction jobs currently being waited on."""
+        return sum(self._pending_jobs.values())
+
+    def predictions_pending(self, key, count):
+        """
+        Hook called by wait_for_predictions() after every poll.
+
+        Args:
+            key: Identifies the waiter.
+            count (int): Jobs the waiter is still waiting on; 0 once it stops.
+        """
+        with self._lock:
+            if count:
+                self._pending_jobs[key] = count
+            else:
+                self._pending_jobs.pop(key, None)
+
+    def before_request(self, event):
+        with self._lock:
+            self.in_flight += 1
+
+    def after_request(self, event):
+        with self._lock:
+            self.in_flight -= 1
+            key = (event.method, event.endpoint)
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats(self.buckets)
+            stats.record(event)
+
+    def snapshot(self):
+        """
+        Returns a consistent copy of the current state.
+
+        Returns:
+            tuple: ``(endpoints, in_flight, pending_predictions)`` where ``endpoints`` maps
+                ``(method, endpoint)`` to a copy of its EndpointStats.
+        """
+        with self._lock:
+            return copy.deepcopy(self.endpoints), self.in_flight, self.pending_predictions
+
+    def reset(self):
+        """
+        Drops everything recorded so far.
+        """
+        with self._lock:
+            self.endpoints = {}
+            self.started = time.time()
+
+    def to_dict(self):
+        """
+        Returns the statistics of every endpoint.
+
+        Returns:
+            dict: EndpointStats.to_dict() output keyed by "METHOD endpoint".
+        """
+        with self._lock:
+            return {f"{method} {endpoint}": stats.to_dict() for (method, endpoint), stats in sorted(self.endpoints.items())}
+
+    def __str__(self):
+        rows = [f"{'endpoint':<36} {'count':>6} {'errors':>6} {'retries':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"]
+        for name, stats in self.to_dict().items():
+            latency = stats["latency"]
+            rows.append(
+                f"{name:<36} {stats['requests']:>6} {sum(stats['errors'].values()):>6} {stats['retries']:>7} "
+                f"{latency['p50'] * 1000:>8.1f} {latency['p95'] * 1000:>8.1f} {latency['p99'] * 1000:>8.1f}"
+            )
+        return "\n".join(rows)
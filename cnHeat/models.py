@@ -0,0 +1,177 @@
+class Model:
+    """
+    Base of the compact record types returned by the fetchers' ``models()`` methods.
+
+    A model stores each known API field in a slot, under a Python attribute name
+    (``radio.height`` for ``"height(m)"``), so it takes a fraction of the memory of the
+    equivalent dict and reads faster. Fields the model doesn't know are kept in ``extra``.
+    Items can also be read by API field name, like the dicts: ``radio["height(m)"]``; a
+    known field that is null or absent reads as None.
+
+    Models compare equal when all their fields are equal and hash by type and ``KEY``
+    field, so they can be used in sets and as dict keys as long as that field isn't
+    changed afterwards.
+
+    Subclasses list their fields in ``FIELDS``, mapping attribute name to API field name,
+    and declare the same attribute names in ``__slots__``. ``ALIASES`` maps other API
+    spellings of a field to its attribute; they are read when the main field is missing
+    and written back under the main name.
+    """
+
+    __slots__ = ("extra",)
+    FIELDS = {}
+    ALIASES = {}
+    KEY = "id"
+    _attributes = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._attributes = {field: attr for attr, field in cls.FIELDS.items()}  # API field -> attribute
+        cls._attributes.update(cls.ALIASES)
+
+    def __init__(self, extra=None, **fields):
+        for attr in self.FIELDS:
+            setattr(self, attr, fields.pop(attr, None))
+        if fields:
+            raise TypeError(f"Unknown {type(self).__name__} fields: {', '.join(fields)}")
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Builds a model from an object as returned by the API.
+
+        Args:
+            data (dict): The API object.
+
+        Returns:
+            Model: The model.
+        """
+        obj = cls.__new__(cls)
+        for attr, field in cls.FIELDS.items():
+            setattr(obj, attr, data.get(field))
+        for alias, attr in cls.ALIASES.items():
+            if alias in data and getattr(obj, attr) is None:
+                setattr(obj, attr, data[alias])
+        attributes = cls._attributes
+        obj.extra = {k: v for k, v in data.items() if k not in attributes} or None
+        return obj
+
+    def to_dict(self):
+        """
+        Returns the model as an API object; fields that are None are left out.
+
+        Returns:
+            dict: Fields keyed by API field name, including ``extra``.
+        """
+        data = {}
+        for attr, field in self.FIELDS.items():
+            value = getattr(self, attr)
+            if value is not None:
+                data[field] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def _attribute(self, field):
+        attr = self._attributes.get(field)
+        if attr is None and field in self.FIELDS:
+            attr = field
+        return attr
+
+    def get(self, field, default=None):
+        """
+        Returns a field by API field name (or attribute name), like dict.get(); known
+        fields that are None return ``default``.
+        """
+        attr = self._attribute(field)
+        if attr is not None:
+            value = getattr(self, attr)
+            return default if value is None else value
+        return (self.extra or {}).get(field, default)
+
+    def __getitem__(self, field):
+        attr = self._attribute(field)
+        if attr is not None:
+            return getattr(self, attr)
+        if self.extra and field in self.extra:
+            return self.extra[field]
+        raise KeyError(field)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, attr) == getattr(other, attr) for attr in self.__slots__) and self.extra == other.extra
+
+    def __hash__(self):
+        return hash((type(self), getattr(self, self.KEY)))
+
+    def __repr__(self):
+        fields = ", ".join(f"{attr}={getattr(self, attr)!r}" for attr in self.FIELDS if getattr(self, attr) is not None)
+        return f"{type(self).__name__}({fields})"
+
+
+class Site(Model):
+    """A site (tower) and its location; the site creation endpoint spells it "lat"/"lon"."""
+
+    __slots__ = ("id", "name", "latitude", "longitude")
+    FIELDS = {"id": "id", "name": "name", "latitude": "latitude", "longitude": "longitude"}
+    ALIASES = {"lat": "latitude", "lon": "longitude"}
+
+
+class Radio(Model):
+    """
+    A radio on a site.
+
+    ``site_id`` isn't part of the API object; the site radio fetchers fill it in.
+    """
+
+    __slots__ = (
+        "id", "name", "site_id", "antenna", "frequency", "azimuth", "height", "tilt", "tx_power",
+        "rooftop_height", "radius", "sm_gain", "tx_clearance", "foliage_tuning",
+    )
+    FIELDS = {
+        "id": "id",
+        "name": "name",
+        "site_id": "site_id",
+        "antenna": "antenna",
+        "frequency": "frequency(ghz)",
+        "azimuth": "azimuth",
+        "height": "height(m)",
+        "tilt": "tilt",
+        "tx_power": "txpower(dbm)",
+        "rooftop_height": "height_rooftop(m)",
+        "radius": "radius(m)",
+        "sm_gain": "sm_gain(dbi)",
+        "tx_clearance": "txclearance(m)",
+        "foliage_tuning": "foliage_tuning",
+    }
+
+
+class Antenna(Model):
+    """An antenna from a frequency's catalog; ``name`` is the API's ``antenna`` field."""
+
+    __slots__ = ("id", "name", "frequency", "gain")
+    FIELDS = {"id": "id", "name": "antenna", "frequency": "frequency", "gain": "gain"}
+
+
+class Prediction(Model):
+    """A coverage prediction."""
+
+    __slots__ = ("id", "name", "radio_list", "status")
+    FIELDS = {"id": "id", "name": "name", "radio_list": "radio_list", "status": "status"}
+
+
+class User(Model):
+    """A user of the account."""
+
+    __slots__ = ("email", "permission")
+    FIELDS = {"email": "email", "permission": "permission"}
+    KEY = "email"
+
+
+class Subscription(Model):
+    """A site subscription."""
+
+    __slots__ = ("id", "site")
+    FIELDS = {"id": "id", "site": "site"}
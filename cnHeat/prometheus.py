@@ -0,0 +1,162 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(collector, namespace="cnheat"):
+    """
+    Renders a MetricsCollector in the Prometheus text exposition format.
+
+    Every per-endpoint series is labelled with ``method`` and ``endpoint`` (the endpoint
+    template, e.g. "radios/{id}").
+
+    Args:
+        collector (MetricsCollector): Collector to render.
+        namespace (str, optional): Prefix of every metric name. Defaults to "cnheat".
+
+    Returns:
+        str: The exposition text.
+    """
+    endpoints, in_flight, pending_predictions = collector.snapshot()
+    items = sorted(endpoints.items())
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        name = f"{namespace}_{name}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value, *suffix in samples:
+            lines.append(f"{name}{''.join(suffix)}{_labels(**labels) if labels else ''} {_number(value)}")
+
+    requests_total = []
+    for (m, e), stats in items:
+        for status, n in sorted(stats.statuses.items()):
+            requests_total.append((dict(method=m, endpoint=e, status=status), n))
+        unanswered = stats.requests - sum(stats.statuses.values())
+        if unanswered:
+            requests_total.append((dict(method=m, endpoint=e, status=""), unanswered))
+    metric("requests_total", "counter", "API calls by final status; status is empty for cache hits and transport errors.", requests_total)
+    metric("request_errors_total", "counter", "API calls that raised, by exception class.", [
+        (dict(method=m, endpoint=e, error=error), n) for (m, e), stats in items for error, n in sorted(stats.errors.items())
+    ])
+    metric("request_retries_total", "counter", "Retried attempts.", [
+        (dict(method=m, endpoint=e), stats.retries) for (m, e), stats in items
+    ])
+    metric("response_bytes_total", "counter", "Response body bytes received.", [
+        (dict(method=m, endpoint=e), stats.bytes) for (m, e), stats in items
+    ])
+    metric("cache_requests_total", "counter", "Cacheable reads by outcome (hit, revalidated, miss).", [
+        (dict(method=m, endpoint=e, result=result), n) for (m, e), stats in items for result, n in sorted(stats.cache.items())
+    ])
+    ratios = []
+    for (m, e), stats in items:
+        total = sum(stats.cache.values())
+        if total:
+            ratios.append((dict(method=m, endpoint=e), (stats.cache.get("hit", 0) + stats.cache.get("revalidated", 0)) / total))
+    metric("cache_hit_ratio", "gauge", "Share of cacheable reads answered without downloading the body.", ratios)
+    metric("rate_limit_wait_seconds_total", "counter", "Time spent waiting on the client-side rate limiter.", [
+        (dict(method=m, endpoint=e), stats.rate_limit_wait) for (m, e), stats in items
+    ])
+    durations = []
+    for (m, e), stats in items:
+        histogram = stats.latency
+        cumulative = 0
+        for bound, n in zip(histogram.bounds + (float("inf"),), histogram.counts):
+            cumulative += n
+            durations.append((dict(method=m, endpoint=e, le=_number(float(bound))), cumulative, "_bucket"))
+        durations.append((dict(method=m, endpoint=e), histogram.sum, "_sum"))
+        durations.append((dict(method=m, endpoint=e), histogram.count, "_count"))
+    metric("request_duration_seconds", "histogram", "API call latency including retries.", durations)
+    metric("requests_in_flight", "gauge", "API calls currently in progress.", [({}, in_flight)])
+    metric("prediction_jobs_pending", "gauge", "Prediction jobs wait_for_predictions() is waiting on.", [({}, pending_predictions)])
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Minimal HTTP server exposing a MetricsCollector at ``/metrics`` for Prometheus to scrape.
+
+    The server runs on a daemon thread and binds to localhost by default.
+
+    Args:
+        collector (MetricsCollector): Collector to expose.
+        port (int, optional): Port to listen on; 0 picks a free one. Defaults to 9464.
+        host (str, optional): Address to bind. Defaults to "127.0.0.1".
+        namespace (str, optional): Metric name prefix. Defaults to "cnheat".
+    """
+
+    def __init__(self, collector, port=9464, host="127.0.0.1", namespace="cnheat"):
+        self.collector = collector
+        self.namespace = namespace
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """str: Address of the metrics endpoint."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = render(server.collector, server.namespace).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """
+        Starts serving in the background.
+
+        Returns:
+            MetricsServer: The server itself.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="cnheat-metrics", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """
+        Stops the server and releases the port.
+        """
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Callers reserve tokens up front and are told how long to wait for them, so waiting
+    never holds the lock and the same bucket can be shared by threads and event loops.
+
+    Args:
+        rate (float): Tokens added per second.
+        capacity (float, optional): Largest burst allowed. Defaults to ``rate`` (at least 1).
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """
+        Takes tokens from the bucket, going into debt if it is empty.
+
+        Args:
+            tokens (float, optional): Tokens to take. Defaults to 1.
+
+        Returns:
+            float: Seconds the caller must wait before the tokens are available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self, tokens=1):
+        """
+        Blocks until tokens are available.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens=1):
+        """
+        Waits on the event loop until tokens are available.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class RateLimiter:
+    """
+    Client-side rate limiter with separate budgets for reads, writes and predictions.
+
+    Each budget is given as requests per second or as a TokenBucket; None leaves that class
+    unlimited. ``total`` additionally caps every request regardless of class. One limiter
+    may be shared by several cnHeat/AsyncCnHeat instances to enforce an account-wide budget.
+
+    Args:
+        read (float or TokenBucket, optional): Budget for GET requests.
+        write (float or TokenBucket, optional): Budget for POST/PATCH/DELETE requests.
+        prediction (float or TokenBucket, optional): Budget for any prediction endpoint,
+            including job status polling.
+        total (float or TokenBucket, optional): Budget shared by all requests.
+    """
+
+    READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+    def __init__(self, read=None, write=None, prediction=None, total=None):
+        self.buckets = {
+            "read": self._bucket(read),
+            "write": self._bucket(write),
+            "prediction": self._bucket(prediction),
+        }
+        self.total = self._bucket(total)
+
+    @staticmethod
+    def _bucket(budget):
+        if budget is None or isinstance(budget, TokenBucket):
+            return budget
+        return TokenBucket(budget)
+
+    @classmethod
+    def classify(cls, method, path):
+        """
+        Returns the endpoint class of a request.
+
+        Args:
+            method (str): HTTP method.
+            path (str): Endpoint path relative to the API base.
+
+        Returns:
+            str: "prediction", "read" or "write".
+        """
+        if path.startswith("prediction"):
+            return "prediction"
+        return "read" if method.upper() in cls.READ_METHODS else "write"
+
+    def reserve(self, method, path):
+        """
+        Reserves a token from every bucket that applies to a request.
+
+        Returns:
+            float: Seconds the caller must wait before sending the request.
+        """
+        wait = 0.0
+        for bucket in (self.buckets.get(self.classify(method, path)), self.total):
+            if bucket is not None:
+                wait = max(wait, bucket.reserve())
+        return wait
+
+    def acquire(self, method, path):
+        """
+        Blocks until a request may be sent.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        wait = self.reserve(method, path)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, method, path):
+        """
+        Waits on the event loop until a request may be sent.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        wait = self.reserve(method, path)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
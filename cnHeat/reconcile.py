@@ -0,0 +1,335 @@
+import json
+
+try:
+    import yaml
+except ImportError:  # PyYAML is only needed to read YAML tower files
+    yaml = None
+
+
+# Radio fields as sent to and returned by the API, keyed by the create_radio argument
+# each one is passed as.
+CREATE_ARGS = {
+    "frequency(ghz)": "freq",
+    "antenna": "antennaId",
+    "azimuth": "azimuth",
+    "height(m)": "aglHeightMeters",
+    "name": "radioName",
+    "foliage_tuning": "foliageTuning",
+    "height_rooftop(m)": "arHeightMeters",
+    "radius(m)": "radiusMeters",
+    "sm_gain(dbi)": "smGain",
+    "tilt": "tilt",
+    "txclearance(m)": "txClearanceMeters",
+    "txpower(dbm)": "txPowerDbm",
+}
+
+# Shorthand accepted in tower specs, mapped to API field names. create_radio argument
+# names are accepted as well.
+ALIASES = {
+    "freq": "frequency(ghz)",
+    "frequency": "frequency(ghz)",
+    "height": "height(m)",
+    "rooftop_height": "height_rooftop(m)",
+    "radius": "radius(m)",
+    "sm_gain": "sm_gain(dbi)",
+    "txclearance": "txclearance(m)",
+    "power": "txpower(dbm)",
+    "txpower": "txpower(dbm)",
+}
+ALIASES.update({arg: field for field, arg in CREATE_ARGS.items()})
+
+REQUIRED_FIELDS = ("frequency(ghz)", "antenna", "azimuth")
+
+
+def load_towers(path):
+    """
+    Reads a tower spec from a YAML or JSON file.
+
+    Args:
+        path (str): File to read; ``.json`` files are parsed as JSON, anything else as YAML.
+
+    Returns:
+        list: Site specs, see normalize_towers().
+
+    Raises:
+        ImportError: If the file is YAML and PyYAML is not installed.
+    """
+    with open(path) as f:
+        if path.endswith(".json"):
+            return normalize_towers(json.load(f))
+        if yaml is None:
+            raise ImportError("PyYAML is required to read YAML tower specs (pip install pyyaml)")
+        return normalize_towers(yaml.safe_load(f))
+
+
+def normalize_radio(spec):
+    """
+    Converts a radio spec to API field names.
+
+    Args:
+        spec (dict): Radio fields, using API names (``"height(m)"``), create_radio argument
+            names (``aglHeightMeters``) or shorthand (``height``). An ``id`` pins the spec to
+            an existing radio.
+
+    Returns:
+        dict: The spec keyed by API field names.
+
+    Raises:
+        ValueError: If the spec has an unknown field.
+    """
+    radio = {}
+    for key, value in spec.items():
+        field = ALIASES.get(key, key)
+        if field != "id" and field not in CREATE_ARGS:
+            raise ValueError(f"Unknown radio field: {key}")
+        radio[field] = value
+    return radio
+
+
+def normalize_towers(desired):
+    """
+    Validates a desired state and converts its radios to API field names.
+
+    Args:
+        desired (dict or list): Either ``{"sites": [...]}`` or the list of sites itself.
+            Each site has an ``id`` or a ``name`` identifying it, an optional ``name`` to
+            rename it to, an optional ``prune`` flag, and a ``radios`` list.
+
+    Returns:
+        list: Site specs with normalized radios.
+
+    Raises:
+        ValueError: If the spec is malformed.
+    """
+    sites = desired.get("sites", []) if isinstance(desired, dict) else desired
+    towers = []
+    for site in sites or []:
+        if not isinstance(site, dict) or ("id" not in site and "name" not in site):
+            raise ValueError(f"Site spec needs an id or a name: {site!r}")
+        towers.append(dict(site, radios=[normalize_radio(r) for r in site.get("radios") or []]))
+    return towers
+
+
+def select_sites(towers, sites):
+    """
+    Returns the site objects a tower spec refers to.
+
+    Args:
+        towers (list): Site specs from normalize_towers().
+        sites (list): Every site on the account.
+
+    Returns:
+        list: The referenced sites.
+
+    Raises:
+        ValueError: If a spec refers to a site that does not exist.
+    """
+    by_id = {s['id']: s for s in sites if 'id' in s}
+    by_name = {s.get('name'): s for s in by_id.values()}
+    selected = {}
+    for tower in towers:
+        site = _resolve_site(tower, by_id, by_name)
+        selected[site['id']] = site
+    return list(selected.values())
+
+
+def _resolve_site(tower, by_id, by_name):
+    site = by_id.get(tower["id"]) if "id" in tower else by_name.get(tower["name"])
+    if site is None:
+        raise ValueError(f"Unknown site: {tower.get('id', tower.get('name'))}")
+    return site
+
+
+def _same(current, desired):
+    try:
+        return abs(float(current) - float(desired)) < 1e-6
+    except (TypeError, ValueError):
+        return current == desired
+
+
+def _match(radio, radio_id, candidates):
+    if radio_id is not None:
+        return candidates.get(radio_id)
+    if radio.get("name") is not None:
+        return next((r for r in candidates.values() if r.get("name") == radio["name"]), None)
+    for r in candidates.values():
+        if _same(r.get("frequency(ghz)"), radio.get("frequency(ghz)")) and _same(r.get("azimuth"), radio.get("azimuth")):
+            return r
+    return None
+
+
+def diff_towers(towers, snapshot, prune=True):
+    """
+    Computes the API calls that turn the current inventory into the desired one.
+
+    Desired radios are matched to existing ones by ``id``, else by ``name``, else by
+    frequency and azimuth. Matched radios are updated with only the fields that differ;
+    fields the spec leaves out are not touched. Unmatched desired radios are created, and
+    existing radios no spec matched are deleted unless pruning is off for the site.
+
+    Args:
+        towers (list): Site specs from normalize_towers().
+        snapshot (InventorySnapshot): Current state of the referenced sites.
+        prune (bool, optional): Default for sites without a ``prune`` flag. Defaults to True.
+
+    Returns:
+        Plan: The actions to apply.
+
+    Raises:
+        ValueError: If a spec refers to an unknown site or a new radio lacks required fields.
+        RuntimeError: If the radios of a referenced site could not be fetched.
+    """
+    by_name = {s.get('name'): s for s in snapshot.sites.values()}
+    plan = Plan()
+    for tower in towers:
+        site = _resolve_site(tower, snapshot.sites, by_name)
+        site_id = site['id']
+        if site_id in snapshot.errors:
+            raise RuntimeError(f"Failed to fetch radios of site {site_id}: {snapshot.errors[site_id]}")
+        if "id" in tower and "name" in tower and tower["name"] != site.get("name"):
+            plan.actions.append(Action("rename_site", site_id, data={"name": tower["name"]}, current=site))
+        candidates = {r['id']: r for r in snapshot.site_radios(site_id) if 'id' in r}
+        for spec in tower["radios"]:
+            radio = dict(spec)
+            current = _match(radio, radio.pop("id", None), candidates)
+            if current is None:
+                missing = [f for f in REQUIRED_FIELDS if f not in radio]
+                if missing:
+                    raise ValueError(f"New radio at site {site_id} is missing {', '.join(missing)}: {spec!r}")
+                plan.actions.append(Action("create_radio", site_id, data=radio))
+                continue
+            del candidates[current['id']]
+            changes = {k: v for k, v in radio.items() if not _same(current.get(k), v)}
+            if changes:
+                plan.actions.append(Action("update_radio", site_id, current['id'], changes, current))
+            else:
+                plan.unchanged += 1
+        if tower.get("prune", prune):
+            for radio_id, current in candidates.items():
+                plan.actions.append(Action("delete_radio", site_id, radio_id, current=current))
+    return plan
+
+
+class Action:
+    """
+    One API call of a Plan.
+
+    Attributes:
+        kind (str): Client method to call: "rename_site", "create_radio", "update_radio"
+            or "delete_radio".
+        site_id (str): Site the action applies to.
+        radio_id (str): Radio the action applies to, or None for site renames and creates.
+        data (dict): Fields to send, keyed by API field names.
+        current (dict): The existing site or radio, or None for creates.
+        result: API response once applied.
+        error (Exception): Error raised while applying, if any.
+    """
+
+    def __init__(self, kind, site_id, radio_id=None, data=None, current=None):
+        self.kind = kind
+        self.site_id = site_id
+        self.radio_id = radio_id
+        self.data = data or {}
+        self.current = current
+        self.result = None
+        self.error = None
+
+    def create_kwargs(self):
+        """
+        Returns the create_radio keyword arguments of a create action.
+        """
+        kwargs = {CREATE_ARGS[field]: value for field, value in self.data.items()}
+        kwargs["site_id"] = self.site_id
+        return kwargs
+
+    def call(self, client):
+        """
+        Calls the client method that performs the action; returns a coroutine for AsyncCnHeat.
+        """
+        if self.kind == "rename_site":
+            return client.rename_site(self.site_id, self.data["name"])
+        if self.kind == "create_radio":
+            return client.create_radio(**self.create_kwargs())
+        if self.kind == "update_radio":
+            return client.update_radio(self.radio_id, self.data)
+        return client.delete_radio(self.radio_id)
+
+    def __str__(self):
+        if self.kind == "rename_site":
+            return f"~ site {self.site_id}: name {self.current.get('name')!r} -> {self.data['name']!r}"
+        if self.kind == "create_radio":
+            fields = ", ".join(f"{k}={v!r}" for k, v in self.data.items())
+            return f"+ radio {self.data.get('name') or '(default name)'} at site {self.site_id}: {fields}"
+        name = self.current.get('name') if self.current else None
+        if self.kind == "update_radio":
+            fields = ", ".join(f"{k} {self.current.get(k)!r} -> {v!r}" for k, v in self.data.items())
+            return f"~ radio {self.radio_id} ({name}) at site {self.site_id}: {fields}"
+        return f"- radio {self.radio_id} ({name}) at site {self.site_id}"
+
+    def __repr__(self):
+        return f"<Action {self}>"
+
+
+class Plan:
+    """
+    The minimal set of API calls that reconciles the inventory with a desired state.
+
+    ``str(plan)`` renders a dry-run listing with one line per action.
+
+    Attributes:
+        actions (list): Actions in the order they were planned.
+        unchanged (int): Desired radios that already match.
+        applied (bool): True once the plan has been applied.
+    """
+
+    ORDER = ("rename_site", "update_radio", "delete_radio", "create_radio")
+
+    def __init__(self):
+        self.actions = []
+        self.unchanged = 0
+        self.applied = False
+
+    def phases(self):
+        """
+        Returns the actions grouped into batches that are safe to run concurrently.
+
+        Renames, updates and deletes touch distinct objects and run together; creates run
+        after the deletes so a radio can be replaced by one with the same name.
+        """
+        first = [a for a in self.actions if a.kind != "create_radio"]
+        creates = [a for a in self.actions if a.kind == "create_radio"]
+        return [batch for batch in (first, creates) if batch]
+
+    @property
+    def counts(self):
+        """dict: Number of actions of each kind."""
+        return {kind: sum(1 for a in self.actions if a.kind == kind) for kind in self.ORDER}
+
+    @property
+    def failed(self):
+        """list: Applied actions that raised an error."""
+        return [a for a in self.actions if a.error is not None]
+
+    def summary(self):
+        """
+        Returns a one-line summary of the plan.
+        """
+        counts = self.counts
+        return (
+            f"{counts['create_radio']} to create, {counts['update_radio']} to update, "
+            f"{counts['delete_radio']} to delete, {counts['rename_site']} site renames, "
+            f"{self.unchanged} unchanged"
+        )
+
+    def __len__(self):
+        return len(self.actions)
+
+    def __iter__(self):
+        return iter(self.actions)
+
+    def __str__(self):
+        lines = [str(a) for kind in self.ORDER for a in self.actions if a.kind == kind]
+        return "\n".join(lines + [self.summary()])
+
+    def __repr__(self):
+        return f"<Plan {self.summary()}>"
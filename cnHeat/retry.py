@@ -0,0 +1,113 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+import requests
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request is retried and how long to wait first.
+
+    Waits grow exponentially with full jitter, a server-sent ``Retry-After`` is honored,
+    and the total time spent retrying is capped. Only methods listed in ``methods`` are
+    retried unless the caller marks a request as idempotent.
+
+    Args:
+        max_attempts (int, optional): Total attempts per request, including the first. Defaults to 4.
+        statuses (iterable, optional): HTTP statuses that are retried. Defaults to 429, 500, 502, 503, 504.
+        exceptions (tuple, optional): Transport exceptions that are retried. Defaults to
+            connection errors and timeouts of both requests and httpx.
+        methods (iterable, optional): HTTP methods that are safe to retry. Defaults to
+            GET, HEAD, OPTIONS, PUT and DELETE.
+        backoff_factor (float, optional): Base wait in seconds, doubled each attempt. Defaults to 0.5.
+        max_backoff (float, optional): Longest single wait in seconds. Defaults to 30.
+        max_elapsed (float, optional): Give up once this many seconds have passed since the
+            first attempt. None means no limit. Defaults to 120.
+        jitter (bool, optional): Randomize each wait between zero and its ceiling. Defaults to True.
+        respect_retry_after (bool, optional): Wait as long as a Retry-After header asks,
+            within max_elapsed. Defaults to True.
+    """
+
+    DEFAULT_STATUSES = frozenset({429, 500, 502, 503, 504})
+    DEFAULT_EXCEPTIONS = (requests.ConnectionError, requests.Timeout, httpx.TransportError)
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+    def __init__(self, max_attempts=4, statuses=DEFAULT_STATUSES, exceptions=DEFAULT_EXCEPTIONS, methods=IDEMPOTENT_METHODS, backoff_factor=0.5, max_backoff=30, max_elapsed=120, jitter=True, respect_retry_after=True):
+        self.max_attempts = max_attempts
+        self.statuses = frozenset(statuses)
+        self.exceptions = tuple(exceptions)
+        self.methods = frozenset(m.upper() for m in methods)
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_elapsed = max_elapsed
+        self.jitter = jitter
+        self.respect_retry_after = respect_retry_after
+
+    def backoff(self, attempt):
+        """
+        Returns the wait before the next attempt, ignoring any Retry-After header.
+
+        Args:
+            attempt (int): Number of attempts made so far (1 after the first failure).
+
+        Returns:
+            float: Seconds to wait.
+        """
+        ceiling = min(self.max_backoff, self.backoff_factor * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling) if self.jitter else ceiling
+
+    @staticmethod
+    def parse_retry_after(value):
+        """
+        Parses a Retry-After header given either as seconds or as an HTTP date.
+
+        Args:
+            value (str): Header value.
+
+        Returns:
+            float: Seconds to wait, or None if the value is missing or malformed.
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def next_delay(self, method, attempt, started, status=None, retry_after=None, idempotent=None):
+        """
+        Decides whether to retry after a failed attempt.
+
+        Args:
+            method (str): HTTP method of the request.
+            attempt (int): Number of attempts made so far.
+            started (float): time.monotonic() value taken before the first attempt.
+            status (int, optional): HTTP status of the failed attempt, or None for a
+                transport error.
+            retry_after (str, optional): Retry-After header of the failed response.
+            idempotent (bool, optional): Overrides the method check; True allows retrying
+                POST/PATCH requests known to be safe to repeat.
+
+        Returns:
+            float: Seconds to wait before retrying, or None to give up.
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if status is not None and status not in self.statuses:
+            return None
+        if not (method.upper() in self.methods if idempotent is None else idempotent):
+            return None
+        delay = self.backoff(attempt)
+        if self.respect_retry_after:
+            requested = self.parse_retry_after(retry_after)
+            if requested is not None:
+                delay = max(delay, requested)
+        if self.max_elapsed is not None and time.monotonic() - started + delay > self.max_elapsed:
+            return None
+        return delay
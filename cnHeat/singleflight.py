@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is in flight
+    wait for it and receive the same result or exception. Once the call finishes the key
+    is released, so later calls run again. Threads use do(); coroutines on one event loop
+    use do_async().
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Runs ``fn(*args, **kwargs)`` unless a call with the same key is already running,
+        in which case its outcome is shared.
+
+        Args:
+            key: Hashable identity of the call.
+            fn (callable): Function to run.
+
+        Returns:
+            The function's return value.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def do_async(self, key, fn, *args, **kwargs):
+        """
+        Awaits ``fn(*args, **kwargs)`` unless a call with the same key is already running,
+        in which case its outcome is shared. A cancelled waiter does not cancel the call.
+
+        Args:
+            key: Hashable identity of the call.
+            fn (callable): Coroutine function to run.
+
+        Returns:
+            The coroutine's result.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(fn(*args, **kwargs))
+            task.add_done_callback(lambda t: self._release(key, t))
+        return await asyncio.shield(task)
+
+    def _release(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            task.exception()  # retrieved by the waiters, if any are left
+
+    def __len__(self):
+        return len(self._calls) + len(self._tasks)
@@ -0,0 +1,262 @@
+import threading
+
+
+class Collection:
+    """
+    Objects of one type keyed by their primary key, with hash indexes on other fields.
+
+    Index values are read from the object itself unless given explicitly when the object is
+    stored, e.g. the site a radio was fetched for. Reads are lock-free; writes are
+    serialized by the owning store's lock.
+
+    An object can belong to several groups of a ``multi`` index, e.g. an antenna listed in
+    more than one frequency's catalog: storing it again adds the new value instead of
+    replacing the old one, and replace_where() only drops the group being replaced.
+
+    Args:
+        key (str): Field holding the primary key.
+        indexes (iterable, optional): Fields to index.
+        lock (threading.RLock, optional): Lock shared with the owning store.
+        multi (iterable, optional): Indexed fields an object can hold several values of.
+    """
+
+    def __init__(self, key, indexes=(), lock=None, multi=()):
+        self.key = key
+        self.objects = {}
+        self.indexes = {field: {} for field in indexes}
+        self.multi = frozenset(multi)
+        self.loaded = False
+        self._index_values = {}  # primary key -> {field: indexed value}
+        self._list = None
+        self._lock = lock or threading.RLock()
+
+    def __len__(self):
+        return len(self.objects)
+
+    def __contains__(self, object_id):
+        return object_id in self.objects
+
+    def get(self, object_id):
+        """
+        Returns the object with a primary key, or None.
+        """
+        return self.objects.get(object_id)
+
+    def find(self, field, value):
+        """
+        Returns every object whose indexed field equals a value.
+
+        Args:
+            field (str): An indexed field.
+            value: Value to look up.
+
+        Returns:
+            list: Matching objects in insertion order.
+        """
+        return list(self.indexes[field].get(value, {}).values())
+
+    def first(self, field, value):
+        """
+        Returns one object whose indexed field equals a value, or None.
+        """
+        matches = self.indexes[field].get(value)
+        return next(iter(matches.values()), None) if matches else None
+
+    def indexed_value(self, object_id, field):
+        """
+        Returns the value an object is indexed under for a field, e.g. the site of a radio;
+        a frozenset of values for a ``multi`` field.
+        """
+        return self._index_values.get(object_id, {}).get(field)
+
+    def values(self):
+        """
+        Returns every stored object as a list that is reused until the collection changes.
+
+        The list is shared; copy it before handing it out or modifying it.
+        """
+        objects = self._list
+        if objects is None:
+            objects = self._list = list(self.objects.values())
+        return objects
+
+    def put(self, obj, **index_values):
+        """
+        Stores or replaces an object and updates the indexes.
+
+        Args:
+            obj (dict): Object to store; must contain the primary key.
+            **index_values: Index values that override the ones read from the object.
+
+        Returns:
+            dict: The stored object.
+        """
+        object_id = obj[self.key]
+        with self._lock:
+            previous = self._unindex(object_id)
+            self.objects[object_id] = obj
+            values = {field: index_values[field] if field in index_values else obj.get(field) for field in self.indexes}
+            for field in self.multi:
+                values[field] = previous.get(field, frozenset()) | ({values[field]} - {None})
+            for field, value in values.items():
+                for v in (value if field in self.multi else (value,)):
+                    if v is not None:
+                        self.indexes[field].setdefault(v, {})[object_id] = obj
+            self._index_values[object_id] = values
+            self._list = None
+        return obj
+
+    def update(self, object_id, fields):
+        """
+        Updates fields of a stored object in place and reindexes it.
+
+        Args:
+            object_id: Primary key of the object.
+            fields (dict): Fields to set.
+
+        Returns:
+            dict: The updated object, or None if it isn't stored.
+        """
+        with self._lock:
+            obj = self.objects.get(object_id)
+            if obj is None:
+                return None
+            overrides = {f: v for f, v in self._index_values.get(object_id, {}).items() if f not in obj and f not in fields}
+            obj.update(fields)
+            return self.put(obj, **overrides)
+
+    def changes(self, object_id, fields):
+        """
+        Returns the fields whose values differ from a stored object.
+
+        Args:
+            object_id: Primary key of the object.
+            fields (dict): Candidate field values.
+
+        Returns:
+            dict: The differing fields, or None if the object isn't stored.
+        """
+        obj = self.objects.get(object_id)
+        if obj is None:
+            return None
+        return {field: value for field, value in fields.items() if field not in obj or obj[field] != value}
+
+    def remove(self, object_id):
+        """
+        Removes an object by primary key.
+
+        Returns:
+            dict: The removed object, or None if it wasn't stored.
+        """
+        with self._lock:
+            self._unindex(object_id)
+            obj = self.objects.pop(object_id, None)
+            self._list = None
+        return obj
+
+    def replace(self, objects, **index_values):
+        """
+        Replaces the whole collection with a freshly fetched list and marks it loaded.
+
+        Args:
+            objects (list): Every object of this type.
+            **index_values: Index values applied to every object.
+        """
+        with self._lock:
+            self.clear()
+            for obj in objects:
+                if self.key in obj:
+                    self.put(obj, **index_values)
+            self.loaded = True
+
+    def replace_where(self, field, value, objects, **index_values):
+        """
+        Replaces the objects whose indexed field equals a value, e.g. the radios of one site.
+
+        Args:
+            field (str): An indexed field.
+            value: Value identifying the group to replace.
+            objects (list): The group's new objects.
+            **index_values: Extra index values applied to every object.
+        """
+        index_values[field] = value
+        with self._lock:
+            for object_id in list(self.indexes[field].get(value, {})):
+                if field in self.multi and len(self._index_values[object_id][field]) > 1:
+                    self._discard(object_id, field, value)  # still listed in other groups
+                else:
+                    self.remove(object_id)
+            for obj in objects:
+                if self.key in obj:
+                    self.put(obj, **index_values)
+
+    def clear(self):
+        """
+        Drops every object and marks the collection as not loaded.
+        """
+        with self._lock:
+            self.objects.clear()
+            for index in self.indexes.values():
+                index.clear()
+            self._index_values.clear()
+            self._list = None
+            self.loaded = False
+
+    def _unindex(self, object_id):
+        values = self._index_values.pop(object_id, {})
+        for field, value in values.items():
+            for v in (value if field in self.multi else (value,)):
+                self._unlink(field, v, object_id)
+        return values
+
+    def _discard(self, object_id, field, value):
+        self._unlink(field, value, object_id)
+        self._index_values[object_id][field] -= {value}
+
+    def _unlink(self, field, value, object_id):
+        matches = self.indexes[field].get(value)
+        if matches is not None:
+            matches.pop(object_id, None)
+            if not matches:
+                del self.indexes[field][value]
+
+
+class ObjectStore:
+    """
+    Resident identity map of everything a client has fetched or changed.
+
+    Attributes:
+        sites (Collection): Sites by "id", indexed by "name".
+        radios (Collection): Radios by "id", indexed by "site_id", "frequency(ghz)" and "name".
+        antennas (Collection): Antennas by "id", indexed by "antenna" and by every
+            "frequency" whose catalog lists them.
+        predictions (Collection): Predictions by "id", indexed by "name".
+        users (Collection): Users by "email".
+        subscriptions (Collection): Subscriptions by "id".
+    """
+
+    def __init__(self):
+        lock = threading.RLock()
+        self.sites = Collection("id", ("name",), lock)
+        self.radios = Collection("id", ("site_id", "frequency(ghz)", "name"), lock)
+        self.antennas = Collection("id", ("frequency", "antenna"), lock, multi=("frequency",))
+        self.predictions = Collection("id", ("name",), lock)
+        self.users = Collection("email", (), lock)
+        self.subscriptions = Collection("id", (), lock)
+        self._clear_callbacks = []
+
+    def on_clear(self, callback):
+        """
+        Registers a function called with no arguments by clear(), so caches built on the
+        store's contents, like the antenna catalogs, are dropped along with it.
+        """
+        self._clear_callbacks.append(callback)
+
+    def clear(self):
+        """
+        Drops every stored object and the caches registered with on_clear().
+        """
+        for collection in (self.sites, self.radios, self.antennas, self.predictions, self.users, self.subscriptions):
+            collection.clear()
+        for callback in self._clear_callbacks:
+            callback()
@@ -0,0 +1,180 @@
+import codecs
+import json
+import re
+
+from .codec import JSONCodec
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+# What may still follow a number at the end of a chunk ("12.", "1e", "2e+").
+NUMBER_TAIL = re.compile(r"[0-9.eE+\-]*\Z")
+CHUNK_SIZE = 64 * 1024
+
+
+class ObjectStreamParser:
+    """
+    Incremental parser yielding the items of one array in a JSON document as they arrive.
+
+    The document is either an object holding the array under ``key`` (``{"objects": [...]}``)
+    or a bare array. Only the item being parsed and the unread remainder of the last chunk
+    are held in memory; other top-level values are parsed and discarded.
+
+    Items are delimited with the standard library's decoder. With any other codec, each
+    item's text is then decoded again with ``codec``, so streamed objects are identical
+    to the ones the client decodes from whole bodies.
+
+    Args:
+        key (str, optional): Top-level key holding the array. Defaults to "objects".
+        codec (JSONCodec, optional): Decodes the items. Defaults to the standard library.
+    """
+
+    def __init__(self, key="objects", codec=None):
+        self.key = key
+        self.codec = codec or JSONCodec()
+        # The standard library's result is what JSONCodec.loads() would return.
+        self._recode = type(self.codec) is not JSONCodec
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"
+        self._current_key = None
+        self._bare = False
+
+    @property
+    def done(self):
+        """bool: True once the whole document has been read."""
+        return self._state == "done"
+
+    def feed(self, data, final=False):
+        """
+        Parses the next chunk of the document.
+
+        Args:
+            data (bytes or str): Next chunk of the body.
+            final (bool, optional): True for the last chunk. Defaults to False.
+
+        Returns:
+            list: Array items completed by this chunk.
+
+        Raises:
+            ValueError: If the document is malformed or, with ``final``, truncated.
+        """
+        self._buf += self._decoder.decode(data, final) if isinstance(data, bytes) else data
+        items = []
+        while self._state != "done" and self._step(items, final):
+            pass
+        if final and self._state != "done":
+            raise ValueError("Truncated JSON document")
+        if self._pos > 65536 or self._pos * 2 > len(self._buf):
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        return items
+
+    def _char(self):
+        self._pos = WHITESPACE.match(self._buf, self._pos).end()
+        return self._buf[self._pos] if self._pos < len(self._buf) else None
+
+    def _value(self, final):
+        try:
+            value, end = self._json.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return False, None
+        if not final and isinstance(value, (int, float)) and NUMBER_TAIL.match(self._buf, end):
+            return False, None  # no delimiter yet, so the number may continue in the next chunk
+        self._pos = end
+        return True, value
+
+    def _step(self, items, final):
+        char = self._char()
+        if char is None:
+            return False
+        state = self._state
+        if state == "start":
+            if char not in "{[":
+                raise ValueError(f"Expected a JSON object or array, got {char!r}")
+            self._pos += 1
+            self._bare = char == "["
+            self._state = "items" if self._bare else "key"
+        elif state == "key":
+            if char == "}":
+                self._pos += 1
+                self._state = "done"
+                return True
+            ok, self._current_key = self._value(final)
+            if not ok:
+                return False
+            self._state = "colon"
+        elif state == "colon":
+            if char != ":":
+                raise ValueError(f"Expected ':' after key {self._current_key!r}")
+            self._pos += 1
+            self._state = "value"
+        elif state == "value":
+            if self._current_key == self.key and char == "[":
+                self._pos += 1
+                self._state = "items"
+                return True
+            ok, _ = self._value(final)
+            if not ok:
+                return False
+            self._state = "after_value"
+        elif state == "after_value":
+            self._pos += 1
+            if char == ",":
+                self._state = "key"
+            elif char == "}":
+                self._state = "done"
+            else:
+                raise ValueError(f"Expected ',' or '}}', got {char!r}")
+        elif state in ("items", "after_item"):
+            if char == "]":
+                self._pos += 1
+                self._state = "done" if self._bare else "after_value"
+            elif state == "after_item":
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']', got {char!r}")
+                self._pos += 1
+                self._state = "items"
+            else:
+                start = self._pos
+                ok, item = self._value(final)
+                if not ok:
+                    return False
+                if self._recode:
+                    item = self.codec.loads(self._buf[start:self._pos])
+                items.append(item)
+                self._state = "after_item"
+        return True
+
+
+def iter_objects(chunks, key="objects", codec=None):
+    """
+    Yields the items of a JSON list response from an iterable of body chunks.
+
+    Args:
+        chunks (iterable): Body chunks as bytes, e.g. ``response.iter_content(CHUNK_SIZE)``.
+        key (str, optional): Top-level key holding the array. Defaults to "objects".
+        codec (JSONCodec, optional): Decodes the items. Defaults to the standard library.
+
+    Yields:
+        The array items, in order.
+    """
+    parser = ObjectStreamParser(key, codec)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.feed(b"", final=True)
+
+
+async def aiter_objects(chunks, key="objects", codec=None):
+    """
+    Async version of iter_objects() for an async iterable of body chunks, e.g.
+    ``response.aiter_bytes()``.
+    """
+    parser = ObjectStreamParser(key, codec)
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+    for item in parser.feed(b"", final=True):
+        yield item
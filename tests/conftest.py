@@ -0,0 +1,30 @@
+import pytest
+
+from benchmarks.mock_server import Dataset, MockServer
+from cnHeat import RetryPolicy, cnHeat
+
+
+@pytest.fixture
+def server():
+    with MockServer(Dataset(sites=5, radios_per_site=3, predictions=2), job_duration=0.3) as server:
+        yield server
+
+
+@pytest.fixture
+def make_client(server):
+    clients = []
+
+    def make(**kwargs):
+        kwargs.setdefault("retry", RetryPolicy(backoff_factor=0.01, jitter=False))
+        client = cnHeat("id", "secret", base_endpoint=server.base_endpoint, **kwargs)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client()
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from cnHeat import AsyncCnHeat, SQLiteCache
+
+
+def run(server, test, **kwargs):
+    async def main():
+        async with AsyncCnHeat("id", "secret", base_endpoint=server.base_endpoint, **kwargs) as client:
+            return await test(client)
+
+    return asyncio.run(main())
+
+
+def test_fetches_and_mutations_update_the_store(server):
+    async def test(client):
+        assert client.sites is None
+        await client.get_sites()
+        sites = client.sites
+        sites.clear()
+        assert len(client.sites) == len(server.dataset.sites)
+        site = await client.create_site("New", 1.0, 2.0, "credit")
+        await client.rename_site("site000000", "Renamed")
+        assert client.store.sites.get(site["id"]) is not None
+        assert client.store.sites.get("site000000")["name"] == "Renamed"
+        radios = await client.get_site_radios("site000000")
+        assert client.store.radios.indexed_value(radios[0]["id"], "site_id") == "site000000"
+
+    run(server, test)
+
+
+def test_update_radio_diff_skips_unchanged_fields(server):
+    async def test(client):
+        radio = (await client.get_site_radios("site000000"))[0]
+        requests = server.requests
+        assert await client.update_radio(radio["id"], {"azimuth": radio["azimuth"]}, diff=True) is client.store.radios.get(radio["id"])
+        assert server.requests == requests and client.saved_requests == 1
+        await client.update_radio(radio["id"], {"azimuth": radio["azimuth"], "tilt": 5}, diff=True)
+        assert server.requests == requests + 1
+        assert server.dataset.radios["site000000"][radio["id"]]["tilt"] == 5
+
+    run(server, test)
+
+
+def test_reads_through_the_persistent_cache(server, tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+
+    async def test(client):
+        await client.get_sites()
+        requests = server.requests
+        await client.get_sites()
+        assert server.requests == requests
+        await client.create_site("New", 1.0, 2.0, "credit")
+        assert len(await client.get_sites()) == len(server.dataset.sites)
+
+    run(server, test, cache=cache)
+    cache.close()
+
+
+def test_background_refresh_reloads_after_a_mutation(server):
+    async def test(client):
+        await client.get_sites()
+        server.dataset.sites["site-added"] = {"id": "site-added", "name": "Added elsewhere"}
+        await client.create_site("New", 1.0, 2.0, "credit")
+        await asyncio.gather(*client._refresh_tasks)
+        return client.store.sites
+
+    sites = run(server, test, background_refresh=True)
+    assert "site-added" in sites
+
+
+def test_unknown_predictions_fail_after_the_others_finish(server):
+    async def test(client):
+        prediction = await client.create_prediction("coverage", list(server.dataset.radios["site000000"]))
+        seen = []
+        with pytest.raises(RuntimeError, match="Prediction missing not found"):
+            await client.wait_for_predictions([prediction["id"], "missing"], timeout=5, poll_interval=0.05,
+                                              callback=lambda pid, job: seen.append(pid))
+        assert seen == [prediction["id"]]
+
+    run(server, test)
@@ -0,0 +1,81 @@
+import json
+import os
+import stat
+import time
+
+from cnHeat import RequestHook, cnHeat
+
+
+def token_body(token, expires_in):
+    return json.dumps({"access_token": token, "token_type": "bearer", "expires_in": expires_in}).encode()
+
+
+def counted_client(make_client, events, **kwargs):
+    return make_client(hooks=[RequestHook(after=events.append)], **kwargs)
+
+
+def token_requests(events):
+    return sum(1 for e in events if e.endpoint == "oauth/token")
+
+
+def test_processes_share_the_token_file(server, make_client, tmp_path):
+    path = str(tmp_path / "tokens.json")
+    events = []
+    first = counted_client(make_client, events, token_cache=path)
+    second = counted_client(make_client, events, token_cache=path)
+    assert second.token == first.token
+    second.get_sites()
+    assert token_requests(events) == 1
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_token_file_is_keyed_by_client(server, make_client, tmp_path):
+    path = str(tmp_path / "tokens.json")
+    first = make_client(token_cache=path)
+    other = cnHeat("other", "secret", base_endpoint=server.base_endpoint, token_cache=path)
+    try:
+        assert other.token != first.token
+        with open(path) as f:
+            assert len(json.load(f)) == 2
+    finally:
+        other.close()
+
+
+def test_expired_tokens_in_the_file_are_not_reused(server, make_client, tmp_path):
+    path = str(tmp_path / "tokens.json")
+    server.set_response("POST", "oauth/token", body=token_body("stale", 30), times=1)
+    make_client(token_cache=path, token_refresh_margin=0)
+    assert make_client(token_cache=path, token_refresh_margin=0).token == "stale"
+    assert make_client(token_cache=path, token_refresh_margin=60).token != "stale"
+
+
+def test_token_is_renewed_within_the_refresh_margin(server, make_client):
+    events = []
+    server.set_response("POST", "oauth/token", body=token_body("short", 30), times=1)
+    client = counted_client(make_client, events, token_refresh_margin=60)
+    client.get_sites()
+    assert client.token != "short"
+    assert token_requests(events) == 2
+    client.get_sites()
+    assert token_requests(events) == 2
+
+
+def test_token_is_kept_outside_the_refresh_margin(server, make_client):
+    events = []
+    server.set_response("POST", "oauth/token", body=token_body("short", 30), times=1)
+    client = counted_client(make_client, events, token_refresh_margin=10)
+    client.get_sites()
+    assert client.token == "short"
+    assert token_requests(events) == 1
+    assert client.auth.expires_at - time.time() <= 30
+
+
+def test_rejected_token_is_dropped_from_the_file(server, make_client, tmp_path):
+    path = str(tmp_path / "tokens.json")
+    client = make_client(token_cache=path)
+    rejected = client.token
+    server.set_response("GET", "sites", status=401, times=1)
+    assert client.get_sites()
+    assert client.token != rejected
+    with open(path) as f:
+        assert [entry["access_token"] for entry in json.load(f).values()] == [client.token]
@@ -0,0 +1,62 @@
+import pytest
+
+from benchmarks.mock_server import Dataset, MockServer
+from cnHeat import SQLiteCache, cnHeat
+
+
+def test_job_status_endpoint_is_never_cached(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    assert cache.cacheable("predictions")
+    assert not cache.cacheable("predictions/jobmanagement")
+    assert cache.fresh({"fetched_at": 0}, "predictions/jobmanagement") is False
+
+
+def test_wait_for_predictions_sees_fresh_status_with_cache(tmp_path, server, make_client):
+    client = make_client(cache=SQLiteCache(str(tmp_path / "cache.sqlite3")))
+    radios = list(server.dataset.radios["site000000"])
+    prediction = client.create_prediction("coverage", radios)
+    results = client.wait_for_predictions([prediction["id"]], timeout=5, poll_interval=0.05, max_interval=0.1)
+    assert results[prediction["id"]]["status"] == "completed"
+
+
+def test_reads_are_served_from_cache_until_invalidated(tmp_path, server, make_client):
+    client = make_client(cache=SQLiteCache(str(tmp_path / "cache.sqlite3")))
+    client.get_sites()
+    before = server.requests
+    client.get_sites()
+    assert server.requests == before
+    client.rename_site("site000000", "Renamed")
+    assert {s["id"]: s["name"] for s in client.get_sites()}["site000000"] == "Renamed"
+    assert server.requests == before + 2  # the PATCH and one refetch
+
+
+@pytest.fixture
+def etag_server():
+    with MockServer(Dataset(sites=5, radios_per_site=3, predictions=2), etags=True) as server:
+        yield server
+
+
+def test_list_reads_are_revalidated_without_a_cache(etag_server):
+    with cnHeat("id", "secret", base_endpoint=etag_server.base_endpoint) as client:
+        sites = client.get_sites()
+        digest = client.digest("sites")
+        assert etag_server.conditional == 0
+        assert client.get_sites() == sites
+        assert (etag_server.conditional, etag_server.not_modified) == (1, 1)
+        assert client.digest("sites") == digest
+        client.create_site("New", 1.0, 2.0, "credit")
+        assert len(client.get_sites()) == len(sites) + 1
+        assert etag_server.conditional == 1  # the mutation dropped the stale validator
+        assert client.digest("sites") != digest
+
+
+def test_only_list_reads_keep_validators(etag_server):
+    with cnHeat("id", "secret", base_endpoint=etag_server.base_endpoint) as client:
+        radio_id = next(iter(etag_server.dataset.radio_sites))
+        client.get_credits()
+        client.get_radio(radio_id)
+        assert len(client._validators) == 0
+        client._validators.maxsize = 2
+        for site_id in list(etag_server.dataset.sites)[:3]:
+            client.get_site_radios(site_id)
+        assert len(client._validators) == 2
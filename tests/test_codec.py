@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+import pytest
+
+from cnHeat import AsyncCnHeat
+from cnHeat.codec import CodecError, JSONCodec, available_codecs, get_codec
+
+CODECS = available_codecs()
+
+
+class Power(float):
+    pass
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_codecs_accept_what_stdlib_accepts(name):
+    codec = get_codec(name)
+    data = {"txpower(dbm)": Power(27.2), "big": 2 ** 70, "name": "é", 1: [None, True]}
+    assert json.loads(codec.dumps(data)) == json.loads(JSONCodec().dumps(data))
+    assert codec.loads(b'{"a": [1, 2.5, "x"]}') == {"a": [1, 2.5, "x"]}
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_codec_errors_are_value_errors(name):
+    codec = get_codec(name)
+    for body in (b"", b"{not json", b"\xff"):
+        with pytest.raises(CodecError):
+            codec.loads(body)
+    with pytest.raises(CodecError):
+        codec.dumps({"radio": object()})
+
+
+def test_numpy_scalars_are_encoded():
+    numpy = pytest.importorskip("numpy")
+    for name in CODECS:
+        assert json.loads(get_codec(name).dumps({"tilt": numpy.float64(-2.0)})) == {"tilt": -2.0}
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_mutators_wrap_invalid_json(server, make_client, name):
+    client = make_client(codec=name)
+    server.set_response("DELETE", "radio/abc", body=b"{not json")
+    with pytest.raises(RuntimeError, match="Failed to delete radio"):
+        client.delete_radio("abc")
+    with pytest.raises(RuntimeError, match="Failed to update radio"):
+        client.update_radio("site000000-r000", {"tilt": object()})
+
+
+@pytest.mark.parametrize("name", CODECS)
+def test_async_mutators_wrap_invalid_json(server, name):
+    server.set_response("DELETE", "radio/abc", body=b"{not json")
+
+    async def run():
+        async with AsyncCnHeat("id", "secret", base_endpoint=server.base_endpoint, codec=name) as client:
+            with pytest.raises(RuntimeError, match="Failed to delete radio"):
+                await client.delete_radio("abc")
+            with pytest.raises(RuntimeError, match="Failed to update radio"):
+                await client.update_radio("site000000-r000", {"tilt": object()})
+
+    asyncio.run(run())
@@ -0,0 +1,83 @@
+import math
+from array import array
+
+import pytest
+
+from cnHeat import columnar
+from cnHeat.columnar import RadioTable, StringColumn
+
+RADIOS = [
+    {"id": "r1", "name": "A", "site_id": "s1", "antenna": "ant", "frequency(ghz)": 5.8, "azimuth": 0, "tilt": -2},
+    {"id": "r2", "name": "B", "site_id": "s1", "antenna": "ant", "frequency(ghz)": 5.8, "azimuth": 90, "tilt": None},
+    {"id": "r3", "name": "C", "site_id": "s2", "antenna": "omni", "frequency(ghz)": 3.65, "azimuth": 350, "tilt": 4},
+    {"id": "r4", "name": None, "antenna": "ant", "frequency(ghz)": 3.65, "azimuth": 10},
+]
+
+
+@pytest.fixture(params=["array", "numpy"])
+def backend(request, monkeypatch):
+    if request.param == "array":
+        monkeypatch.setattr(columnar, "numpy", None)
+    else:
+        pytest.importorskip("numpy")
+    return request.param
+
+
+@pytest.fixture
+def table(backend):
+    return RadioTable.from_radios(RADIOS, site_id="s3")
+
+
+def ids(table):
+    return list(table["id"])
+
+
+def test_columns(table, backend):
+    assert len(table) == 4 and f"backend={backend}" in repr(table)
+    tilt = table["tilt"]
+    if backend == "array":
+        assert isinstance(tilt, array) and tilt.typecode == "d"
+    assert tilt[0] == -2 and math.isnan(tilt[1]) and math.isnan(tilt[3])
+    assert table["frequency(ghz)"] is table["frequency"]
+    assert isinstance(table["site_id"], StringColumn) and list(table["site_id"]) == ["s1", "s1", "s2", "s3"]
+    assert table["antenna"].values == ["ant", "omni"]
+    with pytest.raises(KeyError):
+        table["unknown"]
+
+
+def test_masks_and_filters(table):
+    assert list(table.mask("tilt", ">", 0)) == [False, False, True, False]
+    assert list(table.mask("tilt", "!=", 0)) == [True, True, True, True]  # NaN only matches !=
+    assert list(table.mask("antenna", "!=", "ant")) == [False, False, True, False]
+    assert list(table.mask("name", ">=", "B")) == [False, True, True, False]
+    assert ids(table.filter(table.mask("azimuth", "in", {0, 10}))) == ["r1", "r4"]
+    assert ids(table.filter(table.mask("azimuth", "<", 100), antenna="ant", frequency=5.8)) == ["r1", "r2"]
+    assert ids(table.filter(site_id="nowhere")) == []
+    assert ids(table.take([3, 0])) == ["r4", "r1"]
+
+
+def test_groups_and_aggregates(table):
+    groups = table.group_by("site_id")
+    assert list(groups) == ["s1", "s2", "s3"]
+    assert [ids(g) for g in groups.values()] == [["r1", "r2"], ["r3"], ["r4"]]
+    assert list(table.group_by("frequency")) == [5.8, 3.65]
+    assert table.aggregate("site_id", "tilt") == {"s1": -2, "s2": 4, "s3": None}
+    assert table.aggregate("frequency", "azimuth", "count") == {5.8: 2, 3.65: 2}
+    assert table.aggregate("antenna", "azimuth", max) == {"ant": 90, "omni": 350}
+    assert table.azimuth_gaps() == {"s1": 270, "s2": 360, "s3": 360}
+
+
+def test_rows_round_trip(table):
+    rows = table.to_dicts()
+    assert rows[1] == {"id": "r2", "name": "B", "site_id": "s1", "antenna": "ant", "frequency(ghz)": 5.8, "azimuth": 90.0}
+    assert rows[3]["site_id"] == "s3" and "name" not in rows[3]
+    assert RadioTable.from_radios(rows).to_dicts() == rows
+
+
+def test_from_snapshot(client, backend):
+    snapshot = client.inventory_snapshot()
+    table = RadioTable.from_snapshot(snapshot)
+    assert len(table) == sum(len(radios) for radios in snapshot.radios.values())
+    assert {site_id: len(t) for site_id, t in table.group_by("site_id").items()} == {
+        site_id: len(radios) for site_id, radios in snapshot.radios.items() if radios
+    }
@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+
+from cnHeat import AsyncCnHeat, SQLiteCache
+
+
+@pytest.mark.parametrize("body", [b"", b"{not json", b'{"objects": ['])
+def test_fetchers_wrap_invalid_json(server, client, body):
+    server.set_response("GET", "sites", body=body)
+    with pytest.raises(RuntimeError, match="Failed to fetch sites"):
+        client.get_sites()
+    server.set_response("GET", "credits", body=body)
+    with pytest.raises(RuntimeError, match="Failed to fetch credits"):
+        client.get_credits()
+
+
+def test_invalid_body_is_not_cached(tmp_path, server, make_client):
+    client = make_client(cache=SQLiteCache(str(tmp_path / "cache.sqlite3")))
+    server.set_response("GET", "sites", body=b"{not json")
+    with pytest.raises(RuntimeError):
+        client.get_sites()
+    server.set_response("GET", "sites", status=None)
+    assert len(client.get_sites()) == len(server.dataset.sites)
+
+
+def test_async_fetchers_wrap_invalid_json(server):
+    server.set_response("GET", "sites", body=b"{not json")
+
+    async def run():
+        async with AsyncCnHeat("id", "secret", base_endpoint=server.base_endpoint) as client:
+            await client.get_sites()
+
+    with pytest.raises(RuntimeError, match="Failed to fetch sites"):
+        asyncio.run(run())
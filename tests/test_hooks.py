@@ -0,0 +1,65 @@
+import asyncio
+import logging
+
+import pytest
+
+from benchmarks.mock_server import Dataset, MockServer
+from cnHeat import AsyncCnHeat, MetricsCollector, RequestHook, SQLiteCache, cnHeat
+
+
+def broken(event):
+    raise ValueError("hook failed")
+
+
+def test_hook_errors_do_not_fail_calls(make_client, caplog):
+    metrics = MetricsCollector()
+    client = make_client(hooks=[RequestHook(before=broken, after=broken), metrics])
+    with caplog.at_level(logging.ERROR, logger="cnHeat"):
+        assert client.get_sites()
+    assert "hook failed" in caplog.text
+    assert metrics.to_dict()
+
+
+def test_hook_errors_do_not_mask_request_errors(server, make_client):
+    client = make_client(hooks=[RequestHook(after=broken)])
+    server.set_response("GET", "sites", status=404, body=b'{"error": "gone"}')
+    with pytest.raises(RuntimeError, match="Failed to fetch sites"):
+        client.get_sites()
+
+
+def test_cache_outcome_is_reported_only_with_a_cache(tmp_path, make_client):
+    events = []
+    hook = RequestHook(after=events.append)
+    make_client(hooks=[hook]).get_sites()
+    assert events[-1].cache is None
+    client = make_client(hooks=[hook], cache=SQLiteCache(str(tmp_path / "cache.sqlite3")))
+    client.get_sites()
+    client.get_sites()
+    assert [e.cache for e in events[-2:]] == ["miss", "hit"]
+
+
+def test_conditional_gets_without_a_cache_report_revalidation():
+    events = []
+    metrics = MetricsCollector()
+    hooks = [RequestHook(after=events.append), metrics]
+    with MockServer(Dataset(sites=3, radios_per_site=1), etags=True) as server:
+        with cnHeat("id", "secret", base_endpoint=server.base_endpoint, hooks=hooks) as client:
+            client.get_sites()
+            client.get_sites()
+            client.create_site("New", 1.0, 2.0, "credit")
+            client.get_sites()
+    reads = [e.cache for e in events if e.method == "GET"]
+    assert reads == [None, "revalidated", None]
+    assert metrics.to_dict()["GET sites"]["cache"] == {"revalidated": 1}
+
+
+def test_async_hook_errors_do_not_fail_calls(server):
+    events = []
+
+    async def run():
+        hooks = [RequestHook(before=broken, after=broken), RequestHook(after=events.append)]
+        async with AsyncCnHeat("id", "secret", base_endpoint=server.base_endpoint, hooks=hooks) as client:
+            return await client.get_sites()
+
+    assert asyncio.run(run())
+    assert events[-1].cache is None
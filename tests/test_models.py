@@ -0,0 +1,37 @@
+import pytest
+
+from cnHeat import Radio, Site, User
+
+
+def test_known_null_fields_read_as_none():
+    radio = Radio.from_dict({"id": "r1", "tilt": None, "vendor": "x"})
+    assert radio["tilt"] is None
+    assert radio["height(m)"] is None and radio["height"] is None
+    assert radio.get("tilt", 0) == 0
+    assert radio["vendor"] == "x"
+    with pytest.raises(KeyError):
+        radio["unknown"]
+
+
+def test_models_are_hashable():
+    a, b = Site.from_dict({"id": "s1", "name": "A"}), Site.from_dict({"id": "s1", "name": "A"})
+    assert a == b and hash(a) == hash(b)
+    assert len({a, b, Site.from_dict({"id": "s2"})}) == 2
+    assert {User.from_dict({"email": "ops@example.com"}): 1}[User(email="ops@example.com")] == 1
+
+
+def test_models_match_dicts(client):
+    site_id = "site000000"
+    radios = client.get_site_radios.models(site_id)
+    assert [r.to_dict() for r in radios] == [dict(r, site_id=site_id) for r in client.get_site_radios(site_id)]
+    assert len(set(radios)) == len(radios)
+
+
+def test_created_sites_round_trip(client):
+    created = Site.from_dict(client.create_site("New", 45.5, -122.6, "credit"))
+    assert (created.latitude, created.longitude) == (45.5, -122.6)
+    assert created["lat"] == created["latitude"] == 45.5 and created.extra == {"credits": "credit"}
+    assert created.to_dict() == {"id": created.id, "name": "New", "latitude": 45.5, "longitude": -122.6, "credits": "credit"}
+    assert Site.from_dict(created.to_dict()) == created
+    listed = next(s for s in client.get_sites.models() if s.id == created.id)
+    assert listed == created
@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import pytest
+
+from cnHeat import AsyncCnHeat
+
+
+def create(client, server, count):
+    radios = list(server.dataset.radios["site000000"])
+    return [client.create_prediction(f"coverage {i}", radios)["id"] for i in range(count)]
+
+
+def test_wait_for_predictions(server, client):
+    ids = create(client, server, 2)
+    seen = []
+    results = client.wait_for_predictions(ids, timeout=5, poll_interval=0.05, max_interval=0.1,
+                                          callback=lambda pid, job: seen.append(pid))
+    assert sorted(results) == sorted(seen) == sorted(ids)
+    assert all(job["status"] == "completed" for job in results.values())
+
+
+def test_futures_resolve_when_callback_raises(server, client):
+    ids = create(client, server, 3)
+
+    def callback(prediction_id, job):
+        raise ValueError("callback failed")
+
+    futures = client.wait_for_predictions(ids, timeout=5, poll_interval=0.05, block=False, callback=callback)
+    for future in futures.values():
+        assert future.result(timeout=5)["status"] == "completed"
+    with pytest.raises(ValueError, match="callback failed"):
+        client.wait_for_predictions(create(client, server, 1), timeout=5, poll_interval=0.05, callback=callback)
+
+
+def test_timeout_fails_every_pending_future(server, make_client):
+    server.job_duration = 60
+    client = make_client()
+    futures = client.wait_for_predictions(create(client, server, 2), timeout=0.1, poll_interval=0.05, block=False)
+    for future in futures.values():
+        with pytest.raises(TimeoutError):
+            future.result(timeout=5)
+
+
+def test_unlisted_predictions_do_not_wait_forever(server, client):
+    ids = create(client, server, 1)
+    server.set_response("GET", "predictions/jobmanagement", body=json.dumps({"objects": []}).encode())
+    futures = client.wait_for_predictions(ids + ["missing"], timeout=None, poll_interval=0.05, block=False)
+    assert futures[ids[0]].result(timeout=5)["id"] == ids[0]
+    with pytest.raises(RuntimeError, match="missing not found"):
+        futures["missing"].result(timeout=5)
+
+
+def test_async_unlisted_predictions(server):
+    async def run():
+        async with AsyncCnHeat("id", "secret", base_endpoint=server.base_endpoint) as client:
+            prediction = await client.create_prediction("coverage", list(server.dataset.radios["site000000"]))
+            server.set_response("GET", "predictions/jobmanagement", body=b'{"objects": []}')
+            results = await client.wait_for_predictions([prediction["id"]], timeout=None, poll_interval=0.05)
+            assert results[prediction["id"]]["id"] == prediction["id"]
+            with pytest.raises(RuntimeError, match="not found"):
+                await client.wait_for_predictions(["missing"], timeout=None, poll_interval=0.05)
+
+    asyncio.run(run())
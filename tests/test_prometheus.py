@@ -0,0 +1,88 @@
+import re
+import urllib.error
+import urllib.request
+
+import pytest
+
+from cnHeat import MetricsCollector, RequestEvent
+from cnHeat.prometheus import CONTENT_TYPE, MetricsServer, render
+
+SAMPLE = re.compile(r"^(\w+)(\{.*\})? (\S+)$")
+
+
+def event(path, latency, status=200, cache=None, error=None, method="GET"):
+    e = RequestEvent(method, path, cache=cache)
+    e.status, e.latency, e.error = status, latency, error
+    return e
+
+
+def samples(text):
+    parsed = {}
+    for line in text.splitlines():
+        if not line.startswith("#"):
+            name, labels, value = SAMPLE.match(line).groups()
+            parsed[name + (labels or "")] = float(value)
+    return parsed
+
+
+@pytest.fixture
+def collector():
+    collector = MetricsCollector(buckets=(0.1, 1.0))
+    for e in (
+        event("sites", 0.05, cache="hit", status=None),
+        event("sites", 0.5, cache="miss"),
+        event("radio/abc", 2.0, status=503, error=RuntimeError("down"), method="PATCH"),
+    ):
+        collector.before_request(e)
+        collector.after_request(e)
+    return collector
+
+
+def test_renders_counters_and_histograms(collector):
+    collector.predictions_pending("waiter", 3)
+    text = render(collector)
+    values = samples(text)
+    assert values['cnheat_requests_total{method="GET",endpoint="sites",status="200"}'] == 1
+    assert values['cnheat_requests_total{method="GET",endpoint="sites",status=""}'] == 1
+    assert values['cnheat_requests_total{method="PATCH",endpoint="radio/{id}",status="503"}'] == 1
+    assert values['cnheat_request_errors_total{method="PATCH",endpoint="radio/{id}",error="RuntimeError"}'] == 1
+    assert values['cnheat_cache_requests_total{method="GET",endpoint="sites",result="hit"}'] == 1
+    assert values['cnheat_cache_hit_ratio{method="GET",endpoint="sites"}'] == 0.5
+    assert [values[f'cnheat_request_duration_seconds_bucket{{method="GET",endpoint="sites",le="{le}"}}'] for le in ("0.1", "1.0", "+Inf")] == [1, 2, 2]
+    assert values['cnheat_request_duration_seconds_sum{method="GET",endpoint="sites"}'] == pytest.approx(0.55)
+    assert values['cnheat_request_duration_seconds_count{method="PATCH",endpoint="radio/{id}"}'] == 1
+    assert values["cnheat_requests_in_flight"] == 0
+    assert values["cnheat_prediction_jobs_pending"] == 3
+    assert "# TYPE cnheat_request_duration_seconds histogram" in text
+    assert text.endswith("\n")
+
+
+def test_every_metric_is_declared_once_before_its_samples(collector):
+    declared = []
+    for line in render(collector, namespace="edge").splitlines():
+        if line.startswith("# TYPE "):
+            declared.append(line.split()[2])
+        elif not line.startswith("#"):
+            name = SAMPLE.match(line).group(1)
+            assert re.sub(r"_(bucket|sum|count)$", "", name) == declared[-1] or name == declared[-1]
+    assert len(declared) == len(set(declared)) and all(name.startswith("edge_") for name in declared)
+
+
+def test_label_values_are_escaped():
+    collector = MetricsCollector()
+    collector.after_request(event("sites", 0.01, error=type('Bad"Error\\\n', (Exception,), {})()))
+    assert 'error="Bad\\"Error\\\\\\n"' in render(collector)
+
+
+def test_server_exposes_the_collector(server, make_client):
+    collector = MetricsCollector()
+    make_client(hooks=[collector]).get_sites()
+    with MetricsServer(collector, port=0) as metrics:
+        with urllib.request.urlopen(metrics.url) as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            values = samples(response.read().decode())
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(metrics.url.replace("/metrics", "/other"))
+        assert error.value.code == 404
+    assert values['cnheat_requests_total{method="GET",endpoint="sites",status="200"}'] == 1
+    assert values['cnheat_requests_total{method="POST",endpoint="oauth/token",status="200"}'] == 1
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from cnHeat import AsyncCnHeat
+
+SPECS = [
+    {"site_id": "site000000", "freq": 5.8, "antennaId": "ant-5.8-0", "azimuth": 0},
+    {"site_id": "site000000", "antennaId": "ant-5.8-0", "azimuth": 90},  # no freq
+    {"site_id": "site000001", "freq": 5.8, "antennaId": "ant-5.8-1", "azimuth": 180},
+]
+
+
+def check(results):
+    assert [item["spec"] for item in results] == SPECS
+    assert isinstance(results[1]["error"], TypeError)
+    for item in (results[0], results[2]):
+        assert item["error"] is None
+        assert item["result"]["id"]
+
+
+def test_create_radios_reports_incomplete_specs_per_item(client):
+    check(client.create_radios(SPECS, max_workers=2))
+
+
+def test_async_create_radios_reports_incomplete_specs_per_item(server):
+    async def run():
+        async with AsyncCnHeat("id", "secret", base_endpoint=server.base_endpoint) as client:
+            return await client.create_radios(SPECS)
+
+    check(asyncio.run(run()))
+
+
+def test_unknown_sites_are_looked_up_once_per_batch(server, client):
+    specs = [{"site_id": "nosuchsite", "freq": 5.8, "antennaId": "ant-5.8-0", "azimuth": a} for a in range(0, 360, 45)]
+    before = server.requests
+    results = client.create_radios(specs, max_workers=1)
+    assert all(isinstance(item["error"], RuntimeError) for item in results)
+    assert all("Site nosuchsite not found" in str(item["error"]) for item in results)
+    assert server.requests - before == 3  # the antenna catalog, the site list and one recheck
+    with pytest.raises(RuntimeError, match="Site nosuchsite not found"):
+        client.create_radio("nosuchsite", 5.8, "ant-5.8-0", 0)
+    assert server.requests - before == 3
+    site = client.create_site("New", 1.0, 2.0, "credit")
+    assert client.create_radio(site["id"], 5.8, "ant-5.8-0", 0)["name"].endswith("GHZ.NEW")
+
+
+def test_async_unknown_sites_fail_clearly(server):
+    async def run():
+        async with AsyncCnHeat("id", "secret", base_endpoint=server.base_endpoint) as client:
+            return await client.create_radios([{"site_id": "nosuchsite", "freq": 5.8, "antennaId": "ant-5.8-0", "azimuth": 0}] * 4)
+
+    results = asyncio.run(run())
+    assert all("Site nosuchsite not found" in str(item["error"]) for item in results)
+
+
+def test_update_radio_diff_sends_only_changed_fields(server, client):
+    radio = client.get_site_radios("site000000")[0]
+    stored = server.dataset.radios["site000000"][radio["id"]]
+    stored["azimuth"] = radio["azimuth"] + 1  # changed elsewhere since the fetch
+    before = server.requests
+    assert client.update_radio(radio["id"], {"azimuth": radio["azimuth"]}, diff=True) is client.store.radios.get(radio["id"])
+    assert server.requests == before and client.saved_requests == 1
+    client.update_radio(radio["id"], {"azimuth": radio["azimuth"], "tilt": 5}, diff=True)
+    assert server.requests == before + 1
+    assert stored["tilt"] == 5 and stored["azimuth"] == radio["azimuth"] + 1
+    assert client.store.radios.get(radio["id"])["tilt"] == 5
+    client.update_radio(radio["id"], {"tilt": 5}, diff=True)
+    assert server.requests == before + 1 and client.saved_requests == 2
+
+
+def test_update_radio_diff_patches_unfetched_radios_in_full(server, client):
+    radio_id, stored = next(iter(server.dataset.radios["site000001"].items()))
+    before = server.requests
+    client.update_radio(radio_id, {"azimuth": stored["azimuth"], "tilt": 7}, diff=True)
+    assert server.requests == before + 1 and client.saved_requests == 0
+    assert stored["tilt"] == 7
@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+import pytest
+
+from cnHeat import AsyncCnHeat, RateLimiter, RequestHook, TokenBucket
+
+
+def test_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(10, capacity=2)
+    assert bucket.reserve() == 0 and bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_requests_are_charged_to_their_budget():
+    limiter = RateLimiter(read=TokenBucket(10, capacity=1), write=TokenBucket(10, capacity=1), prediction=TokenBucket(10, capacity=1))
+    assert RateLimiter.classify("get", "predictions/jobmanagement") == "prediction"
+    assert limiter.reserve("GET", "sites") == 0
+    assert limiter.reserve("POST", "sites") == 0  # reads don't use up the write budget
+    assert limiter.reserve("GET", "predictions") == 0
+    assert limiter.reserve("GET", "sites") > 0
+
+
+def test_total_caps_every_budget():
+    limiter = RateLimiter(read=100, write=100, total=TokenBucket(10, capacity=1))
+    assert limiter.reserve("GET", "sites") == 0
+    assert limiter.reserve("POST", "sites") == pytest.approx(0.1, abs=0.01)
+
+
+def test_client_waits_on_the_read_budget(server, make_client):
+    events = []
+    client = make_client(rate_limiter=RateLimiter(read=TokenBucket(20, capacity=1)), hooks=[RequestHook(after=events.append)])
+    client.get_sites()
+    started = time.monotonic()
+    for _ in range(4):
+        client.get_sites()
+    assert time.monotonic() - started >= 0.18
+    assert sum(e.rate_limit_wait for e in events[1:]) == pytest.approx(0.2, abs=0.04)
+    before = time.monotonic()
+    client.create_site("New", 1.0, 2.0, "credit")  # writes are unlimited
+    assert time.monotonic() - before < 0.05
+
+
+def test_budget_is_shared_by_clients(server, make_client):
+    limiter = RateLimiter(read=TokenBucket(20, capacity=1))
+    first, second = make_client(rate_limiter=limiter), make_client(rate_limiter=limiter)
+    first.get_sites()
+    second.get_sites()
+    started = time.monotonic()
+    first.get_sites()
+    second.get_sites()
+    assert time.monotonic() - started >= 0.09
+
+
+def test_async_client_waits_on_the_budget(server):
+    limiter = RateLimiter(read=TokenBucket(20, capacity=1))
+
+    async def main():
+        async with AsyncCnHeat("id", "secret", base_endpoint=server.base_endpoint, rate_limiter=limiter) as client:
+            await client.get_sites()
+            started = time.monotonic()
+            for _ in range(4):
+                await client.get_sites()
+            return time.monotonic() - started
+
+    assert asyncio.run(main()) >= 0.18
@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import pytest
+
+from cnHeat import AsyncCnHeat
+
+TOWERS = {"sites": [
+    {"id": "site000000", "name": "North Ridge", "radios": [
+        {"id": "site000000-r000", "tilt": 3},
+        {"name": "AP-1-3.65 GHZ.TOWER 0"},
+        {"name": "AP-new", "freq": 5.8, "antenna": "ant-5.8-0", "azimuth": 90, "height": 30},
+    ]},
+    {"name": "Tower 1", "prune": False, "radios": [{"freq": 2.4, "azimuth": 0, "power": 20}]},
+]}
+
+
+def test_plan_is_a_dry_run(server, client):
+    before = json.dumps(server.dataset.radios, sort_keys=True)
+    plan = client.plan_towers(TOWERS)
+    assert plan.counts == {"rename_site": 1, "update_radio": 2, "delete_radio": 1, "create_radio": 1}
+    assert plan.unchanged == 1
+    assert "- radio site000000-r002" in str(plan)
+    assert json.dumps(server.dataset.radios, sort_keys=True) == before
+    assert server.dataset.sites["site000000"]["name"] == "Tower 0"
+
+
+def test_apply_reaches_desired_state(tmp_path, server, client):
+    path = tmp_path / "towers.json"
+    path.write_text(json.dumps(TOWERS))
+    plan = client.apply_plan(client.plan_towers(str(path)))
+    assert plan.applied and plan.failed == []
+    data = server.dataset
+    assert data.sites["site000000"]["name"] == "North Ridge"
+    assert data.radios["site000000"]["site000000-r000"]["tilt"] == 3
+    assert "site000000-r002" not in data.radios["site000000"]
+    assert len(data.radios["site000001"]) == 3
+    assert data.radios["site000001"]["site000001-r000"]["txpower(dbm)"] == 20
+    again = client.plan_towers(TOWERS)
+    assert len(again) == 0 and again.unchanged == 4
+
+
+def test_failed_actions_are_recorded(server, client):
+    server.set_response("DELETE", "radio/site000000-r002", status=404, body=b'{"error": "gone"}')
+    plan = client.reconcile(TOWERS)
+    assert [a.kind for a in plan.failed] == ["delete_radio"]
+    assert isinstance(plan.failed[0].error, RuntimeError)
+    assert server.dataset.sites["site000000"]["name"] == "North Ridge"
+
+
+def test_unknown_site_is_rejected(client):
+    with pytest.raises(ValueError, match="Unknown site"):
+        client.plan_towers([{"id": "nope", "radios": []}])
+
+
+def test_async_reconcile(server):
+    async def run():
+        async with AsyncCnHeat("id", "secret", base_endpoint=server.base_endpoint) as client:
+            plan = await client.reconcile(TOWERS)
+            return plan, await client.plan_towers(TOWERS)
+
+    plan, again = asyncio.run(run())
+    assert plan.failed == [] and len(plan) == 5
+    assert len(again) == 0
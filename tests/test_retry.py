@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+import pytest
+
+from cnHeat import AsyncCnHeat, RequestHook, RetryPolicy
+
+
+def test_retries_honor_retry_after(server, make_client):
+    events = []
+    client = make_client(hooks=[RequestHook(after=events.append)])
+    server.set_response("GET", "sites", status=503, headers={"Retry-After": "0.2"}, times=2)
+    before, started = server.requests, time.monotonic()
+    assert len(client.get_sites()) == len(server.dataset.sites)
+    assert time.monotonic() - started >= 0.4
+    assert server.requests == before + 3
+    assert events[-1].retries == 2 and events[-1].status == 200
+
+
+def test_gives_up_after_max_attempts(server, make_client):
+    client = make_client(retry=RetryPolicy(max_attempts=3, backoff_factor=0.01, jitter=False))
+    server.set_response("GET", "sites", status=429, headers={"Retry-After": "0"})
+    before = server.requests
+    with pytest.raises(RuntimeError, match="Failed to fetch sites"):
+        client.get_sites()
+    assert server.requests == before + 3
+
+
+def test_retry_after_beyond_max_elapsed_is_not_waited(server, make_client):
+    client = make_client(retry=RetryPolicy(backoff_factor=0.01, max_elapsed=1))
+    server.set_response("GET", "sites", status=503, headers={"Retry-After": "60"})
+    started = time.monotonic()
+    with pytest.raises(RuntimeError):
+        client.get_sites()
+    assert time.monotonic() - started < 1
+
+
+def test_creates_are_not_retried(server, client):
+    server.set_response("POST", "sites", status=503, headers={"Retry-After": "0"}, times=1)
+    with pytest.raises(RuntimeError, match="Failed to create site"):
+        client.create_site("North", 45.0, -75.0, "credit")
+    assert client.create_site("North", 45.0, -75.0, "credit")["name"] == "North"
+
+
+def test_retry_can_be_disabled(server, make_client):
+    client = make_client(retry=False)
+    server.set_response("GET", "sites", status=503, headers={"Retry-After": "0"}, times=1)
+    with pytest.raises(RuntimeError):
+        client.get_sites()
+    assert client.get_sites()
+
+
+def test_async_retries_honor_retry_after(server):
+    server.set_response("GET", "sites", status=503, headers={"Retry-After": "0.1"}, times=2)
+
+    async def run():
+        retry = RetryPolicy(backoff_factor=0.01, jitter=False)
+        async with AsyncCnHeat("id", "secret", base_endpoint=server.base_endpoint, retry=retry) as client:
+            return await client.get_sites()
+
+    before = server.requests
+    assert len(asyncio.run(run())) == len(server.dataset.sites)
+    assert server.requests == before + 3
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from cnHeat import AsyncCnHeat
+from cnHeat.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight, calls, release = SingleFlight(), [], threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return len(calls)
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(flight.do, "key", fetch) for _ in range(8)]
+        time.sleep(0.1)
+        release.set()
+        assert [f.result() for f in futures] == [1] * 8
+    assert len(calls) == 1 and len(flight) == 0
+    assert flight.do("key", fetch) == 2  # released once finished
+
+
+def test_exceptions_are_shared():
+    flight, release = SingleFlight(), threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(4) as pool:
+        futures = [pool.submit(flight.do, "key", fail) for _ in range(4)]
+        time.sleep(0.1)
+        release.set()
+        for future in futures:
+            with pytest.raises(ValueError, match="boom"):
+                future.result()
+    assert len(flight) == 0
+
+
+def test_coroutines_share_one_execution_and_survive_cancelled_waiters():
+    flight, calls = SingleFlight(), []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        cancelled = asyncio.ensure_future(flight.do_async("key", fetch))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        results = await asyncio.gather(*(flight.do_async("key", fetch) for _ in range(4)))
+        return results, len(flight)
+
+    assert asyncio.run(main()) == (["done"] * 4, 0)
+    assert len(calls) == 1
+
+
+def test_client_coalesces_identical_reads(server, client):
+    client.get_sites()
+    server.latency = 0.1
+    before = server.requests
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: client.get_sites(), range(8)))
+    assert server.requests == before + 1
+    assert all(r == results[0] for r in results)
+    with ThreadPoolExecutor(2) as pool:
+        list(pool.map(client.get_site_radios, ["site000000", "site000001"]))
+    assert server.requests == before + 3  # different reads aren't merged
+
+
+def test_async_client_coalesces_identical_reads(server):
+    async def main():
+        async with AsyncCnHeat("id", "secret", base_endpoint=server.base_endpoint) as client:
+            await client.get_sites()
+            server.latency = 0.1
+            before = server.requests
+            results = await asyncio.gather(*(client.get_sites() for _ in range(8)))
+            return server.requests - before, results
+
+    requests, results = asyncio.run(main())
+    assert requests == 1
+    assert all(r == results[0] for r in results)
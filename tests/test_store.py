@@ -0,0 +1,38 @@
+from cnHeat import ObjectStore
+
+
+def test_clearing_the_store_keeps_antenna_lookups_working(client):
+    client.get_antennas(2.4)
+    client.store.clear()
+    assert client.get_antennas.get(2.4, "ant-2.4-0")["id"] == "ant-2.4-0"
+    radio = client.create_radio("site000000", 2.4, "ant-2.4-0", 90)
+    assert "UnknownAntenna" not in radio["name"]
+
+
+def test_antenna_lookup_restores_a_fresh_catalog(client):
+    client.get_antennas(2.4)
+    client.store.antennas.clear()
+    assert client.get_antennas.get(2.4, "ant-2.4-1")["id"] == "ant-2.4-1"
+    assert client.get_antennas.get(2.4, "missing") is None
+
+
+def test_antennas_keep_every_frequency():
+    store = ObjectStore()
+    shared = {"id": "ant-x", "antenna": "Dual-Band", "frequency": 2.4}
+    store.antennas.replace_where("frequency", 2.4, [shared, {"id": "ant-a", "antenna": "A"}])
+    store.antennas.replace_where("frequency", 5.8, [dict(shared), {"id": "ant-b", "antenna": "B"}])
+    assert {a["id"] for a in store.antennas.find("frequency", 2.4)} == {"ant-x", "ant-a"}
+    assert {a["id"] for a in store.antennas.find("frequency", 5.8)} == {"ant-x", "ant-b"}
+    store.antennas.replace_where("frequency", 5.8, [{"id": "ant-b", "antenna": "B"}])
+    assert {a["id"] for a in store.antennas.find("frequency", 2.4)} == {"ant-x", "ant-a"}
+    assert [a["id"] for a in store.antennas.find("frequency", 5.8)] == ["ant-b"]
+    store.antennas.replace_where("frequency", 2.4, [])
+    assert "ant-x" not in store.antennas and store.antennas.find("antenna", "Dual-Band") == []
+
+
+def test_lists_are_copies(client):
+    sites = client.sites
+    sites.clear()
+    assert len(client.sites) == len(client.store.sites) > 0
+    client.predictions.append({"id": "bogus"})
+    assert "bogus" not in {p["id"] for p in client.predictions}
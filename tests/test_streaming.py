@@ -0,0 +1,85 @@
+import itertools
+import json
+
+import pytest
+
+from cnHeat.codec import JSONCodec, available_codecs, get_codec
+from cnHeat.streaming import ObjectStreamParser, iter_objects
+
+BODIES = [
+    '{"total": 12.5, "objects": [{"id": "a", "tilt": -2.5e1}, {"id": "b", "name": "Tour é"}], "next": null}',
+    '[1.5, 2e3, 3, -0.25, 1E-2, true, null, "x"]',
+    '{"objects": [10, 200] , "count": 2}',
+]
+
+
+def parse(chunks, codec=None):
+    parser = ObjectStreamParser(codec=codec)
+    items = []
+    for chunk in chunks:
+        items += parser.feed(chunk)
+    items += parser.feed(b"", final=True)
+    return items
+
+
+def expected(body):
+    data = json.loads(body)
+    return data if isinstance(data, list) else data["objects"]
+
+
+@pytest.mark.parametrize("body", BODIES)
+def test_every_split_point(body):
+    raw = body.encode()
+    for i in range(len(raw) + 1):
+        assert parse([raw[:i], raw[i:]]) == expected(body), i
+
+
+@pytest.mark.parametrize("body", BODIES[:2])
+def test_every_pair_of_split_points(body):
+    raw = body.encode()
+    for i, j in itertools.combinations(range(len(raw) + 1), 2):
+        assert parse([raw[:i], raw[i:j], raw[j:]]) == expected(body), (i, j)
+
+
+def test_byte_at_a_time():
+    for body in BODIES:
+        raw = body.encode()
+        assert parse(raw[i:i + 1] for i in range(len(raw))) == expected(body)
+
+
+@pytest.mark.parametrize("body", ['{"objects": [1, 2', '[1.5, 2e', '{"objects": [1.]}', "[1 2]"])
+def test_malformed_or_truncated(body):
+    with pytest.raises(ValueError):
+        list(iter_objects([body.encode()]))
+
+
+def test_streamed_fetch_matches_list(client):
+    assert list(client.get_sites.iter()) == client.get_sites()
+
+
+class RecordingCodec(JSONCodec):
+    name = "recording"
+
+    def __init__(self):
+        self.decoded = []
+
+    def loads(self, data):
+        self.decoded.append(data)
+        return super().loads(data)
+
+
+@pytest.mark.parametrize("name", available_codecs())
+@pytest.mark.parametrize("body", BODIES)
+def test_items_are_decoded_with_the_codec(name, body):
+    raw = body.encode()
+    codec = get_codec(name)
+    for i in range(len(raw) + 1):
+        assert parse([raw[:i], raw[i:]], codec) == expected(body), i
+
+
+def test_streamed_fetch_uses_the_client_codec(server, make_client):
+    codec = RecordingCodec()
+    client = make_client(codec=codec)
+    codec.decoded.clear()
+    sites = list(client.get_sites.iter())
+    assert [json.loads(raw) for raw in codec.decoded] == sites == list(server.dataset.sites.values())